@@ -0,0 +1,7 @@
+'''
+Benchmarks for the guidoc package.
+
+Each module can be run from the root of the source tree:
+
+  python -m bench.<module> --help
+'''
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+
+'''
+Compare a large read-only grid built from Label widgets with the same grid
+drawn on a Canvas.
+
+The build time and the throughput of changing the text of every cell are
+measured for each mode. Widgets are created with Tk when a display is
+available. The FakeTk backend is always timed so that the Python side of the
+build can be compared without a display.
+
+  python -m bench.canvasgrid
+  python -m bench.canvasgrid -n 1000 10000 50000
+'''
+
+from __future__ import print_function
+
+import sys
+import math
+import json
+import argparse
+import timeit
+
+from guidoc import guidoc as gd
+from bench.specgen import render_grid_table, grid_cells
+from bench.suite import open_display
+
+
+MODES = ['widgets', 'canvas']
+
+
+def grid_spec(cells, mode):
+  '''Generate a spec with a Frame of Labels placed by a grid section
+  Args:
+    cells (int): Number of grid cells. Rounded up to fill a square table.
+    mode (str): 'widgets' for a normal grid or 'canvas' to draw the cells on a Canvas
+  Returns:
+    tuple: Spec and list of cell names
+  '''
+  side = int(math.ceil(math.sqrt(cells)))
+  table = grid_cells(side, side, 0, prefix='c')
+  names = [n for r in table for n in r]
+  lines = ['frm(Frame)']
+  lines.extend("  {}(Label | text='{}')".format(n, n[1:]) for n in names)
+  lines.extend(['', '[grid frm{}]'.format(' canvas' if mode == 'canvas' else ''), ''])
+  lines.extend(render_grid_table(table))
+  return '\n'.join(lines) + '\n', names
+
+
+def build_code(spec, lib_prefix):
+  '''Generate the layout method for a spec'''
+  widget_sec, menus = gd.analyze_layout(spec, require_docutils=True)
+  return gd.generate_layout_method(widget_sec, menus, '_build_widgets', 'self', lib_prefix, deterministic=True)
+
+
+def time_updates(target, names, rounds):
+  '''Time changing the text of every cell
+
+  Pending redraws are flushed before the timer stops when the target is a Tk widget.
+
+  Returns:
+    float: Cell updates per second
+  '''
+  cells = [getattr(target, n) for n in names]
+  start = timeit.default_timer()
+  for i in range(rounds):
+    text = str(i)
+    for c in cells:
+      c.config(text=text)
+  if hasattr(target, 'update_idletasks'):
+    target.update_idletasks()
+  return len(cells) * rounds / (timeit.default_timer() - start)
+
+
+def measure(cells, mode, rounds, root=None):
+  '''Measure the build and update times of one grid
+  Args:
+    cells (int): Number of grid cells
+    mode (str): Grid mode
+    rounds (int): Updates of every cell
+    root (Tk, optional): Tk root for building real widgets. Skipped when None.
+  Returns:
+    dict: Measurements for the grid
+  '''
+  timer = timeit.default_timer
+  lib_prefix = gd.find_tkinter_name()
+  spec, names = grid_spec(cells, mode)
+  code = build_code(spec, lib_prefix)
+  r = {'cells': len(names)}
+
+  fake = gd.FakeTk()
+  method = gd.compile_method(code, '_build_widgets', {lib_prefix: fake})
+  target = fake.Frame(fake.Tk())
+  start = timer()
+  method(target)
+  r['fake_build_ms'] = (timer() - start) * 1000
+  r['windows'] = fake.ops.get('create', 0)
+  r['fake_ops'] = sum(fake.ops.values())
+  r['fake_updates_per_s'] = time_updates(target, names, rounds)
+
+  if root is not None:
+    method = gd.compile_method(code, '_build_widgets')
+    target = gd.tk.Frame(root)
+    start = timer()
+    method(target)
+    target.update_idletasks()
+    r['tk_build_ms'] = (timer() - start) * 1000
+
+    r['tk_updates_per_s'] = time_updates(target, names, rounds)
+
+    start = timer()
+    target.destroy()
+    root.update_idletasks()
+    r['tk_destroy_ms'] = (timer() - start) * 1000
+
+  return r
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Compare grids of Label widgets with grids drawn on a Canvas')
+  parser.add_argument('-n', '--cells', dest='sizes', type=int, nargs='+', default=[1000, 10000],
+    help='Number of cells in each grid')
+  parser.add_argument('-r', '--rounds', dest='rounds', type=int, default=5, help='Updates of every cell')
+  parser.add_argument('--no-tk', dest='tk', action='store_false', help='Only time the FakeTk backend')
+  parser.add_argument('--json', dest='json', action='store_true', help='Print results as JSON')
+  args = parser.parse_args()
+
+  root = open_display() if args.tk else None
+  if root is None:
+    print('No display: only timing the FakeTk backend', file=sys.stderr)
+
+  results = []
+  for n in args.sizes:
+    for mode in MODES:
+      r = measure(n, mode, args.rounds, root)
+      r['mode'] = mode
+      results.append(r)
+      if not args.json:
+        line = '{:8} {:6d} cells {:6d} windows  fake build {:9.1f} ms {:7d} ops {:10.0f} updates/s'.format(mode,
+          r['cells'], r['windows'], r['fake_build_ms'], r['fake_ops'], r['fake_updates_per_s'])
+        if 'tk_build_ms' in r:
+          line += '  tk build {:9.1f} ms {:10.0f} updates/s destroy {:8.1f} ms'.format(r['tk_build_ms'],
+            r['tk_updates_per_s'], r['tk_destroy_ms'])
+        print(line)
+        sys.stdout.flush()
+
+  if root is not None:
+    root.destroy()
+
+  if args.json:
+    print(json.dumps(results, indent=1, sort_keys=True))
+
+
+if __name__ == '__main__':
+  main()
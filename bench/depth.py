@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+'''
+Time the phases of layout processing on pathologically deep and wide trees.
+
+Deep widget and menu trees check that no phase recurses once per level. Wide
+trees check that no phase is worse than linear in the number of siblings.
+'''
+
+from __future__ import print_function
+
+import sys
+import json
+import argparse
+import timeit
+
+from guidoc import guidoc as gd
+from bench.specgen import widget_tree_lines
+
+
+PHASES = ['split', 'parse', 'analyze', 'codegen', 'compile', 'fake_build']
+
+
+def deep_menu(depth):
+  '''Generate a menu spec with one chain of cascades'''
+  lines = ['[menu]']
+  lines.extend('{}&m{}'.format('  ' * i, i) for i in range(depth))
+  lines.append('{}leaf command=self.quit'.format('  ' * depth))
+  return '\n'.join(lines) + '\n'
+
+
+def wide_menu(width):
+  '''Generate a menu spec with many items on one cascade'''
+  lines = ['[menu]', '&File']
+  lines.extend("  item{} command=self.quit".format(i) for i in range(width))
+  return '\n'.join(lines) + '\n'
+
+
+def time_layout(spec):
+  '''Time each phase of building a layout
+  Args:
+    spec (str): Layout specification
+  Returns:
+    dict: Seconds for each phase or an 'error' message if a phase failed
+  '''
+  timer = timeit.default_timer
+  lib_prefix = gd.find_tkinter_name()
+  times = {}
+  try:
+    start = timer()
+    sections = gd.split_layout_spec(spec)
+    times['split'] = timer() - start
+
+    start = timer()
+    for s in sections:
+      s.parse()
+    times['parse'] = timer() - start
+
+    start = timer()
+    widget_sec, menus = gd.analyze_sections(sections)
+    times['analyze'] = timer() - start
+
+    start = timer()
+    code = gd.generate_layout_method(widget_sec, menus, '_build_widgets', 'self', lib_prefix, deterministic=True)
+    times['codegen'] = timer() - start
+
+    fake = gd.FakeTk()
+    start = timer()
+    method = gd.compile_method(code, '_build_widgets', {lib_prefix: fake})
+    times['compile'] = timer() - start
+
+    target = fake.Frame(fake.Tk())
+    start = timer()
+    method(target)
+    times['fake_build'] = timer() - start
+
+  except RuntimeError as e: # Recursion limit
+    times['error'] = str(e)
+
+  return times
+
+
+def cases(depths, widths):
+  '''Generate the benchmark specs
+  Yields:
+    tuple: Case name, size, and spec
+  '''
+  for d in depths:
+    yield ('deep widgets', d, '\n'.join(widget_tree_lines(d, d, 1, 10)) + '\n')
+  for d in depths:
+    yield ('deep menu', d, deep_menu(d))
+  for w in widths:
+    yield ('wide widgets', w, '\n'.join(widget_tree_lines(w, 1, w, 10)) + '\n')
+  for w in widths:
+    yield ('wide menu', w, wide_menu(w))
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Benchmark deep and wide layout trees')
+  parser.add_argument('-d', '--depths', dest='depths', type=int, nargs='+', default=[100, 500, 1000, 2000],
+    help='Nesting depths to test')
+  parser.add_argument('-w', '--widths', dest='widths', type=int, nargs='+', default=[1000, 10000, 50000],
+    help='Numbers of siblings to test')
+  parser.add_argument('--json', dest='json', action='store_true', help='Print results as JSON')
+  args = parser.parse_args()
+
+  print('Recursion limit: {}'.format(sys.getrecursionlimit()), file=sys.stderr)
+
+  results = []
+  for name, size, spec in cases(args.depths, args.widths):
+    times = time_layout(spec)
+    results.append({'case': name, 'size': size, 'spec_bytes': len(spec), 'times': times})
+    if not args.json:
+      if 'error' in times:
+        print('{:13} {:6d}  failed: {}'.format(name, size, times['error']))
+      else:
+        print('{:13} {:6d}  {}'.format(name, size, '  '.join('{} {:.1f}'.format(p, times[p] * 1000) for p in PHASES)))
+      sys.stdout.flush()
+
+  if args.json:
+    print(json.dumps(results, indent=1, sort_keys=True))
+
+
+if __name__ == '__main__':
+  main()
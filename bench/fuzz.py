@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+
+'''
+Check that the layout spec parser scales linearly on pathological and random input.
+
+Each generator produces a spec of roughly the requested size that targets one
+of the parser's regular expressions or data structures. The specs are parsed
+at doubling sizes and the growth of the parse time is fitted on a log-log
+scale. A generator fails if its exponent exceeds the limit or any parse
+exceeds the time budget. Parse errors are expected for malformed input but
+any other exception is reported as a crash.
+
+  python -m bench.fuzz
+  python -m bench.fuzz -k table --max-size 200000
+'''
+
+from __future__ import print_function
+
+import sys
+import os
+import re
+import math
+import json
+import random
+import argparse
+import timeit
+
+from guidoc import guidoc as gd
+from bench.specgen import widget_tree_lines, render_grid_table, grid_cells
+
+
+def long_params(n):
+  return "w(Label | text='{}')\n".format('x' * n)
+
+def unclosed_params(n):
+  return "w(Label | text='{}'\n".format('x' * n)
+
+def spaced_params(n):
+  return 'w(Label |{}x\n'.format(' ' * n)
+
+def unbalanced_parens(n):
+  return 'w(Label | text={}\n'.format('(' * n)
+
+def nested_parens(n):
+  return 'w(Label | text={}{})\n'.format('(' * (n // 2), ')' * (n // 2))
+
+def spaced_layout(n):
+  return 'w(Label) <grid |{}x\n'.format(' ' * n)
+
+def repeated_layout(n):
+  return 'w(Label) {}>\n'.format('<grid|' * (n // 6))
+
+def open_brackets(n):
+  return '[{}\n'.format(' ' * n)
+
+def repeated_brackets(n):
+  return '{}\nw(Label)\n'.format('[' * n)
+
+def spaced_comment(n):
+  return 'w(Label){}x\n'.format(' ' * n)
+
+def repeated_comment(n):
+  return "w(Label | text='{}')\n".format('#' * n)
+
+def deep_indent(n):
+  return '{}w(Label)\n'.format(' ' * n)
+
+def deep_tree(n):
+  # A chain of containers. The spec size grows with the square of the depth.
+  depth = max(int(math.sqrt(n)), 1)
+  return '\n'.join(widget_tree_lines(depth, depth, 1, 10)) + '\n'
+
+def many_widgets(n):
+  return '\n'.join(widget_tree_lines(max(n // 30, 1), 3, 20, 10)) + '\n'
+
+def menu_quote(n):
+  return '[menu]\n&File\n  "{}\n'.format('a' * n)
+
+def menu_spaced(n):
+  return '[menu]\n&File\n  *{}"{}\n'.format(' ' * (n // 2), 'a' * (n // 2))
+
+def menu_params(n):
+  return "[menu]\n&File\n  Item{}command=self.quit\n".format(' ' * n)
+
+def huge_table(n):
+  # Square table with about n characters in the table and widget list
+  side = max(int(math.sqrt(n / 30.0)), 2)
+  cells = grid_cells(side, side, side, prefix='c')
+  names = sorted(set(c for r in cells for c in r))
+  lines = ['frm(Frame)']
+  lines.extend('  {}(Label)'.format(c) for c in names)
+  lines.extend(['', '[grid frm]', ''])
+  lines.extend(render_grid_table(cells))
+  return '\n'.join(lines) + '\n'
+
+
+# Characters that are significant to the parser
+FUZZ_ALPHABET = '()[]<>|#=,\'"&*-. \t\n' + 'abcw_1'
+FUZZ_TOKENS = ['w(Label', ' | ', 'text=', '<grid', '<pack|', '>', ')', '[menu]', '[grid w]', '[widgets]',
+  '&File', '----', '  ', '    ', '\n', '\n', '#', '+---+', '| a |']
+
+def random_spec(n, seed=0):
+  '''Generate a random spec from characters and tokens that are significant to the parser
+
+  Specs from odd seeds start in a menu section where every line is accepted
+  so that parsing isn't cut short by the first syntax error.
+  '''
+  rng = random.Random(seed)
+  parts = ['[menu]\n'] if seed % 2 == 1 else []
+  size = 0
+  while size < n:
+    p = rng.choice(FUZZ_TOKENS) if rng.random() < 0.5 else rng.choice(FUZZ_ALPHABET) * rng.randint(1, 8)
+    parts.append(p)
+    size += len(p)
+  return ''.join(parts)
+
+
+GENERATORS = [
+  ('long_params', long_params),
+  ('unclosed_params', unclosed_params),
+  ('spaced_params', spaced_params),
+  ('unbalanced_parens', unbalanced_parens),
+  ('nested_parens', nested_parens),
+  ('spaced_layout', spaced_layout),
+  ('repeated_layout', repeated_layout),
+  ('open_brackets', open_brackets),
+  ('repeated_brackets', repeated_brackets),
+  ('spaced_comment', spaced_comment),
+  ('repeated_comment', repeated_comment),
+  ('deep_indent', deep_indent),
+  ('deep_tree', deep_tree),
+  ('many_widgets', many_widgets),
+  ('menu_quote', menu_quote),
+  ('menu_spaced', menu_spaced),
+  ('menu_params', menu_params),
+  ('huge_table', huge_table),
+]
+
+
+def time_parse(spec, repeat):
+  '''Time parsing a spec
+  Returns:
+    tuple: Fastest time in seconds and the exception raised by a crash or None
+  '''
+  best = None
+  # Discard the warnings docutils prints for malformed tables
+  stderr = sys.stderr
+  sys.stderr = open(os.devnull, 'w')
+  try:
+    for _ in range(repeat):
+      start = timeit.default_timer()
+      try:
+        gd.parse_layout_spec(spec)
+      except gd.LayoutError:
+        pass
+      except Exception as e:
+        return (timeit.default_timer() - start, e)
+      elapsed = timeit.default_timer() - start
+      best = elapsed if best is None else min(best, elapsed)
+  finally:
+    sys.stderr.close()
+    sys.stderr = stderr
+  return (best, None)
+
+
+def scaling_exponent(sizes, times):
+  '''Fit the exponent k of time = c * size**k by least squares on a log-log scale'''
+  xs = [math.log(s) for s in sizes]
+  ys = [math.log(max(t, 1e-7)) for t in times]
+  mx = sum(xs) / len(xs)
+  my = sum(ys) / len(ys)
+  sxx = sum((x - mx) ** 2 for x in xs)
+  if sxx == 0:
+    return 0.0
+  return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sxx
+
+
+def sweep(gen, sizes, repeat, budget):
+  '''Parse the specs from a generator at each size
+  Returns:
+    dict: Spec sizes, parse times, fitted exponent, and any problems found
+  '''
+  result = {'bytes': [], 'times': [], 'problems': []}
+  for n in sizes:
+    spec = gen(n)
+    t, crash = time_parse(spec, repeat)
+    result['bytes'].append(len(spec))
+    result['times'].append(t)
+    if crash is not None:
+      result['problems'].append('crashed at {} bytes: {}: {}'.format(len(spec), crash.__class__.__name__, crash))
+      break
+    if t > budget:
+      result['problems'].append('{:.3f} s at {} bytes exceeds the {} s budget'.format(t, len(spec), budget))
+      break
+
+  if len(result['times']) > 1:
+    result['exponent'] = scaling_exponent(result['bytes'], result['times'])
+  return result
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Check that the layout parser scales linearly on pathological input')
+  parser.add_argument('-k', dest='pattern', help='Only run generators matching a regular expression')
+  parser.add_argument('--min-size', dest='min_size', type=int, default=4000, help='Smallest spec size in bytes')
+  parser.add_argument('--max-size', dest='max_size', type=int, default=128000, help='Largest spec size in bytes')
+  parser.add_argument('-r', '--repeat', dest='repeat', type=int, default=3, help='Parses of each spec')
+  parser.add_argument('--budget', dest='budget', type=float, default=2.0,
+    help='Seconds allowed for any one parse (default 2)')
+  parser.add_argument('--max-exponent', dest='max_exponent', type=float, default=1.3,
+    help='Largest allowed growth exponent of parse time (default 1.3)')
+  parser.add_argument('--random', dest='random', type=int, default=20, help='Number of random specs to try')
+  parser.add_argument('--seed', dest='seed', type=int, default=0, help='First seed for the random specs')
+  parser.add_argument('--json', dest='json', action='store_true', help='Print results as JSON')
+  args = parser.parse_args()
+
+  sizes = []
+  n = args.min_size
+  while n <= args.max_size:
+    sizes.append(n)
+    n *= 2
+
+  gens = list(GENERATORS)
+  for i in range(args.random):
+    seed = args.seed + i
+    gens.append(('random_{}'.format(seed), lambda n, seed=seed: random_spec(n, seed)))
+  if args.pattern:
+    gens = [(name, g) for name, g in gens if re.search(args.pattern, name)]
+
+  results = {}
+  failures = 0
+  for name, gen in gens:
+    r = sweep(gen, sizes, args.repeat, args.budget)
+    if r.get('exponent', 0.0) > args.max_exponent:
+      r['problems'].append('parse time grows as size**{:.2f}'.format(r['exponent']))
+    results[name] = r
+    failures += 1 if len(r['problems']) > 0 else 0
+
+    if not args.json:
+      print('{:18} {:>8} bytes {:9.2f} ms  exponent {:>5}  {}'.format(name, r['bytes'][-1], r['times'][-1] * 1000,
+        '{:.2f}'.format(r['exponent']) if 'exponent' in r else '-', '; '.join(r['problems']) or 'ok'))
+      sys.stdout.flush()
+
+  if args.json:
+    print(json.dumps(results, indent=1, sort_keys=True))
+
+  if failures > 0:
+    print('\n{} generator(s) failed'.format(failures), file=sys.stderr)
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
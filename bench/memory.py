@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+'''
+Measure the memory used by the parse tree of large layout specs.
+
+The deep size of the parsed sections is computed on all Python versions.
+Allocation counts and peak memory are also measured when tracemalloc is
+available.
+'''
+
+from __future__ import print_function
+
+import sys
+import gc
+import json
+import argparse
+import timeit
+
+from guidoc import guidoc as gd
+from bench.specgen import generate_spec
+
+try:
+  import tracemalloc
+except ImportError:
+  tracemalloc = None
+
+
+def deep_size(root):
+  '''Compute the total size of an object and everything it references
+
+  Classes, modules, and functions are not followed. Each object is counted once.
+
+  Args:
+    root: Object to measure
+  Returns:
+    tuple: Total bytes and number of objects
+  '''
+  skip = (type, type(sys), type(deep_size))
+  seen = set()
+  stack = [root]
+  size = 0
+  while stack:
+    o = stack.pop()
+    if id(o) in seen or isinstance(o, skip):
+      continue
+    seen.add(id(o))
+    size += sys.getsizeof(o)
+    stack.extend(gc.get_referents(o))
+  return size, len(seen)
+
+
+def measure(spec, menu_spec):
+  '''Measure the parse trees of a widget spec and a menu spec
+  Returns:
+    dict: Measurements for the parsed sections
+  '''
+  results = {}
+  for name, text in (('widgets', spec), ('menus', menu_spec)):
+    gc.collect()
+    if tracemalloc is not None:
+      tracemalloc.start()
+      before = tracemalloc.take_snapshot()
+
+    start = timeit.default_timer()
+    sections = gd.parse_layout_spec(text)
+    elapsed = timeit.default_timer() - start
+
+    r = {'parse_ms': elapsed * 1000}
+    if tracemalloc is not None:
+      after = tracemalloc.take_snapshot()
+      r['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+      stats = after.compare_to(before, 'filename')
+      r['blocks'] = sum(s.count_diff for s in stats)
+      tracemalloc.stop()
+
+    r['bytes'], r['objects'] = deep_size(sections)
+    results[name] = r
+    del sections
+
+  return results
+
+
+def menu_width(n):
+  '''Width of a three level menu with about half as many items as n widgets'''
+  return max(int(round((n / 2.0) ** (1 / 3.0))), 2)
+
+
+def menu_items(n):
+  '''Number of items in the menu spec generated for n widgets'''
+  width = menu_width(n)
+  return width + width ** 2 + width ** 3
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Measure the memory used by parsed layout specs')
+  parser.add_argument('-n', '--widgets', dest='sizes', type=int, nargs='+', default=[1000, 10000, 50000],
+    help='Number of widgets in each spec')
+  parser.add_argument('--json', dest='json', action='store_true', help='Print results as JSON')
+  args = parser.parse_args()
+
+  results = {}
+  for n in args.sizes:
+    spec = generate_spec(widgets=n, depth=4, fanout=20, param_len=20)
+    menu_spec = generate_spec(widgets=0, menu_depth=3, menu_width=menu_width(n))
+    results[n] = measure(spec, menu_spec)
+
+  if args.json:
+    print(json.dumps(results, indent=1, sort_keys=True))
+    return
+
+  print('{:>8} {:>8} {:>12} {:>10} {:>9} {:>10} {:>10}'.format('widgets', 'tree', 'bytes', 'objects', 'bytes/n',
+    'blocks', 'parse ms'))
+  for n in sorted(results):
+    for name in ('widgets', 'menus'):
+      r = results[n][name]
+      count = n if name == 'widgets' else menu_items(n)
+      print('{:8d} {:>8} {:12d} {:10d} {:9.1f} {:>10} {:10.1f}'.format(n, name, r['bytes'], r['objects'],
+        r['bytes'] / float(count), r.get('blocks', '-'), r['parse_ms']))
+
+
+if __name__ == '__main__':
+  main()
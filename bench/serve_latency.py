@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+'''
+Compare the latency of warm "guidoc serve" requests against cold command line runs.
+'''
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+import timeit
+
+GUIDOC_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'guidoc', 'guidoc.py')
+
+SPEC = '''
+btnA(Button | text='Button A')
+btnB(Button | text='Button B')
+frmX(Frame)
+  lbl1(Label | text='one')
+  lbl2(Label | text='two')
+lblStatus(Label | relief='sunken') <grid | sticky='nsew'>
+
+[grid]
+
++------+------+------+
+| btnA | btnB | frmX |
++------+------+------+
+| lblStatus          |
++--------------------+
+
+[menu]
+&File
+  &Open command=self.open
+  &Save command=self.save
+'''
+
+
+def summarize(times):
+  '''Summarize a list of durations in seconds as milliseconds'''
+  times = sorted(times)
+  return {'min': times[0] * 1000, 'median': times[len(times) // 2] * 1000,
+    'mean': sum(times) / len(times) * 1000, 'max': times[-1] * 1000}
+
+
+def time_cold(runs):
+  '''Time complete command line runs that each generate one layout'''
+  fd, spec_file = tempfile.mkstemp(suffix='.guidoc')
+  with os.fdopen(fd, 'w') as fh:
+    fh.write(SPEC)
+
+  times = []
+  try:
+    with open(os.devnull, 'w') as null:
+      for _ in range(runs):
+        start = timeit.default_timer()
+        subprocess.check_call([sys.executable, GUIDOC_SCRIPT, '-i', spec_file], stdout=null)
+        times.append(timeit.default_timer() - start)
+  finally:
+    os.unlink(spec_file)
+
+  return times
+
+
+def time_warm(runs, vary):
+  '''Time round trips to a running server after it has answered one request'''
+  server = subprocess.Popen([sys.executable, GUIDOC_SCRIPT, 'serve'], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+  def request(req):
+    server.stdin.write((json.dumps(req) + '\n').encode('utf-8'))
+    server.stdin.flush()
+    response = json.loads(server.stdout.readline().decode('utf-8'))
+    if not response['ok']:
+      raise RuntimeError(response['error']['message'])
+
+  times = []
+  try:
+    request({'spec': SPEC}) # Warm up
+    for i in range(runs):
+      # A comment makes each spec unique so the result cache is bypassed
+      spec = SPEC + '# {}\n'.format(i) if vary else SPEC
+      start = timeit.default_timer()
+      request({'id': i, 'spec': spec})
+      times.append(timeit.default_timer() - start)
+
+    request({'command': 'shutdown'})
+  finally:
+    server.stdin.close()
+    server.wait()
+
+  return times
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Compare warm server requests against cold command line runs')
+  parser.add_argument('-n', '--runs', dest='runs', type=int, default=20, help='Number of cold runs')
+  parser.add_argument('-w', '--warm-runs', dest='warm_runs', type=int, default=200, help='Number of warm requests')
+  parser.add_argument('--json', dest='json', action='store_true', help='Print results as JSON')
+  args = parser.parse_args()
+
+  results = {
+    'cold cli': summarize(time_cold(args.runs)),
+    'warm server': summarize(time_warm(args.warm_runs, True)),
+    'warm server (cached)': summarize(time_warm(args.warm_runs, False)),
+  }
+
+  if args.json:
+    print(json.dumps(results, indent=1, sort_keys=True))
+  else:
+    print('{:22} {:>9} {:>9} {:>9} {:>9}'.format('ms', 'min', 'median', 'mean', 'max'))
+    for name in ('cold cli', 'warm server', 'warm server (cached)'):
+      r = results[name]
+      print('{:22} {:9.2f} {:9.2f} {:9.2f} {:9.2f}'.format(name, r['min'], r['median'], r['mean'], r['max']))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+
+'''
+Measure the memory of view instances generated with and without __slots__.
+
+A view class is generated for specs of several sizes. The same class with its
+__slots__ declaration removed is the baseline. Instances are built with the
+FakeTk backend so that only the memory of the Python objects is compared. The
+widgets themselves are identical in both cases so the per-instance overhead
+is the size of the view object and its instance dict. The total allocations
+for building the instances are also measured when tracemalloc is available.
+
+  python -m bench.slots
+  python -m bench.slots -n 10 100 1000 -i 500 --handles
+'''
+
+from __future__ import print_function
+
+import sys
+import gc
+import json
+import argparse
+
+from guidoc import guidoc as gd
+from bench.specgen import generate_spec
+
+try:
+  import tracemalloc
+except ImportError:
+  tracemalloc = None
+
+
+def view_classes(spec, handles):
+  '''Compile a slotted view class and a baseline without slots
+  Args:
+    spec (str): Layout specification
+    handles (bool): Add the widget handle table
+  Returns:
+    tuple: FakeTk backend, slotted class, and baseline class
+  '''
+  lib_prefix = gd.find_tkinter_name()
+  code = gd.create_layout_class(spec, 'View', lib_prefix=lib_prefix, deterministic=True, handles=handles)
+  lines = code.split('\n')
+  start = [i for i, l in enumerate(lines) if l.startswith('  __slots__')][0]
+  end = start + 1
+  while lines[end].startswith('    '): # Wrapped names
+    end += 1
+  plain = '\n'.join(lines[:start] + lines[end:])
+
+  fake = gd.FakeTk()
+  classes = []
+  for c in (code, plain):
+    namespace = {lib_prefix: fake}
+    exec(compile(c, '<guidoc>', 'exec'), namespace)
+    classes.append(namespace['View'])
+  return (fake, classes[0], classes[1])
+
+
+def instance_bytes(view):
+  '''Size of a view object and its instance dict'''
+  size = sys.getsizeof(view)
+  if hasattr(view, '__dict__'):
+    size += sys.getsizeof(view.__dict__)
+  return size
+
+
+def build(cls, root, instances):
+  '''Build view instances
+  Returns:
+    tuple: List of views and the bytes allocated per view or None without tracemalloc
+  '''
+  gc.collect()
+  if tracemalloc is not None:
+    tracemalloc.start()
+  views = [cls(root) for _ in range(instances)]
+  allocated = None
+  if tracemalloc is not None:
+    allocated = tracemalloc.get_traced_memory()[0] / float(instances)
+    tracemalloc.stop()
+  return (views, allocated)
+
+
+def measure(widgets, instances, handles):
+  '''Compare the instances of the view classes for one spec
+  Returns:
+    dict: Measurements for the 'slots' and 'dict' classes
+  '''
+  spec = generate_spec(widgets=widgets, depth=3, fanout=10, param_len=10)
+  fake, slotted, plain = view_classes(spec, handles)
+  root = fake.Tk()
+
+  r = {'widgets': widgets}
+  for name, cls in (('slots', slotted), ('dict', plain)):
+    views, allocated = build(cls, root, instances)
+    r[name] = {'instance_bytes': instance_bytes(views[0])}
+    if allocated is not None:
+      r[name]['allocated_bytes'] = allocated
+    root.children.clear()
+    del views
+  return r
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Measure the memory of view classes with and without __slots__')
+  parser.add_argument('-n', '--widgets', dest='sizes', type=int, nargs='+', default=[10, 50, 200],
+    help='Number of widgets in each spec')
+  parser.add_argument('-i', '--instances', dest='instances', type=int, default=200, help='Views built for each class')
+  parser.add_argument('--handles', dest='handles', action='store_true', help='Add the widget handle table')
+  parser.add_argument('--json', dest='json', action='store_true', help='Print results as JSON')
+  args = parser.parse_args()
+
+  results = [measure(n, args.instances, args.handles) for n in args.sizes]
+
+  if args.json:
+    print(json.dumps(results, indent=1, sort_keys=True))
+    return
+
+  print('{:>8} {:>14} {:>14} {:>16} {:>16}'.format('widgets', 'slots bytes', 'dict bytes', 'slots alloc/view',
+    'dict alloc/view'))
+  for r in results:
+    print('{:8d} {:14d} {:14d} {:>16} {:>16}'.format(r['widgets'], r['slots']['instance_bytes'],
+      r['dict']['instance_bytes'],
+      *['{:.0f}'.format(r[k]['allocated_bytes']) if 'allocated_bytes' in r[k] else '-' for k in ('slots', 'dict')]))
+
+
+if __name__ == '__main__':
+  main()
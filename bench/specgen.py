@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+
+'''
+Synthetic layout spec generator for benchmarks.
+
+Specs are generated along several independent axes so that the scaling of
+each part of guidoc can be measured in isolation.
+'''
+
+from __future__ import print_function
+
+import random
+
+
+def widget_tree_lines(widgets, depth, fanout, param_len, prefix='w', indent=0):
+  '''Generate the lines of a widget tree
+
+  Containers are Frames and leaves alternate between Labels and Buttons.
+  The tree is filled breadth first so that it reaches the requested depth
+  only when there are enough widgets.
+
+  Args:
+    widgets (int): Total number of widgets
+    depth (int): Maximum depth of the tree. 1 is a flat list.
+    fanout (int): Maximum number of children in each container
+    param_len (int): Length of the text parameter for each leaf widget
+    prefix (str, optional): Prefix for the widget names
+    indent (int, optional): Indentation of the top level
+  Returns:
+    list(str): Spec lines for the widget tree
+  '''
+  # Assign each widget a parent breadth first
+  children = {None: []}
+  levels = {None: 0}
+  queue = [None]
+  count = 0
+  while count < widgets and queue:
+    parent = queue.pop(0)
+    limit = fanout if parent is not None else max(fanout, 1)
+    while len(children[parent]) < limit and count < widgets:
+      name = '{}{}'.format(prefix, count)
+      count += 1
+      children[parent].append(name)
+      children[name] = []
+      levels[name] = levels[parent] + 1
+      if levels[name] < depth:
+        queue.append(name)
+
+  text = 'x' * max(param_len - 8, 0)
+  lines = []
+  stack = [(c, 0) for c in reversed(children[None])]
+  while stack:
+    name, level = stack.pop()
+    pad = ' ' * (indent + level * 2)
+    if len(children[name]) > 0:
+      lines.append("{}{}(Frame | padx=2)".format(pad, name))
+      stack.extend((c, level + 1) for c in reversed(children[name]))
+    elif len(lines) % 2 == 0:
+      lines.append("{}{}(Label | text='{}')".format(pad, name, text))
+    else:
+      lines.append("{}{}(Button | text='{}') <pack | side='left'>".format(pad, name, text))
+  return lines
+
+
+def render_grid_table(cells):
+  '''Render a matrix of cell names as a reStructuredText grid table
+
+  Cells spanning several rows or columns repeat their name in every
+  position they cover.
+
+  Args:
+    cells (list(list(str))): Cell names indexed by row and column
+  Returns:
+    list(str): Lines of the grid table
+  '''
+  rows = len(cells)
+  cols = len(cells[0])
+  width = max(len(n) for r in cells for n in r) + 2
+
+  def cell(r, c):
+    if 0 <= r < rows and 0 <= c < cols:
+      return cells[r][c]
+    return None
+
+  def hborder(r, c): # Border above row r in column c
+    return cell(r - 1, c) != cell(r, c)
+
+  def vborder(r, c): # Border left of column c in row r
+    return cell(r, c - 1) != cell(r, c)
+
+  def junction(r, c): # Corner above row r and left of column c
+    left = hborder(r, c - 1) and c > 0
+    right = hborder(r, c) and c < cols
+    up = vborder(r - 1, c) and r > 0
+    down = vborder(r, c) and r < rows
+    if (left or right) and (up or down):
+      return '+'
+    elif left or right:
+      return '-' if left and right else '+'
+    elif up or down:
+      return '|' if up and down else '+'
+    return ' '
+
+  origins = set()
+  lines = []
+  for r in range(rows + 1):
+    # Border line above row r
+    line = []
+    for c in range(cols + 1):
+      line.append(junction(r, c))
+      if c < cols:
+        line.append('-' * width if hborder(r, c) else ' ' * width)
+    lines.append(''.join(line))
+
+    if r == rows:
+      break
+
+    # Content line for row r
+    line = []
+    c = 0
+    while c < cols:
+      line.append('|' if vborder(r, c) else ' ')
+      name = cells[r][c]
+      span = 1
+      while c + span < cols and cells[r][c + span] == name:
+        span += 1
+      field = width * span + span - 1
+      if name not in origins:
+        origins.add(name)
+        line.append((' ' + name).ljust(field))
+      else:
+        line.append(' ' * field)
+      c += span
+    line.append('|')
+    lines.append(''.join(line))
+
+  return lines
+
+
+def grid_cells(rows, cols, spans, prefix='g', seed=0):
+  '''Lay out grid cells with some of them spanning two rows or columns
+  Args:
+    rows (int): Number of rows
+    cols (int): Number of columns
+    spans (int): Number of spanning cells to attempt
+    prefix (str, optional): Prefix for the widget names
+    seed (int, optional): Random seed for the span positions
+  Returns:
+    list(list(str)): Cell names indexed by row and column
+  '''
+  rng = random.Random(seed)
+  cells = [[None] * cols for _ in range(rows)]
+  count = [0]
+
+  def new_name():
+    count[0] += 1
+    return '{}{}'.format(prefix, count[0] - 1)
+
+  for i in range(spans):
+    r = rng.randrange(rows)
+    c = rng.randrange(cols)
+    if i % 2 == 0: # Column span
+      if c + 1 < cols and cells[r][c] is None and cells[r][c + 1] is None:
+        cells[r][c] = cells[r][c + 1] = new_name()
+    else: # Row span
+      if r + 1 < rows and cells[r][c] is None and cells[r + 1][c] is None:
+        cells[r][c] = cells[r + 1][c] = new_name()
+
+  for r in range(rows):
+    for c in range(cols):
+      if cells[r][c] is None:
+        cells[r][c] = new_name()
+
+  return cells
+
+
+def menu_lines(depth, width, param_len, indent=0, label='m'):
+  '''Generate the lines of a menu tree
+  Args:
+    depth (int): Levels of cascading menus
+    width (int): Items on each menu
+    param_len (int): Approximate length of the parameters for each command
+    indent (int, optional): Indentation of this level
+    label (str, optional): Label prefix for this level
+  Returns:
+    list(str): Spec lines for the menu tree
+  '''
+  lines = []
+  lambda_text = 'x' * max(param_len - 30, 0)
+  for i in range(width):
+    item = '{}{}'.format(label, i)
+    pad = ' ' * indent
+    if depth > 1:
+      lines.append('{}&{}'.format(pad, item))
+      lines.extend(menu_lines(depth - 1, width, param_len, indent + 2, item + '_'))
+    elif i % 5 == 4:
+      lines.append('{}----'.format(pad))
+    else:
+      lines.append("{}{} command=lambda: self.run('{}')".format(pad, item, lambda_text))
+  return lines
+
+
+def generate_spec(widgets=20, depth=3, fanout=5, grid_rows=0, grid_cols=0, spans=0, menu_depth=0, menu_width=0,
+  param_len=10, seed=0):
+  '''Generate a synthetic layout spec
+  Args:
+    widgets (int, optional): Number of widgets in the packed widget tree
+    depth (int, optional): Maximum depth of the widget tree
+    fanout (int, optional): Maximum children of each container
+    grid_rows (int, optional): Rows in a gridded frame. No grid is generated when 0.
+    grid_cols (int, optional): Columns in the gridded frame
+    spans (int, optional): Number of spanning grid cells to attempt
+    menu_depth (int, optional): Levels of cascading menus. No menu is generated when 0.
+    menu_width (int, optional): Items on each menu
+    param_len (int, optional): Length of widget and menu parameter strings
+    seed (int, optional): Random seed
+  Returns:
+    str: The layout spec
+  '''
+  lines = widget_tree_lines(widgets, depth, fanout, param_len)
+
+  if grid_rows > 0 and grid_cols > 0:
+    cells = grid_cells(grid_rows, grid_cols, spans, seed=seed)
+    names = []
+    for r in cells:
+      for n in r:
+        if n not in names:
+          names.append(n)
+
+    lines.append('frmGrid(Frame)')
+    lines.extend("  {}(Label | text='{}')".format(n, n) for n in names)
+    lines.append('')
+    lines.append('[grid frmGrid]')
+    lines.append('')
+    lines.extend(render_grid_table(cells))
+    lines.append('')
+
+  if menu_depth > 0 and menu_width > 0:
+    lines.append('')
+    lines.append('[menu]')
+    lines.extend(menu_lines(menu_depth, menu_width, param_len))
+
+  return '\n'.join(lines) + '\n'
+
+
+if __name__ == '__main__':
+  print(generate_spec(widgets=8, depth=3, fanout=3, grid_rows=4, grid_cols=4, spans=6, menu_depth=2, menu_width=3))
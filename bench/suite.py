@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+
+'''
+Time each phase of layout processing on synthetic specs and gate regressions
+against a saved baseline.
+
+  python -m bench.suite run -o baseline.json
+  python -m bench.suite run --compare baseline.json
+  python -m bench.suite compare baseline.json current.json
+'''
+
+from __future__ import print_function
+
+import sys
+import re
+import json
+import argparse
+import platform
+import timeit
+
+from guidoc import guidoc as gd
+from bench.specgen import generate_spec
+
+try:
+  import Tkinter as tk
+except ImportError:
+  import tkinter as tk
+
+
+# Each axis is swept while the others are held at small values
+CASES = [
+  ('widgets-100',   dict(widgets=100, depth=3, fanout=10)),
+  ('widgets-1000',  dict(widgets=1000, depth=3, fanout=10)),
+  ('widgets-5000',  dict(widgets=5000, depth=4, fanout=10)),
+  ('depth-10',      dict(widgets=100, depth=10, fanout=1)),
+  ('depth-50',      dict(widgets=100, depth=50, fanout=1)),
+  ('fanout-2',      dict(widgets=500, depth=20, fanout=2)),
+  ('fanout-100',    dict(widgets=500, depth=2, fanout=100)),
+  ('grid-5x5',      dict(widgets=5, grid_rows=5, grid_cols=5, spans=4)),
+  ('grid-20x20',    dict(widgets=5, grid_rows=20, grid_cols=20, spans=40)),
+  ('grid-40x40',    dict(widgets=5, grid_rows=40, grid_cols=40, spans=200)),
+  ('menu-2x10',     dict(widgets=5, menu_depth=2, menu_width=10)),
+  ('menu-4x6',      dict(widgets=5, menu_depth=4, menu_width=6)),
+  ('params-100',    dict(widgets=100, param_len=100, menu_depth=1, menu_width=50)),
+  ('params-10000',  dict(widgets=100, param_len=10000, menu_depth=1, menu_width=50)),
+]
+
+# Cases run with --quick
+QUICK_CASES = ['widgets-100', 'widgets-1000', 'depth-50', 'fanout-100', 'grid-20x20', 'menu-4x6', 'params-10000']
+
+PHASES = ['parse_layout_spec', 'GridSection.parse', 'passes', 'codegen', 'compile_method', 'fake_build',
+  'tk_build']
+
+
+def open_display():
+  '''Create a hidden Tk root window
+  Returns:
+    Tk root or None when no display is available
+  '''
+  try:
+    root = tk.Tk()
+  except tk.TclError:
+    return None
+  root.withdraw()
+  return root
+
+
+def time_phases(spec, repeat, root=None):
+  '''Time the processing phases of a layout spec
+
+  Each repetition starts from freshly parsed sections because applying grid
+  attributes modifies the widget tree.
+
+  Args:
+    spec (str): Layout specification
+    repeat (int): Number of times to run each phase
+    root (Tk, optional): Tk root for timing the widget build. Skipped when None. The Python side of
+      the build is always timed with a FakeTk backend.
+  Returns:
+    dict: Lists of durations in seconds keyed by phase name
+  '''
+  timer = timeit.default_timer
+  lib_prefix = gd.find_tkinter_name()
+  times = dict((p, []) for p in PHASES)
+
+  for _ in range(repeat):
+    start = timer()
+    gd.parse_layout_spec(spec, require_docutils=True)
+    times['parse_layout_spec'].append(timer() - start)
+
+    sections = gd.split_layout_spec(spec)
+    grids = [s for s in sections if s.name == 'grid']
+    for s in sections:
+      if s.name != 'grid':
+        s.parse(require_docutils=True)
+
+    start = timer()
+    for g in grids:
+      g.parse(require_docutils=True)
+    times['GridSection.parse'].append(timer() - start)
+
+    widget_sec = [s for s in sections if s.name == 'widgets'][0]
+    menus = [s for s in sections if s.name == 'menu']
+
+    start = timer()
+    gd.PassManager().run(widget_sec, grids)
+    times['passes'].append(timer() - start)
+
+    start = timer()
+    code = gd.generate_layout_method(widget_sec, menus, '_build_widgets', 'self', lib_prefix, deterministic=True)
+    times['codegen'].append(timer() - start)
+
+    start = timer()
+    method = gd.compile_method(code, '_build_widgets')
+    times['compile_method'].append(timer() - start)
+
+    fake = gd.FakeTk()
+    fake_method = gd.compile_method(code, '_build_widgets', {lib_prefix: fake})
+    target = fake.Frame(fake.Tk())
+    start = timer()
+    fake_method(target)
+    times['fake_build'].append(timer() - start)
+
+    if root is not None:
+      cls = type('BenchFrame', (tk.Frame, object), {'_build_widgets': method, 'run': lambda self, *args: None})
+      frame = cls(root)
+      start = timer()
+      frame._build_widgets()
+      frame.update_idletasks()
+      times['tk_build'].append(timer() - start)
+      frame.destroy()
+
+  return dict((p, t) for p, t in times.items() if len(t) > 0)
+
+
+def summarize(times):
+  '''Summarize a list of durations in seconds'''
+  times = sorted(times)
+  return {'min': times[0], 'median': times[len(times) // 2], 'max': times[-1]}
+
+
+def run_suite(names, repeat, log=None):
+  '''Run benchmark cases
+  Args:
+    names (list(str)): Names of the cases to run
+    repeat (int): Number of times to run each phase
+    log (file, optional): Progress is written here when provided
+  Returns:
+    dict: Results suitable for saving as a JSON baseline
+  '''
+  root = open_display()
+  params = dict(CASES)
+
+  results = {
+    'guidoc_bench': 1,
+    'guidoc': gd.__version__,
+    'python': platform.python_version(),
+    'platform': platform.platform(),
+    'repeat': repeat,
+    'display': root is not None,
+    'cases': {}
+  }
+
+  try:
+    for name in names:
+      spec = generate_spec(**params[name])
+      if log is not None:
+        print('{:14} {:7} lines'.format(name, spec.count('\n')), file=log)
+      phases = time_phases(spec, repeat, root)
+      results['cases'][name] = {
+        'params': params[name],
+        'spec_bytes': len(spec),
+        'phases': dict((p, summarize(t)) for p, t in phases.items())
+      }
+  finally:
+    if root is not None:
+      root.destroy()
+
+  return results
+
+
+def compare_results(baseline, current, threshold=0.2, floor=0.0005, stat='median'):
+  '''Compare benchmark results against a baseline
+
+  A phase has regressed when it is slower than the baseline by more than the
+  threshold fraction and by more than the floor in absolute terms. The floor
+  keeps timer noise in very fast phases from failing the comparison.
+
+  Args:
+    baseline (dict): Baseline results
+    current (dict): New results
+    threshold (float, optional): Allowed fractional slowdown
+    floor (float, optional): Slowdown in seconds that is always allowed
+    stat (str, optional): Statistic to compare. "min" or "median".
+  Returns:
+    list(tuple): (case, phase, baseline time, current time, ratio, regressed) for each phase in both results
+  '''
+  rows = []
+  for name in sorted(current['cases']):
+    if name not in baseline['cases']:
+      continue
+    old = baseline['cases'][name]['phases']
+    new = current['cases'][name]['phases']
+    for p in PHASES:
+      if p not in old or p not in new:
+        continue
+      t0 = old[p][stat]
+      t1 = new[p][stat]
+      ratio = t1 / t0 if t0 > 0 else float('inf')
+      regressed = t1 > t0 * (1.0 + threshold) and t1 - t0 > floor
+      rows.append((name, p, t0, t1, ratio, regressed))
+  return rows
+
+
+def print_results(results):
+  print('{:14} {:>22} {:>11} {:>11}'.format('case', 'phase', 'min ms', 'median ms'))
+  for name in sorted(results['cases']):
+    phases = results['cases'][name]['phases']
+    for p in PHASES:
+      if p in phases:
+        print('{:14} {:>22} {:11.3f} {:11.3f}'.format(name, p, phases[p]['min'] * 1000, phases[p]['median'] * 1000))
+
+
+def print_comparison(rows):
+  '''Print a comparison table
+  Returns:
+    int: Number of regressions
+  '''
+  print('{:14} {:>22} {:>11} {:>11} {:>7}'.format('case', 'phase', 'base ms', 'new ms', 'ratio'))
+  regressions = 0
+  for name, p, t0, t1, ratio, regressed in rows:
+    print('{:14} {:>22} {:11.3f} {:11.3f} {:7.2f}{}'.format(name, p, t0 * 1000, t1 * 1000, ratio,
+      '  REGRESSION' if regressed else ''))
+    if regressed:
+      regressions += 1
+  return regressions
+
+
+def load_results(fname):
+  with open(fname, 'r') as fh:
+    results = json.load(fh)
+  if 'guidoc_bench' not in results:
+    raise ValueError('{} is not a benchmark result file'.format(fname))
+  return results
+
+
+def main():
+  parser = argparse.ArgumentParser(description='Benchmark guidoc phases on synthetic layout specs')
+  subparsers = parser.add_subparsers(dest='command')
+  subparsers.required = True
+
+  run_p = subparsers.add_parser('run', help='Run the benchmarks')
+  run_p.add_argument('-q', '--quick', dest='quick', action='store_true', help='Run a reduced set of cases')
+  run_p.add_argument('-k', dest='pattern', help='Only run cases matching a regular expression')
+  run_p.add_argument('-r', '--repeat', dest='repeat', type=int, default=5, help='Repetitions of each phase')
+  run_p.add_argument('-o', '--output', dest='output', help='Save results to a JSON file')
+  run_p.add_argument('-c', '--compare', dest='baseline', help='Compare results against a JSON baseline')
+  run_p.add_argument('-l', '--list', dest='list', action='store_true', help='List the cases and exit')
+
+  cmp_p = subparsers.add_parser('compare', help='Compare saved results against a baseline')
+  cmp_p.add_argument('baseline', help='Baseline JSON results')
+  cmp_p.add_argument('current', help='New JSON results')
+
+  for p in (run_p, cmp_p):
+    p.add_argument('-t', '--threshold', dest='threshold', type=float, default=0.2,
+      help='Allowed fractional slowdown (default 0.2)')
+    p.add_argument('--floor', dest='floor', type=float, default=0.5,
+      help='Slowdown in milliseconds that is always allowed (default 0.5)')
+    p.add_argument('--stat', dest='stat', choices=('min', 'median'), default='median',
+      help='Statistic to compare (default median)')
+
+  args = parser.parse_args()
+
+  if args.command == 'compare':
+    baseline = load_results(args.baseline)
+    current = load_results(args.current)
+
+  else:
+    names = [n for n, _ in CASES]
+    if args.quick:
+      names = [n for n in names if n in QUICK_CASES]
+    if args.pattern:
+      names = [n for n in names if re.search(args.pattern, n)]
+
+    if args.list:
+      for n in names:
+        print(n)
+      sys.exit(0)
+
+    current = run_suite(names, args.repeat, sys.stderr)
+    if not current['display']:
+      print('No display available. Skipping Tk build.', file=sys.stderr)
+
+    if args.output:
+      with open(args.output, 'w') as fh:
+        json.dump(current, fh, indent=1, sort_keys=True)
+        fh.write('\n')
+
+    if not args.baseline:
+      print_results(current)
+      sys.exit(0)
+
+    baseline = load_results(args.baseline)
+
+  rows = compare_results(baseline, current, args.threshold, args.floor / 1000.0, args.stat)
+  regressions = print_comparison(rows)
+  if regressions > 0:
+    print('\n{} phase(s) regressed by more than {:.0%}'.format(regressions, args.threshold), file=sys.stderr)
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+  main()
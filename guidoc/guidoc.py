@@ -32,10 +32,21 @@ from __future__ import print_function
 
 import Tkinter as tk
 
+import os
 import re
+import collections
+import contextlib
+import glob
+import hashlib
+import importlib
+import inspect
+import itertools
+import json
 import sys
 import string
+import textwrap
 import types
+import timeit
 from datetime import datetime
 
 try:
@@ -44,6 +55,12 @@ try:
 except ImportError:
   have_docutils = False
 
+try:
+  import tracemalloc
+  have_tracemalloc = True
+except ImportError:
+  have_tracemalloc = False
+
 
 __version__ = '0.9.2'
 
@@ -64,6 +81,19 @@ class ParameterError(LayoutError):
   pass
 
 
+def intern_str(s):
+  '''Intern a string so that repeated names in a layout share one object
+  Args:
+    s (str): String to intern
+  Returns:
+    str: The interned string
+  '''
+  try:
+    return intern(s)
+  except TypeError: # Python 2 can't intern unicode
+    return s
+
+
 def indent(lines, spaces=0):
   '''Indent a line with leading spaces
   Args:
@@ -75,7 +105,7 @@ def indent(lines, spaces=0):
   for l in lines:
     yield ' '*spaces + l
 
-def parse_indented_list(lines, parse_func, class_name=None):
+def parse_indented_list(lines, parse_func, class_name=None, linenos=None):
   '''Parse an indented list of text lines into a tree
   
   The objects returned by the parse_func function must have a list attribute named 'children'
@@ -84,6 +114,8 @@ def parse_indented_list(lines, parse_func, class_name=None):
     lines (Sequence):           Sequence of text lines to parse
     parse_func (callable):      A function object that parses each line and returns a representative object
     class_name (str, optional): Name of class this layout is modifying. Used for better exception messages.
+    linenos (Sequence, optional): Line number of each line in the layout spec. Assigned to the 'lineno'
+      attribute of each object.
   Returns:
     List of parsed nodes for top level of the tree
   '''
@@ -93,11 +125,13 @@ def parse_indented_list(lines, parse_func, class_name=None):
   cur_level = nodes
   stack = [(cur_indent, cur_level)]
   
-  for l in lines:
+  for i, l in enumerate(lines):
     ls = l.lstrip()
     next_indent = len(l) - len(ls)
     
     n = parse_func(ls.rstrip(), class_name)
+    if linenos:
+      n.lineno = linenos[i]
     if cur_indent is None or next_indent == cur_indent:
       cur_level.append(n)
       cur_indent = next_indent
@@ -116,15 +150,18 @@ def parse_indented_list(lines, parse_func, class_name=None):
       
   return nodes
 
-def find_tkinter_name():
+def find_tkinter_name(glbls=None):
   '''Discover the name the Tkinter module has been imported under
+  Args:
+    glbls (dict, optional): Namespace to search. Defaults to the globals of this module.
   Returns:
     str: The name of the Tkinter library or None
   '''
-  import types
+  if glbls is None:
+    glbls = globals()
 
   # Get all global modules pointing to the Tkinter or tkinter package
-  m = [k for k,v in globals().iteritems() if type(v) == types.ModuleType and v.__name__ in ('Tkinter', 'tkinter')]
+  m = [k for k,v in glbls.iteritems() if type(v) == types.ModuleType and v.__name__ in ('Tkinter', 'tkinter')]
 
   if len(m) > 0:
     return m[0]
@@ -143,9 +180,120 @@ def lib_imports(glbls):
   return {k:glbls[k] for k in lib_names}
 
 
+def import_library(name):
+  '''Import the widget library for a library prefix
+  Args:
+    name (str): Library prefix without a trailing '.'. Names inside the Tkinter package like "ttk" are found.
+  Returns:
+    The module or None if it can't be imported
+  '''
+  if name in ('tkinter', 'Tkinter'):
+    return tk
+
+  for module_name in (name, 'tkinter.' + name):
+    try:
+      return importlib.import_module(module_name)
+    except ImportError:
+      pass
+  return None
+
+
+class SymbolTable(object):
+  '''Resolve widget classes to the names used for them in generated code
+
+  A kind is looked up in the library prefix module first and then in the Tkinter
+  module so that classes missing from a partial library like ttk still work. Kinds
+  that aren't found in either are left unqualified. A library prefix that isn't
+  visible to the namespace is imported. If that fails the prefix is applied to every
+  kind. Each kind is only resolved once.
+
+  Args:
+    lib_prefix (str, optional): Name of the library module for widget classes.
+      Defaults to the name Tkinter is imported under.
+    namespace (dict, optional): Namespace of the code using the layout. Its modules are
+      visible to the generated code.
+    libraries (dict, optional): Dictionary of user packages keyed by name
+  Attributes:
+    libraries (dict): Modules and packages visible to the generated code keyed by name
+    lib_prefix (str): Name of the library module without a trailing '.'
+    tk_name (str): Name of the Tkinter module or None
+  '''
+  def __init__(self, lib_prefix=None, namespace=None, libraries={}):
+    self.libraries = lib_imports(globals())
+    if namespace is not None:
+      self.libraries.update(lib_imports(namespace))
+    self.libraries.update(libraries)
+
+    self.tk_name = find_tkinter_name(libraries) or (find_tkinter_name(namespace) if namespace is not None else None) \
+      or find_tkinter_name()
+    if lib_prefix is None:
+      lib_prefix = self.tk_name
+    self.lib_prefix = lib_prefix.rstrip('.') if lib_prefix else ''
+
+    # The classes of the library are needed to know which ones fall back to Tkinter
+    if self.lib_prefix and self.lib_prefix not in self.libraries:
+      module = import_library(self.lib_prefix)
+      if module is not None:
+        self.libraries[self.lib_prefix] = module
+
+    # Only fall back to Tkinter when a library prefix is in use
+    self._search = [self.lib_prefix, self.tk_name] if self.lib_prefix else []
+    self._names = {}
+
+  def resolve(self, kind):
+    '''Get the name of a widget class for generated code
+    Args:
+      kind (str): Widget class from a layout spec
+    Returns:
+      str: The class name qualified with the module it was found in
+    '''
+    name = self._names.get(kind, None)
+    if name is None:
+      name = kind
+      if '.' in kind: # Already qualified
+        pass
+      elif self.lib_prefix and self.lib_prefix not in self.libraries:
+        name = '{}.{}'.format(self.lib_prefix, kind)
+      else:
+        for prefix in self._search:
+          if prefix in self.libraries and hasattr(self.libraries[prefix], kind):
+            name = '{}.{}'.format(prefix, kind)
+            break
+      self._names[kind] = name
+    return name
+
+
+# Symbol tables shared by the layouts in each module in LRU order
+_module_symbols = collections.OrderedDict()
+_max_module_symbols = 32
+
+def module_symbols(namespace, lib_prefix=None, libraries={}):
+  '''Get the SymbolTable shared by all layouts compiled in a module
+
+  The table is rebuilt when the namespace is replaced or its imported modules change.
+
+  Args:
+    namespace (dict): Globals of the module
+    lib_prefix (str, optional): Name of the library module for widget classes
+    libraries (dict, optional): Dictionary of user packages keyed by name
+  Returns:
+    SymbolTable: The table for the module, prefix, and libraries
+  '''
+  key = (namespace.get('__name__', None), lib_prefix, tuple(sorted((k, id(v)) for k, v in libraries.iteritems())))
+  imports = (id(namespace), tuple(sorted((k, id(v)) for k, v in lib_imports(namespace).iteritems())))
+  entry = _module_symbols.pop(key, None)
+  if entry is None or entry[0] != imports:
+    entry = (imports, SymbolTable(lib_prefix, namespace, libraries))
+  _module_symbols[key] = entry
+  if len(_module_symbols) > _max_module_symbols:
+    _module_symbols.popitem(last=False)
+  return entry[1]
+
+
 def compile_method(code, method_name, libraries={}):
   '''Compile a code string into a code object
   The code must contain a function definition which will be used as a method.
+  It is compiled with the file name '<guidoc>' so that it can be identified in tracebacks.
   
   Args:
     code (str):        Python source code to compile
@@ -156,7 +304,7 @@ def compile_method(code, method_name, libraries={}):
   '''
   glbls = globals().copy()
   glbls.update(libraries) # Make libraries from user code visible to exec
-  exec(code, glbls)
+  exec(compile(code, '<guidoc>', 'exec'), glbls)
   
   if method_name in glbls:
     return glbls[method_name]
@@ -181,7 +329,7 @@ def parse_params(params, class_name=None):
       # Strip quotes from strings
       #if v[0] == v[-1] and v.startswith(('"', "'")):
       #  v = v[1:-1]
-      d[k] = v
+      d[intern_str(k)] = v
   except:
     raise ParameterError('Invalid parameters in {}:\n\t{}'.format(class_name, params))
 
@@ -190,24 +338,42 @@ def parse_params(params, class_name=None):
 def index_widgets(widgets, index):
   '''Build an index associating WidgetSpec objects by their name
   Args:
-    widgets (list): List of widgets to recursively index
+    widgets (list): List of widgets to index along with all of their descendants
     index (dict): Dictionary to put each widget into keyed by its name
   '''
-  for w in widgets:
+  stack = list(widgets)
+  while stack:
+    w = stack.pop()
     index[w.name] = w
-    index_widgets(w.children, index)
+    stack.extend(w.children)
     
+def walk_widgets(widgets):
+  '''Iterate over a widget tree in depth-first order
+  Args:
+    widgets (list(WidgetSpec)): Top level of the widget tree
+  Yields:
+    tuple: Each WidgetSpec with its parent WidgetSpec or None for the top level
+  '''
+  stack = [(w, None) for w in reversed(widgets)]
+  while stack:
+    w, parent = stack.pop()
+    yield (w, parent)
+    stack.extend((c, w) for c in reversed(w.children))
+
 def index_containers(widgets, index, parent=None):
   '''Build an index of all widgets that contain children
   Args:
-    widgets (list): List of widgets to recursively scan
+    widgets (list): List of widgets to scan along with all of their descendants
     index (dict): Dictionary to put widget list into keyed by the parent
     parent (WidgetSpec, optional): Parent widget of the currrent list of widgets
   '''
   index[parent] = widgets
-  for w in widgets:
+  stack = list(widgets)
+  while stack:
+    w = stack.pop()
     if len(w.children) > 0:
-      index_containers(w.children, index, w)
+      index[w] = w.children
+      stack.extend(w.children)
 
 
 class Section(object):
@@ -219,11 +385,15 @@ class Section(object):
     name (str):        Section name argument
     param (str):       Parameter argument
     lines (list(str)): Raw text lines for this section
+    linenos (list(int)): Line number of each raw line in the layout spec
   '''
+  __slots__ = ('name', 'param', 'lines', 'linenos')
+
   def __init__(self, name, param=None):
     self.name = name
     self.param = param
     self.lines = []
+    self.linenos = []
     
   def parse(self, class_name=None, **kwargs):
     '''Section parser
@@ -251,43 +421,55 @@ class WidgetSpec(object):
     layout_params (dict, optional): Paramaters for the layout manager
   Attributes:
     children (list(WidgetSpec)): Child widgets owned by this instance
+    lineno (int): Line number of this widget in the layout spec or None
   '''
+  # Layouts can have many thousands of widgets
+  __slots__ = ('name', 'kind', 'params', 'layout_mgr', 'layout_params', 'children', 'lineno')
+
   def __init__(self, name, kind, params, layout_mgr=None, layout_params={}):
     self.name = name
-    self.kind = kind
+    self.kind = intern_str(kind)
     self.params = params
-    self.layout_mgr = layout_mgr
+    self.layout_mgr = intern_str(layout_mgr) if layout_mgr is not None else None
     self.layout_params = layout_params
     self.children = []
+    self.lineno = None
     
-  def code(self, parent, lib_prefix=None):
+  def code(self, parent, lib_prefix=None, pooled=False, symbols=None):
     '''Generate Python code for widget creation
     Args:
       parent (str): Parent widget for this widget
       lib_prefix (str, optional): Library prefix to prepend to all widget classes
+      pooled (bool, optional): Acquire the widget from self._guidoc_pool instead of constructing it
+      symbols (SymbolTable, optional): Table for resolving the widget class. Built from lib_prefix when omitted.
     Yields:
       Sequence of Python code lines for creating this widget
     '''
-
-    full_widget = self.kind    
+    if symbols is None:
+      symbols = SymbolTable(lib_prefix)
+
+    if self.layout_mgr == 'canvas': # Draw on the CanvasGrid of the parent
+      params = ["'{}'".format(self.name), 'dict({})'.format(', '.join('{}={}'.format(k, v)
+        for k, v in self.layout_params.iteritems()))]
+      if self.kind.split('.')[-1] != 'Label':
+        params.append("kind='{}'".format(self.kind.split('.')[-1]))
+      if len(self.params.strip()) > 0:
+        params.append(self.params)
+      yield 'self.{} = {}.add({})'.format(self.name, canvas_grid_name(parent), ', '.join(params))
+      return
 
     # Only prepend lib_prefix if the widget exists in that module
-
-    # Strip any trailing '.' from prefix
-    lib_prefix = lib_prefix.rstrip('.')
-
-    # Get module
-    if lib_prefix in globals():
-      if hasattr(globals()[lib_prefix], full_widget):
-        # Attach prefix
-        full_widget = '{}.{}'.format(lib_prefix, full_widget)
+    full_widget = symbols.resolve(self.kind)
 
     # Create the widget
     params = [parent]
     if len(self.params.strip()) > 0:
       params.append(self.params)
 
-    yield 'self.{} = {}({})'.format(self.name, full_widget, ', '.join(params))
+    if pooled:
+      yield 'self.{} = self._guidoc_pool.acquire({}, {})'.format(self.name, full_widget, ', '.join(params))
+    else:
+      yield 'self.{} = {}({})'.format(self.name, full_widget, ', '.join(params))
 
     # Configure its layout manager
     layout_mgr = self.layout_mgr if self.layout_mgr else 'pack'
@@ -295,8 +477,9 @@ class WidgetSpec(object):
     yield 'self.{}.{}({})'.format(self.name, layout_mgr, ', '.join(params))
 
 
-# Match a widget spec line
-widget_re = re.compile(r'^(\w+)\s*\(\s*([\w.]+)\s*(?:\|\s*(.*))?\)$')
+# Match a widget spec line. Leading space in the params is stripped separately so that
+# a long run of spaces can't be split between two repeated patterns when matching fails.
+widget_re = re.compile(r'^(\w+)\s*\(\s*([\w.]+)\s*(?:\|(.*))?\)$')
 # Match the widget and layout manager params
 layout_re = re.compile(r'<\s*(\w+)\s*(?:\|\s*([^>]*))?>$')
 
@@ -308,9 +491,15 @@ class WidgetSection(Section):
     param (str, optional): Section parameters
   Attributes:
     widgets (list(WidgetSpec)): Parsed widgets for this section
+    resize (dict): Resize policies from resize sections keyed by container name. None is the top level.
+    data (dict): Data source options from data sections keyed by widget name
   '''
+  __slots__ = ('widgets', 'resize', 'data')
+
   def __init__(self, name, param=None):
     self.widgets = []
+    self.resize = {}
+    self.data = {}
     Section.__init__(self, name, param)
 
   @staticmethod  
@@ -325,8 +514,11 @@ class WidgetSection(Section):
     widget_layout_mgr = None
     widget_layout_params = None
     
-    # Strip off any layout mgr. params
-    m = layout_re.search(line)
+    # Strip off any layout mgr. params. They can't contain '>' so the search only
+    # needs to start after the last '>' before the end of the line.
+    m = None
+    if line.endswith('>'):
+      m = layout_re.search(line, line.rfind('>', 0, len(line) - 1) + 1)
     if m:
       widget_layout_mgr = m.group(1)
       widget_layout_params = m.group(2)
@@ -339,6 +531,8 @@ class WidgetSection(Section):
       widget_params = m.group(3)
       if widget_params is None:
         widget_params = ''
+      else:
+        widget_params = widget_params.lstrip()
   
       # Parse layout manager params into a dict so that they can be altered later
       if widget_layout_params:
@@ -359,40 +553,91 @@ class WidgetSection(Section):
     Args:
       class_name (str, optional): Name of class for error messages
     '''
-    self.widgets = parse_indented_list(self.lines, WidgetSection.parse_widget_spec, class_name)
+    self.widgets = parse_indented_list(self.lines, WidgetSection.parse_widget_spec, class_name, self.linenos)
 
   @staticmethod
-  def generate_widget_code(widgets, parent=None, lib_prefix=None):
-    '''Recursively generate code for widgets
+  def generate_widget_code(widgets, parent=None, lib_prefix=None, pooled=False, source_map=None, symbols=None,
+    resize={}, data={}):
+    '''Generate code for widgets and all of their descendants
     Args:
       widgets (list(WidgetSpec)): List of sibling widgets at the current level of the tree
       parent (str, optional): Parent widget this level in the tree
       lib_prefix (str, optional): Library prefix to prepend to all widget classes
+      pooled (bool, optional): Acquire widgets from a WidgetPool
+      source_map (list, optional): The WidgetSpec for each line is appended to this list
+      symbols (SymbolTable, optional): Table for resolving widget classes. Built from lib_prefix when omitted.
+      resize (dict, optional): Resize policies keyed by container name. None is the top level.
+      data (dict, optional): Data source options keyed by widget name
     Yields:
       Sequence of Python code lines for creating this section
     '''
-    for w in widgets:
+    if symbols is None:
+      symbols = SymbolTable(lib_prefix)
+
+    if None in resize:
+      for l in resize_policy_code(parent, resize[None]):
+        if source_map is not None:
+          source_map.append(None)
+        yield l
+
+    def canvas_grid(container, spec):
+      # Create the CanvasGrid for cells in canvas mode. Its layout is done after the cells are added.
+      if source_map is not None:
+        source_map.append(spec)
+      stack.append((spec, container, True))
+      return '{} = CanvasGrid({}, {})'.format(canvas_grid_name(container), container, symbols.resolve('Canvas'))
+
+    # Depth-first with an explicit stack so that deep trees don't pass each line through
+    # a chain of nested generators or hit the recursion limit
+    stack = [(w, parent, False) for w in reversed(widgets)]
+    while stack:
+      w, wparent, finish = stack.pop()
+      if finish:
+        if source_map is not None:
+          source_map.append(w)
+        yield '{}.layout()'.format(canvas_grid_name(wparent))
+        continue
+
       # Generate the widget code
-      for l in w.code(parent, lib_prefix):
+      for l in w.code(wparent, lib_prefix, pooled, symbols):
+        if source_map is not None:
+          source_map.append(w)
         yield l
-        
-      # Recurse into any children
-      ccode = WidgetSection.generate_widget_code(w.children, 'self.' + w.name, lib_prefix)
-      for c in ccode:
-        yield c
 
-  def code(self, parent, lib_prefix=None):
+      if w.name in data:
+        if source_map is not None:
+          source_map.append(w)
+        yield data_loader_code('self.' + w.name, data[w.name])
+
+      # Visit any children next
+      cparent = 'self.' + w.name
+      if w.name in resize:
+        for l in resize_policy_code(cparent, resize[w.name]):
+          if source_map is not None:
+            source_map.append(w)
+          yield l
+      if len(w.children) > 0 and w.children[0].layout_mgr == 'canvas':
+        yield canvas_grid(cparent, w)
+      stack.extend((c, cparent, False) for c in reversed(w.children))
+
+  def code(self, parent, lib_prefix=None, pooled=False, source_map=None, symbols=None):
     '''Generate Python code for widget section
     Args:
       parent (str): Parent widget for top level widgets
       lib_prefix (str, optional): Library prefix to prepend to all widget classes
+      pooled (bool, optional): Acquire widgets from a WidgetPool
+      source_map (list, optional): The WidgetSpec for each line is appended to this list
+      symbols (SymbolTable, optional): Table for resolving widget classes
     Yields:
       str: Sequence of Python code lines for creating this section
     '''
     
+    if source_map is not None:
+      source_map.append(None)
     yield '# Widgets'
     
-    for l in WidgetSection.generate_widget_code(self.widgets, parent, lib_prefix):
+    for l in WidgetSection.generate_widget_code(self.widgets, parent, lib_prefix, pooled, source_map, symbols,
+      self.resize, self.data):
       yield l
 
 
@@ -405,13 +650,27 @@ class GridSection(Section):
   Args:
     name (str):            Section type (Must be 'grid')
     param (str, optional): Section parameter. Identifies container widget this grid is associated with.
+    mode (str, optional):  Render mode. 'canvas' draws the cells on a single Canvas.
   Attributes:
     grid_data (list(GridSpec)): Parsed grid for this section
+    mode (str): Render mode or None for normal widgets
+    col_widths (list(int)): Width of each table column in characters
+    num_rows (int): Number of rows in the table
   '''
+  __slots__ = ('grid_data', 'mode', 'col_widths', 'num_rows')
+
+  # Render modes accepted in the section heading
+  modes = (None, 'canvas')
+
+  # Widget kinds that can be drawn as items on a Canvas
+  canvas_kinds = ('Label', 'Message')
   
-  def __init__(self, name, param=None):
+  def __init__(self, name, param=None, mode=None):
 
-    self.grid_data = {'_container': param}
+    self.grid_data = {'_container': param, '_mode': mode}
+    self.mode = mode
+    self.col_widths = []
+    self.num_rows = 0
     Section.__init__(self, name, param)
     
 
@@ -433,6 +692,11 @@ class GridSection(Section):
     else:
       require_docutils = False
 
+    if self.mode not in self.modes:
+      raise GridError('Unknown {} mode "{}" in layout for {}'.format(self.name, self.mode, class_name))
+    if self.mode == 'canvas' and self.param in (None, 'self'):
+      raise GridError('Canvas grid must name a container widget in layout for {}'.format(class_name))
+
     # Skip parsing grid section if docutils lib is not available
     if not have_docutils:
       if require_docutils:
@@ -448,6 +712,7 @@ class GridSection(Section):
     tgroup = dom.getElementsByTagName('tgroup')
     if len(tgroup) >= 1:
       num_cols = int(tgroup[0].attributes['cols'].value)
+      self.col_widths = [int(c.attributes['colwidth'].value) for c in tgroup[0].getElementsByTagName('colspec')]
 
     # Iterate over the rows of the table extracting grid parameters
     # from their position in the layout
@@ -456,6 +721,7 @@ class GridSection(Section):
       rows = table[0].getElementsByTagName('row')
       
       num_rows = len(rows)
+      self.num_rows = num_rows
       
       # Create map of occupied cells
       cell_map = [[False]*num_cols for _ in xrange(num_rows)]
@@ -504,6 +770,351 @@ class GridSection(Section):
                 cell_map[n][m] = True
 
 
+class PlaceSection(GridSection):
+  '''Section defining a fixed layout with the place geometry manager
+
+  The table is parsed the same way as a grid section. The cell coordinates are then
+  converted into relative place() geometry. Column widths are proportional to the
+  width of the table columns and all rows have the same height.
+
+  Args:
+    name (str):            Section type (Must be 'place')
+    param (str, optional): Section parameter. Identifies container widget this table is associated with.
+    mode (str, optional):  Must be 'place'
+  '''
+  __slots__ = ()
+
+  modes = ('place',)
+
+  # Geometry options computed for each cell
+  place_keys = ('relx', 'rely', 'relwidth', 'relheight')
+
+  def __init__(self, name, param=None, mode='place'):
+    GridSection.__init__(self, name, param, mode)
+
+  def parse(self, class_name=None, **kwargs):
+    '''Parse a place table
+    Args:
+      class_name (str, optional): Class name for error messages
+      kwargs (dict, optional): Additional keyword arguments passed to GridSection.parse()
+    '''
+    # There is no fallback layout for a place table so docutils is always required
+    if not have_docutils:
+      raise GridError('Missing docutils library needed to parse place sections in {}'.format(class_name))
+
+    GridSection.parse(self, class_name, **kwargs)
+
+    if len(self.col_widths) == 0 or self.num_rows == 0:
+      return
+
+    total = float(sum(self.col_widths))
+    col_starts = [0]
+    for w in self.col_widths:
+      col_starts.append(col_starts[-1] + w)
+
+    for widget, cell in self.grid_data.iteritems():
+      if widget in ('_container', '_mode'):
+        continue
+      col = cell['column']
+      row = cell['row']
+      cols = cell.get('columnspan', 1)
+      rows = cell.get('rowspan', 1)
+      cell['relx'] = round(col_starts[col] / total, 4)
+      cell['rely'] = round(row / float(self.num_rows), 4)
+      cell['relwidth'] = round((col_starts[col + cols] - col_starts[col]) / total, 4)
+      cell['relheight'] = round(rows / float(self.num_rows), 4)
+
+
+#########################
+######## RESIZE #########
+
+class ResizeSection(Section):
+  '''Section defining how a container responds to being resized
+
+  The section contains Python keyword parameters that may be split over several lines.
+
+  Args:
+    name (str):            Section type (Must be 'resize')
+    param (str, optional): Section parameter. Identifies the container widget. The top level when omitted.
+  Attributes:
+    policy (dict): Unevaluated policy options keyed by name
+  '''
+  __slots__ = ('policy',)
+
+  # Options accepted in the section
+  options = ('interval', 'handler', 'columns', 'rows', 'minwidth', 'minheight')
+
+  # Options that configure the rows and columns of a grid
+  grid_options = ('columns', 'rows', 'minwidth', 'minheight')
+
+  def __init__(self, name, param=None):
+    self.policy = {}
+    Section.__init__(self, name, param)
+
+  def parse(self, class_name=None, **kwargs):
+    '''Parse the resize policy
+    Args:
+      class_name (str, optional): Class name for error messages
+    '''
+    self.policy = parse_params(', '.join(l.strip() for l in self.lines), class_name)
+    unknown = sorted(k for k in self.policy if k not in ResizeSection.options)
+    if len(unknown) > 0:
+      raise ParameterError('Unknown resize options in {}:\n\t{}'.format(class_name, ', '.join(unknown)))
+
+
+def resize_coalescer_name(container):
+  '''Get the attribute that holds the ResizeCoalescer of a container in generated code
+  Args:
+    container (str): Attribute of the container widget
+  Returns:
+    str: Attribute of its ResizeCoalescer
+  '''
+  return 'self._guidoc_resize' if container == 'self' else '{}_resize'.format(container)
+
+
+def resize_policy_code(container, policy):
+  '''Generate code applying a resize policy to a container
+  Args:
+    container (str): Attribute of the container widget
+    policy (dict): Resize policy with the grid dimensions added by apply_resize_policies()
+  Yields:
+    str: Sequence of Python code lines
+  '''
+  # Configure every row or column with a single call
+  for axis, count, weight, minsize in (('column', '_columns', 'columns', 'minwidth'),
+    ('row', '_rows', 'rows', 'minheight')):
+    options = ['{}={}'.format(k, policy[o]) for k, o in (('weight', weight), ('minsize', minsize)) if o in policy]
+    if count in policy and len(options) > 0:
+      yield '{}.grid_{}configure(tuple(range({})), {})'.format(container, axis, policy[count], ', '.join(options))
+
+  if 'handler' in policy or 'interval' in policy:
+    yield '{} = ResizeCoalescer({}, {}, {})'.format(resize_coalescer_name(container), container,
+      policy.get('handler', 'None'), policy.get('interval', 16))
+
+
+class ResizeCoalescer(object):
+  '''Coalesce the <Configure> events of a widget into at most one handler run per interval
+
+  Dragging the border of a window delivers a <Configure> event for every motion. Expensive
+  handlers bound directly to the event fall behind and make resizing sluggish. This keeps
+  only the latest event and runs the handlers with it once the interval has passed.
+
+  Args:
+    widget (widget): Widget to watch
+    handler (callable, optional): Called with the latest event
+    interval (int, optional): Minimum milliseconds between handler runs. The default is about one frame.
+  Attributes:
+    handlers (list(callable)): Functions called with the latest event
+    events (int): Number of events received
+    runs (int): Number of times the handlers have run
+  '''
+  def __init__(self, widget, handler=None, interval=16):
+    self.widget = widget
+    self.interval = interval
+    self.handlers = [handler] if handler is not None else []
+    self.events = 0
+    self.runs = 0
+    self._event = None
+    self._after_id = None
+    widget.bind('<Configure>', self._on_configure, '+')
+    widget.bind('<Destroy>', self._on_destroy, '+')
+
+  def add(self, handler):
+    '''Add a handler
+    Args:
+      handler (callable): Called with the latest event
+    '''
+    self.handlers.append(handler)
+
+  def remove(self, handler):
+    '''Remove a handler
+    Args:
+      handler (callable): Handler to remove
+    '''
+    self.handlers.remove(handler)
+
+  def _on_configure(self, event):
+    # A toplevel also receives the events of its descendants
+    if event.widget is not self.widget:
+      return
+    self.events += 1
+    self._event = event
+    if self._after_id is None:
+      self._after_id = self.widget.after(self.interval, self._run)
+
+  def _run(self):
+    self._after_id = None
+    event, self._event = self._event, None
+    self.runs += 1
+    for h in list(self.handlers):
+      h(event)
+
+  def flush(self):
+    '''Run the handlers now if an event is pending'''
+    if self._after_id is not None:
+      self.widget.after_cancel(self._after_id)
+      self._run()
+
+  def cancel(self):
+    '''Discard any pending event'''
+    if self._after_id is not None:
+      self.widget.after_cancel(self._after_id)
+      self._after_id = None
+      self._event = None
+
+  def _on_destroy(self, event):
+    if event.widget is self.widget:
+      self.cancel()
+
+
+
+#########################
+##### DATA LOADING ######
+
+class DataSection(Section):
+  '''Section binding a Listbox, Treeview, or Text widget to a source of items
+
+  The section contains Python keyword parameters that may be split over several lines.
+
+  Args:
+    name (str):  Section type (Must be 'data')
+    param (str): Section parameter. Identifies the widget to fill.
+  Attributes:
+    options (dict): Unevaluated loader options keyed by name
+  '''
+  __slots__ = ('options',)
+
+  # Options accepted in the section
+  accepted = ('source', 'batch', 'done')
+
+  def __init__(self, name, param=None):
+    self.options = {}
+    Section.__init__(self, name, param)
+
+  def parse(self, class_name=None, **kwargs):
+    '''Parse the data source options
+    Args:
+      class_name (str, optional): Class name for error messages
+    '''
+    self.options = parse_params(', '.join(l.strip() for l in self.lines), class_name)
+    unknown = sorted(k for k in self.options if k not in DataSection.accepted)
+    if len(unknown) > 0:
+      raise ParameterError('Unknown data options in {}:\n\t{}'.format(class_name, ', '.join(unknown)))
+    if 'source' not in self.options:
+      raise ParameterError('Missing data source for "{}" in {}'.format(self.param, class_name))
+
+
+def data_loader_name(widget):
+  '''Get the attribute that holds the DataLoader of a widget in generated code
+  Args:
+    widget (str): Attribute of the widget
+  Returns:
+    str: Attribute of its DataLoader
+  '''
+  return '{}_data'.format(widget)
+
+
+def data_loader_code(widget, options):
+  '''Generate code that starts loading a widget from its data source
+  Args:
+    widget (str): Attribute of the widget
+    options (dict): Options from the data section
+  Returns:
+    str: Python code line
+  '''
+  params = [widget, options['source']]
+  params.extend('{}={}'.format(k, options[k]) for k in ('batch', 'done') if k in options)
+  return '{} = DataLoader({})'.format(data_loader_name(widget), ', '.join(params))
+
+
+class DataLoader(object):
+  '''Fill a Listbox, Treeview, or Text widget from a data source in batches
+
+  Inserting a large number of items one at a time blocks the event loop until they
+  are all in. The loader inserts a bounded batch of items on each idle tick so the
+  application stays responsive. Listbox items in a batch are inserted with one call.
+  Text items are joined into one string. Treeview items are inserted one at a time
+  since Tk has no multiple item insert for them. They can be strings for the item
+  text, sequences of column values, or dicts of insert() options. Loading stops if
+  the widget is destroyed.
+
+  Args:
+    widget (widget): Listbox, ttk Treeview, or Text widget to fill
+    source: An iterable of items or a callable returning one. A callable is invoked on the first tick.
+    batch (int, optional): Maximum number of items inserted on each tick
+    done (callable, optional): Called with the loader when all items are inserted
+  Attributes:
+    loaded (int): Number of items inserted
+    finished (bool): True when the source is exhausted or the load is cancelled
+  '''
+  def __init__(self, widget, source, batch=500, done=None):
+    self.widget = widget
+    self.source = source
+    self.batch = batch
+    self.done = done
+    self.loaded = 0
+    self.finished = False
+    self._items = None
+    self._after_id = None
+
+    kind = str(widget.widgetName).split(':')[-1].lower()
+    try:
+      self._insert = {'listbox': self._insert_listbox, 'text': self._insert_text,
+        'treeview': self._insert_treeview}[kind]
+    except KeyError:
+      raise TypeError('Unable to load data into a {} widget'.format(widget.widgetName))
+
+    widget.bind('<Destroy>', self._on_destroy, '+')
+    self._after_id = widget.after_idle(self._tick)
+
+  def _insert_listbox(self, items):
+    self.widget.insert('end', *items)
+
+  def _insert_text(self, items):
+    self.widget.insert('end', ''.join(items))
+
+  def _insert_treeview(self, items):
+    insert = self.widget.insert
+    for item in items:
+      if isinstance(item, dict):
+        insert('', 'end', **item)
+      elif isinstance(item, basestring):
+        insert('', 'end', text=item)
+      else:
+        insert('', 'end', values=item)
+
+  def _tick(self):
+    self._after_id = None
+    if self._items is None:
+      self._items = iter(self.source() if callable(self.source) else self.source)
+
+    items = list(itertools.islice(self._items, self.batch))
+    if len(items) > 0:
+      self._insert(items)
+      self.loaded += len(items)
+
+    if len(items) < self.batch:
+      self.finished = True
+      self._items = None
+      if self.done is not None:
+        self.done(self)
+    else:
+      self._after_id = self.widget.after_idle(self._tick)
+
+  def cancel(self):
+    '''Stop loading'''
+    if self._after_id is not None:
+      self.widget.after_cancel(self._after_id)
+      self._after_id = None
+    self._items = None
+    self.finished = True
+
+  def _on_destroy(self, event):
+    if event.widget is self.widget:
+      self.cancel()
+
+
+
 #########################
 ######## MENUS ##########
 
@@ -515,11 +1126,15 @@ class MenuSpec(object):
     params        (str):  Python parameters for the menu  invocation 
   Attributes:
     children (list(MenuSpec)): Child menus owned by this instance
+    lineno (int): Line number of this item in the layout spec or None
   '''
+  __slots__ = ('label', 'kind', 'params', 'children', 'underline', 'lineno')
+
   def __init__(self, label, kind, params):
     self.kind = kind
     self.params = params
     self.children = []
+    self.lineno = None
     
     # Strip quotes from label
     if len(label) > 2 and label[0] == label[-1] and label.startswith(('"', "'")):
@@ -576,6 +1191,8 @@ menu_sep_re = re.compile(r'^----')
 
 class MenuSection(Section):
   '''Section defining a menu tree.'''
+  __slots__ = ('items',)
+
   def __init__(self, name, param=None):
     self.items = []
     Section.__init__(self, name, param)
@@ -604,29 +1221,18 @@ class MenuSection(Section):
 
 
   @staticmethod
-  def generate_menu_code(items, menu_name, parent=None, lib_prefix=None):
+  def generate_menu_code(items, menu_name, parent=None, lib_prefix=None, source_map=None, symbols=None):
     '''Generate code for a menu'''
-    
-    # Prepare prefix
-    if lib_prefix is None or len(lib_prefix) == 0:
-      lib_prefix = ''
-    elif lib_prefix[-1] != '.':
-      lib_prefix += '.'
-    
-    next_parent = parent
-    for i in items:
-      if len(i.children) > 0:
-        next_parent = '{}{}'.format(menu_name, i.prop_label)
-        yield 'self.{} = {}Menu(self.{}, tearoff=0)'.format(next_parent, lib_prefix, parent)
-      else:
-        for l in i.code(parent):
-          yield l
-
-      ccode = MenuSection.generate_menu_code(i.children, menu_name, next_parent, lib_prefix)
-      for c in ccode:
-        yield c
-        
-      if len(i.children) > 0:
+    if symbols is None:
+      symbols = SymbolTable(lib_prefix)
+    menu_cls = symbols.resolve('Menu')
+
+    # Depth-first with an explicit stack. A cascade is visited a second time after its
+    # children to attach it to its parent.
+    stack = [(i, parent, False) for i in reversed(items)]
+    while stack:
+      i, iparent, attach = stack.pop()
+      if attach:
         new_params = {
           'label': i.label,
         }
@@ -636,329 +1242,2996 @@ class MenuSection(Section):
           
         new_params = ', '.join('{}={}'.format(k, repr(v)) for k, v in new_params.iteritems()) 
 
-        yield 'self.{}.add_cascade({}, menu=self.{})'.format(parent, new_params, next_parent)
+        if source_map is not None:
+          source_map.append(i)
+        yield 'self.{}.add_cascade({}, menu=self.{})'.format(iparent, new_params, '{}{}'.format(menu_name, i.prop_label))
+
+      elif len(i.children) > 0:
+        next_parent = '{}{}'.format(menu_name, i.prop_label)
+        if source_map is not None:
+          source_map.append(i)
+        yield 'self.{} = {}(self.{}, tearoff=0)'.format(next_parent, menu_cls, iparent)
+
+        stack.append((i, iparent, True))
+        stack.extend((c, next_parent, False) for c in reversed(i.children))
+
+      else:
+        for l in i.code(iparent):
+          if source_map is not None:
+            source_map.append(i)
+          yield l
         
 
     
   def parse(self, class_name=None, **kwargs):
-    self.items = parse_indented_list(self.lines, MenuSection.parse_menu_item, class_name)
+    self.items = parse_indented_list(self.lines, MenuSection.parse_menu_item, class_name, self.linenos)
 
-  def code(self, parent, lib_prefix=None):
+  def code(self, parent, lib_prefix=None, source_map=None, symbols=None):
     '''Generate code for a menu
     Args:
       parent (str): Parent widget for top level menu objects
       lib_prefix (str, optional): Library prefix for widgets
+      source_map (list, optional): The MenuSpec for each line is appended to this list.
+        Lines that create and attach the menu itself are attributed to this section.
+      symbols (SymbolTable, optional): Table for resolving widget classes. Built from lib_prefix when omitted.
     Yields:
       str: Sequence of Python code lines for creating this menu
     '''
-    # Check if Menu object exists under library prefix
-    if (lib_prefix not in globals()) or (not hasattr(globals()[lib_prefix], 'Menu')):
-      lib_prefix = ''
-
-    # Prepare prefix
-    if lib_prefix is None or len(lib_prefix) == 0:
-      lib_prefix = ''
-    elif lib_prefix[-1] != '.':
-      lib_prefix += '.'
+    if symbols is None:
+      symbols = SymbolTable(lib_prefix)
 
     default_menu = 'menubar'
     menu_name = self.param if self.param else default_menu
     
+    if source_map is not None:
+      source_map.extend([None, self])
     yield '# Menu: {}'.format(menu_name)
     
-    yield 'self.{} = {}Menu({}, tearoff=0)'.format(menu_name, lib_prefix, parent)
-    for l in MenuSection.generate_menu_code(self.items, menu_name, menu_name, lib_prefix):
+    yield 'self.{} = {}({}, tearoff=0)'.format(menu_name, symbols.resolve('Menu'), parent)
+    for l in MenuSection.generate_menu_code(self.items, menu_name, menu_name, lib_prefix, source_map, symbols):
       yield l
 
     # Automatically configure menu if it has the default name
     # Any other menu must be manually installed
     if menu_name == default_menu:      
-      menu_attach = '''if isinstance(self, {}Toplevel):
+      toplevel = symbols.resolve('Toplevel')
+      menu_attach = '''if isinstance(self, {}):
   self.config(menu=self.{})
-elif isinstance(self.master, {}Tk) or isinstance(self.master, {}Toplevel):
-  self.master.config(menu=self.{})'''.format(lib_prefix, menu_name, lib_prefix, lib_prefix, menu_name)
+elif isinstance(self.master, {}) or isinstance(self.master, {}):
+  self.master.config(menu=self.{})'''.format(toplevel, menu_name, symbols.resolve('Tk'), toplevel, menu_name)
       for l in menu_attach.splitlines():
+        if source_map is not None:
+          source_map.append(self)
         yield l
 
 
 
 #########################
-######### MISC ##########
+######## PASSES #########
 
+class PassContext(object):
+  '''State shared by the passes of one traversal
 
-# Match end of line comments
-comment_re = re.compile(r'^(.*)\s*#.*$')
+  Attributes:
+    widget_sec (WidgetSection): The widget section being traversed
+    grids (dict): Grid data from the grid sections keyed by container name. None is the top level.
+    class_name (str): Class name for error messages
+    only (set(str)): Names of the containers to visit or None for all containers
+    index (dict): WidgetSpec objects keyed by name. It holds every widget visited so far
+      and is complete when the finish hooks run.
+  '''
+  def __init__(self, widget_sec, grids, class_name=None, only=None):
+    self.widget_sec = widget_sec
+    self.grids = grids
+    self.class_name = class_name
+    self.only = only
+    self.index = {}
+
+
+class LayoutPass(object):
+  '''Base class for semantic passes over a widget tree
+
+  A pass defines any of the hook methods below. Hooks left as None are
+  skipped. All passes run by a PassManager share one traversal of the tree.
+  Each container is visited before any of its children so that a pass sees
+  the layout settings made on a widget by the container passes before it.
+
+    begin(ctx): Called before the traversal
+    visit_container(ctx, container, children): Called for the top level with a
+      container of None and for each widget that has children
+    visit_widget(ctx, widget, parent): Called for each widget
+    finish(ctx): Called after the traversal
+  '''
+  begin = None
+  visit_container = None
+  visit_widget = None
+  finish = None
 
-# Match a section heading
-section_re = re.compile(r'^\s*\[\s*([^]]+)\s*\]')
 
-def parse_layout_spec(spec, class_name=None, require_docutils=False):
-  '''Parse a complete layout spec into sections
-  Args:
-    spec (str): Layout specification
-    class_name (str, optional): Class name for error messages
-    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
-  Returns:
-    list(Section): List of parsed sections
-  '''
-  sections = []
-  # Start with a widget section by default so that its section heading is optional
-  cur_section = WidgetSection('widgets')
+class GridPass(LayoutPass):
+  '''Apply the cell coordinates from grid tables to the children of gridded containers'''
+  def visit_container(self, ctx, container, children):
+    g = ctx.grids.get(container.name if container else None)
+    if g is None or g['_mode'] == 'place':
+      return
 
-  # Break spec into sections
-  for l in spec.split('\n'):
-    # Strip comments
-    m = comment_re.match(l)
-    if m:
-      l = m.group(1)
-      
-    l = l.rstrip()
-    
-    m = section_re.match(l)
-    if m:
-      # Get section names
-      names = [n.strip() for n in m.group(1).split()]
-      if len(names) > 0:
-        sect_name = names[0].lower()
-        sect_param = None
-        if len(names) > 1:
-          sect_param = names[1]
+    for c in children:
+      if c.layout_mgr is None:
+        c.layout_mgr = 'grid'
+      if c.name in g and c.layout_mgr == 'grid':
+        c.layout_params.update(g[c.name])
 
-      # Save previous section
-      sections.append(cur_section)
-      if sect_name == 'widgets':
-        cur_section = WidgetSection(sect_name, sect_param)
-      elif sect_name == 'grid':
-        cur_section = GridSection(sect_name, sect_param)
-      elif sect_name == 'menu':
-        cur_section = MenuSection(sect_name, sect_param)
-      else:
-        cur_section = Section(sect_name, sect_param)
-    else:
-      # Add line to current section if non-empty
-      if l:
-        cur_section.lines.append(l)
 
-  # Save last section
-  if cur_section:
-    sections.append(cur_section)
-    
-  # Remove empty sections
-  for i in xrange(len(sections)-1, -1, -1):
-    if len(sections[i].lines) == 0:
-      del sections[i]
+class DefaultRowPass(LayoutPass):
+  '''Place gridded widgets missing from their grid table in new rows below it'''
+  def visit_container(self, ctx, container, children):
+    g = ctx.grids.get(container.name if container else None)
+    if g is None or g['_mode'] == 'place':
+      return
 
-  # Parse each section
-  for s in sections:
-    s.parse(class_name, require_docutils=require_docutils)
+    try:
+      max_row = max(int(c.layout_params['row']) for c in children if 'row' in c.layout_params)
+    except ValueError: # Raised if list passed to max() is empty
+      raise LayoutError('Could not determine number of rows in grid for {}'.format(ctx.class_name))
 
-  return sections
+    next_row = max_row + 1
+    for c in children:
+      if c.layout_mgr == 'grid':
+        if 'row' not in c.layout_params:
+          c.layout_params['row'] = next_row
+          next_row += 1
+        if 'column' not in c.layout_params:
+          c.layout_params['column'] = 0
 
 
-def print_widget_tree(widgets, indent=0):
-  '''Dump a parsed widget tree
-  Args:
-    widgets (list(WidgetSpec)): Tree of WidgetSpec objects
-    indent (int, optional): Characters to indent for each level of the tree
+class CanvasGridPass(LayoutPass):
+  '''Draw the cells of grids in canvas mode on a Canvas instead of creating their widgets'''
+  def visit_container(self, ctx, container, children):
+    g = ctx.grids.get(container.name if container else None)
+    if g is None or g['_mode'] != 'canvas':
+      return
+
+    for c in children:
+      if c.kind.split('.')[-1] not in GridSection.canvas_kinds or len(c.children) > 0 or c.layout_mgr != 'grid':
+        raise GridError('Widget "{}" in the canvas grid of "{}" must be a Label or Message without children ' \
+          'in layout for {}'.format(c.name, container.name if container else 'self', ctx.class_name))
+      c.layout_mgr = 'canvas'
+
+
+class PlacePass(LayoutPass):
+  '''Apply the relative geometry from place tables to the children of placed containers'''
+  def visit_container(self, ctx, container, children):
+    g = ctx.grids.get(container.name if container else None)
+    if g is None or g['_mode'] != 'place':
+      return
+
+    for c in children:
+      if c.layout_mgr is None:
+        if c.name not in g:
+          raise GridError('Widget "{}" is missing from the place table of "{}" in layout for {}'.format(c.name,
+            container.name if container else 'self', ctx.class_name))
+        c.layout_mgr = 'place'
+      if c.name in g and c.layout_mgr == 'place':
+        c.layout_params.update((k, g[c.name][k]) for k in PlaceSection.place_keys)
+
+
+class ManagerCheckPass(LayoutPass):
+  '''Verify the children of each container all use the same layout manager'''
+  def visit_container(self, ctx, container, children):
+    if len(children) == 0:
+      return
+    unique_managers = set('pack' if c.layout_mgr is None else c.layout_mgr for c in children)
+    if len(unique_managers) != 1:
+      raise LayoutError('Mismatched layout managers in layout for {}\n\tcontainer "{}" has: {}'.format(ctx.class_name,
+        container.name if container else 'self', ', '.join(unique_managers)))
+
+
+# Passes run after the built in passes on every layout
+_registered_passes = []
+
+def register_pass(layout_pass):
+  '''Run a pass on every layout after the built in passes
+  Args:
+    layout_pass (LayoutPass): Pass to add
+  '''
+  _registered_passes.append(layout_pass)
+
+def unregister_pass(layout_pass):
+  '''Stop running a pass added with register_pass()
+  Args:
+    layout_pass (LayoutPass): Pass to remove
+  '''
+  _registered_passes.remove(layout_pass)
+
+def default_passes():
+  '''Get the passes run on every layout
+  Returns:
+    list(LayoutPass): The built in passes followed by any registered passes
+  '''
+  return [GridPass(), DefaultRowPass(), CanvasGridPass(), PlacePass(), ManagerCheckPass()] + _registered_passes
+
+
+class PassManager(object):
+  '''Run a list of passes fused into a single traversal of a widget tree
+  Args:
+    passes (list(LayoutPass), optional): Passes in the order they run on each node.
+      Defaults to default_passes().
+  '''
+  def __init__(self, passes=None):
+    self.passes = list(passes) if passes is not None else default_passes()
+
+  def hooks(self, name):
+    '''Get the bound hook methods of the passes that define a hook'''
+    return [getattr(p, name) for p in self.passes if getattr(p, name) is not None]
+
+  def run(self, widget_sec, grids=(), class_name=None, only=None):
+    '''Traverse a widget tree once, running every pass
+    Args:
+      widget_sec (WidgetSection): The widget section to process
+      grids (list(GridSection), optional): Parsed grid sections to apply
+      class_name (str, optional): Class name for error messages
+      only (set(str), optional): Names of the containers to visit. None in the set is the top level.
+        All containers are visited when omitted. Every widget is still visited.
+    Returns:
+      PassContext: The context shared by the passes
+    '''
+    gdata = {}
+    for g in grids:
+      gdata[g.grid_data['_container']] = g.grid_data
+
+    ctx = PassContext(widget_sec, gdata, class_name, only)
+    visit_container = self.hooks('visit_container')
+    visit_widget = self.hooks('visit_widget')
+
+    for h in self.hooks('begin'):
+      h(ctx)
+
+    if only is None or None in only:
+      for h in visit_container:
+        h(ctx, None, widget_sec.widgets)
+
+    index = ctx.index
+    stack = [(w, None) for w in reversed(widget_sec.widgets)]
+    while stack:
+      w, parent = stack.pop()
+      index[w.name] = w
+      if len(w.children) > 0 and (only is None or w.name in only):
+        for h in visit_container:
+          h(ctx, w, w.children)
+      for h in visit_widget:
+        h(ctx, w, parent)
+      stack.extend((c, w) for c in reversed(w.children))
+
+    for h in self.hooks('finish'):
+      h(ctx)
+
+    return ctx
+
+
+
+#########################
+####### PROFILING #######
+
+class _NullContext(object):
+  '''Context manager that does nothing'''
+  def __enter__(self):
+    return None
+
+  def __exit__(self, *exc_info):
+    return False
+
+_null_context = _NullContext()
+
+# The active LayoutProfiler
+_profiler = None
+
+
+def profile_phase(name):
+  '''Time a phase of layout processing with the active LayoutProfiler
+  Args:
+    name (str): Name of the phase
+  Returns:
+    A context manager that records the phase. It does nothing when no profiler is active.
+  '''
+  return _profiler.phase(name) if _profiler is not None else _null_context
+
+
+def profile_layout(name):
+  '''Attribute the phases of processing a layout to a name with the active LayoutProfiler
+  Args:
+    name (str): Name of the layout. Usually the name of its class.
+  Returns:
+    A context manager that records the layout. It does nothing when no profiler is active.
+  '''
+  return _profiler.layout(name) if _profiler is not None else _null_context
+
+
+class LayoutProfiler(object):
+  '''Measure the time spent in each phase of layout processing
+
+  While a profiler is active, every layout processed by tk_layout() or create_layout_method()
+  is recorded. The phases are 'split' for breaking the spec into sections, 'parse.widgets',
+  'parse.grid', and 'parse.menu' for parsing each kind of section, 'passes' for applying
+  grid tables to widgets and verifying layout managers, 'codegen', and 'exec' for compiling
+  the generated method. Activate a profiler before importing the
+  modules with decorated classes to aggregate all of them::
+
+    with LayoutProfiler() as prof:
+      import myapp
+    prof.report()
+
+  Args:
+    trace_memory (bool, optional): Count the memory blocks allocated in each phase with tracemalloc.
+      This slows processing considerably.
+    callback (callable, optional): Called with the record for each layout when it is complete
+  Attributes:
+    layouts (list(dict)): Record for each layout with its 'name', a dict of 'phases' with the seconds
+      spent in each, a dict of 'allocations' with the net 'blocks' and 'bytes' allocated in each phase,
+      and a list of 'sections' with the 'name', 'param', 'lines', and 'chars' of each section.
+    totals (dict): Seconds spent in each phase across all layouts
+    calls (dict): Number of times each phase was run
+    allocations (dict): Net allocations in each phase across all layouts
+  '''
+  def __init__(self, trace_memory=False, callback=None):
+    if trace_memory and not have_tracemalloc:
+      raise LayoutError('Memory tracing requires the tracemalloc module')
+
+    self.trace_memory = trace_memory
+    self.callback = callback
+    self.layouts = []
+    self.totals = collections.OrderedDict()
+    self.calls = collections.OrderedDict()
+    self.allocations = collections.OrderedDict()
+    self._current = None
+    self._depth = 0
+    self._previous = None
+    self._tracing = False
+
+  def start(self):
+    '''Make this the active profiler'''
+    global _profiler
+    self._previous = _profiler
+    _profiler = self
+    if self.trace_memory and not tracemalloc.is_tracing():
+      tracemalloc.start()
+      self._tracing = True
+
+  def stop(self):
+    '''Restore the previously active profiler'''
+    global _profiler
+    _profiler = self._previous
+    self._previous = None
+    if self._tracing:
+      tracemalloc.stop()
+      self._tracing = False
+
+  def __enter__(self):
+    self.start()
+    return self
+
+  def __exit__(self, *exc_info):
+    self.stop()
+    return False
+
+  @contextlib.contextmanager
+  def layout(self, name):
+    '''Context manager that attributes phases to a layout
+    Nested layouts are merged into the outermost one.
+    Args:
+      name (str): Name of the layout
+    '''
+    self._depth += 1
+    if self._depth == 1:
+      self._current = {'name': name, 'phases': collections.OrderedDict(),
+        'allocations': collections.OrderedDict(), 'sections': []}
+      self.layouts.append(self._current)
+    try:
+      yield self._current
+    finally:
+      self._depth -= 1
+      if self._depth == 0:
+        record = self._current
+        self._current = None
+        if self.callback is not None:
+          self.callback(record)
+
+  @contextlib.contextmanager
+  def phase(self, name):
+    '''Context manager that times a phase
+    Args:
+      name (str): Name of the phase
+    '''
+    # Tracing may have been stopped by other code. Only the time is recorded then.
+    snapshot = tracemalloc.take_snapshot() if self.trace_memory and tracemalloc.is_tracing() else None
+    start = timeit.default_timer()
+    try:
+      yield
+    finally:
+      elapsed = timeit.default_timer() - start
+      allocs = None
+      if snapshot is not None and tracemalloc.is_tracing():
+        diff = tracemalloc.take_snapshot().compare_to(snapshot, 'filename')
+        allocs = (sum(s.count_diff for s in diff), sum(s.size_diff for s in diff))
+      self._add_phase(name, elapsed, allocs)
+
+  def _add_phase(self, name, elapsed, allocs):
+    records = [(self.totals, self.allocations)]
+    if self._current is not None:
+      records.append((self._current['phases'], self._current['allocations']))
+
+    for times, memory in records:
+      times[name] = times.get(name, 0.0) + elapsed
+      if allocs is not None:
+        blocks, size = memory.get(name, {}).get('blocks', 0), memory.get(name, {}).get('bytes', 0)
+        memory[name] = {'blocks': blocks + allocs[0], 'bytes': size + allocs[1]}
+
+    self.calls[name] = self.calls.get(name, 0) + 1
+
+  def add_sections(self, sections):
+    '''Record the sizes of the sections of the current layout
+    Args:
+      sections (list(Section)): Unparsed sections
+    '''
+    if self._current is not None:
+      self._current['sections'].extend({'name': s.name, 'param': s.param, 'lines': len(s.lines),
+        'chars': sum(len(l) for l in s.lines)} for s in sections)
+
+  def report(self, fh=None):
+    '''Print a report of the recorded layouts
+    Args:
+      fh (file, optional): File to write the report to. Defaults to stderr.
+    '''
+    if fh is None:
+      fh = sys.stderr
+
+    def phase_lines(phases, allocations, calls={}):
+      for name, secs in phases.iteritems():
+        count = ' x{}'.format(calls[name]) if name in calls else ''
+        mem = ''
+        if name in allocations:
+          mem = '  {:8d} blocks {:10d} bytes'.format(allocations[name]['blocks'], allocations[name]['bytes'])
+        yield '  {:16} {:9.3f} ms{:8}{}'.format(name, secs * 1000, count, mem).rstrip()
+
+    for rec in self.layouts:
+      print('{}  {:.3f} ms'.format(rec['name'], sum(rec['phases'].itervalues()) * 1000), file=fh)
+      for l in phase_lines(rec['phases'], rec['allocations']):
+        print(l, file=fh)
+      for s in rec['sections']:
+        name = '[{} {}]'.format(s['name'], s['param']) if s['param'] else '[{}]'.format(s['name'])
+        print('  {:16} {:6d} lines {:8d} chars'.format(name, s['lines'], s['chars']), file=fh)
+
+    print('Total for {} layout(s)  {:.3f} ms'.format(len(self.layouts), sum(self.totals.itervalues()) * 1000), file=fh)
+    for l in phase_lines(self.totals, self.allocations, self.calls):
+      print(l, file=fh)
+
+
+
+#########################
+######## TRACING ########
+
+class _TracingTkApp(object):
+  '''Stand-in for a Tk interpreter that passes its calls through a TclTracer'''
+  def __init__(self, tracer, tkapp):
+    self._tracer = tracer
+    self._tkapp = tkapp
+
+  def call(self, *args):
+    return self._tracer.trace_call(self._tkapp, args)
+
+  def __getattr__(self, name):
+    return getattr(self._tkapp, name)
+
+
+class TclTracer(object):
+  '''Count the Tcl calls made while widgets are built
+
+  The Tk interpreter of a widget is replaced with a proxy that times every call made
+  through it. Widgets created under the widget while the tracer is active inherit the
+  proxy. Calls made from a method generated by tk_layout() are attributed to the
+  WidgetSpec, MenuSpec, or MenuSection that produced the line of code that made them.
+
+    with TclTracer(root) as tracer:
+      app = MyApp(root)
+    tracer.report()
+
+  Args:
+    widget (widget): Tk widget or root window to trace
+  Attributes:
+    specs (dict): Statistics for each spec object keyed by the object. None collects calls that
+      weren't made by a generated method. Each entry has the number of 'calls', their total 'time',
+      and a 'kinds' dict with [count, time] for each kind of call: 'create', 'geometry', 'config',
+      'menu', and 'other'.
+    options (dict): [count, time] of the calls that passed each Tcl option
+  '''
+  def __init__(self, widget):
+    self.widget = widget
+    self.specs = {}
+    self.options = {}
+    self._proxy = None
+    self._menus = set()  # Paths of Menu widgets
+    self._classed = set() # Paths whose class has been checked
+
+  def start(self):
+    '''Start tracing calls'''
+    if self._proxy is None:
+      self._proxy = _TracingTkApp(self, self.widget.tk)
+      self.widget.tk = self._proxy
+
+  def stop(self):
+    '''Stop tracing calls and restore the real interpreter to all widgets that inherited the proxy'''
+    if self._proxy is None:
+      return
+
+    tkapp = self._proxy._tkapp
+    stack = [self.widget]
+    while stack:
+      w = stack.pop()
+      if w.tk is self._proxy:
+        w.tk = tkapp
+      stack.extend(getattr(w, 'children', {}).values())
+    self._proxy = None
+
+  def __enter__(self):
+    self.start()
+    return self
+
+  def __exit__(self, *exc_info):
+    self.stop()
+    return False
+
+  # Widget commands that manage menu entries
+  menu_commands = ('add', 'entryconfigure', 'insert')
+
+  @staticmethod
+  def call_kind(args, menus=()):
+    '''Classify a Tcl call
+    Args:
+      args (tuple): Arguments of the call
+      menus (Container, optional): Paths of the Menu widgets. Entry commands on other
+        widgets, like inserting into a Listbox, are not menu calls.
+    Returns:
+      str: One of 'create', 'geometry', 'config', 'menu', or 'other'
+    '''
+    words = [str(a) for a in args[:2]]
+    if len(words) > 0 and words[0] in ('pack', 'grid', 'place'):
+      return 'geometry'
+    elif len(words) > 1:
+      if words[1] in TclTracer.menu_commands and words[0] in menus:
+        return 'menu'
+      elif words[1] in ('configure', 'config', 'cget'):
+        return 'config'
+      elif words[1].startswith('.') and not words[0].startswith('.'):
+        return 'create'
+    return 'other'
+
+  def find_spec(self):
+    '''Find the spec object responsible for the current call
+    Returns:
+      The WidgetSpec, MenuSpec, or MenuSection of the generated line being executed or None
+    '''
+    frame = sys._getframe(2)
+    while frame is not None:
+      if frame.f_code.co_filename == '<guidoc>':
+        target = frame.f_locals.get('self', None)
+        code, source_map = getattr(target.__class__, '_guidoc_source_map', (None, None)) # Tkinter classes are old style in Python 2
+        if code is frame.f_code and 0 < frame.f_lineno <= len(source_map):
+          return source_map[frame.f_lineno - 1]
+        return None
+      frame = frame.f_back
+    return None
+
+  def trace_call(self, tkapp, args):
+    '''Make a Tcl call and record it
+    Args:
+      tkapp (tkapp): The real Tk interpreter
+      args (tuple): Arguments of the call
+    Returns:
+      The result of the call
+    '''
+    start = timeit.default_timer()
+    try:
+      return tkapp.call(*args)
+    finally:
+      elapsed = timeit.default_timer() - start
+
+      # Tkinter often passes the words of a command as nested tuples
+      stack = list(reversed(args))
+      args = []
+      while stack:
+        a = stack.pop()
+        if isinstance(a, tuple):
+          stack.extend(reversed(a))
+        else:
+          args.append(a)
+
+      # Find out which widgets are menus without tracing the query
+      if len(args) > 1:
+        words = [str(a) for a in args[:2]]
+        if words[0] == 'menu':
+          self._menus.add(words[1])
+        elif words[1] in self.menu_commands and words[0] not in self._menus and words[0] not in self._classed:
+          self._classed.add(words[0])
+          try:
+            if str(tkapp.call('winfo', 'class', words[0])) == 'Menu':
+              self._menus.add(words[0])
+          except tk.TclError:
+            pass
+
+      spec = self.find_spec()
+      stats = self.specs.get(spec, None)
+      if stats is None:
+        stats = self.specs[spec] = {'calls': 0, 'time': 0.0, 'kinds': {}}
+      stats['calls'] += 1
+      stats['time'] += elapsed
+      kind = stats['kinds'].setdefault(self.call_kind(args, self._menus), [0, 0.0])
+      kind[0] += 1
+      kind[1] += elapsed
+
+      for a in args:
+        if isinstance(a, str) and len(a) > 1 and a[0] == '-':
+          opt = self.options.setdefault(a, [0, 0.0])
+          opt[0] += 1
+          opt[1] += elapsed
+
+  @staticmethod
+  def describe(spec):
+    '''Describe a spec object for a report'''
+    if isinstance(spec, WidgetSpec):
+      return '{}({})'.format(spec.name, spec.kind)
+    elif isinstance(spec, MenuSpec):
+      return 'menu {}'.format(spec.label) if spec.kind != 'separator' else 'menu separator'
+    elif isinstance(spec, MenuSection):
+      return '[menu{}]'.format(' ' + spec.param if spec.param else '')
+    return '<not generated>'
+
+  def report(self, fh=None, limit=None):
+    '''Print the traced calls sorted by time
+    Args:
+      fh (file, optional): File to write the report to. Defaults to stderr.
+      limit (int, optional): Maximum number of specs and options to list
+    '''
+    if fh is None:
+      fh = sys.stderr
+
+    kinds = ('create', 'geometry', 'config', 'menu', 'other')
+    print('{:>6} {:>10} {:>5}  {:32} {}'.format('calls', 'ms', 'line', 'spec', ' '.join(kinds)), file=fh)
+    rows = sorted(self.specs.iteritems(), key=lambda kv: kv[1]['time'], reverse=True)
+    for spec, stats in rows[:limit]:
+      lineno = getattr(spec, 'lineno', None)
+      counts = ' '.join('{:>{}}'.format(stats['kinds'].get(k, [0])[0], len(k)) for k in kinds)
+      print('{:6d} {:10.3f} {:>5}  {:32} {}'.format(stats['calls'], stats['time'] * 1000,
+        lineno if lineno is not None else '-', self.describe(spec), counts), file=fh)
+
+    total_calls = sum(s['calls'] for s in self.specs.itervalues())
+    total_time = sum(s['time'] for s in self.specs.itervalues())
+    print('{:6d} {:10.3f}        total'.format(total_calls, total_time * 1000), file=fh)
+
+    if len(self.options) > 0:
+      print('\n{:>6} {:>10}  {}'.format('calls', 'ms', 'option'), file=fh)
+      rows = sorted(self.options.iteritems(), key=lambda kv: kv[1][1], reverse=True)
+      for opt, (count, secs) in rows[:limit]:
+        print('{:6d} {:10.3f}  {}'.format(count, secs * 1000, opt), file=fh)
+
+
+
+#########################
+### MEMORY ACCOUNTING ###
+
+def tcl_counts(widget):
+  '''Sample the size of the Tcl interpreter of a widget
+
+  Every Tk widget and every Python callback registered with Tcl is a Tcl command
+  so the growth in commands beyond the new widgets is mostly callbacks. Only the
+  widgets can be counted for a FakeWidget.
+
+  Args:
+    widget (widget): Tk widget or FakeWidget
+  Returns:
+    dict: Number of 'widgets' in the application along with the number of 'commands',
+    'images', and global 'variables' in the interpreter
+  '''
+  if isinstance(widget, FakeWidget):
+    while widget.master is not None:
+      widget = widget.master
+    count = 0
+    stack = [widget]
+    while stack:
+      w = stack.pop()
+      count += 1
+      stack.extend(w.children.values())
+    return {'widgets': count}
+
+  tkapp = widget.tk
+  count = 0
+  stack = ['.']
+  while stack:
+    w = stack.pop()
+    count += 1
+    stack.extend(tkapp.splitlist(tkapp.call('winfo', 'children', w)))
+
+  return {'widgets': count,
+    'commands': len(tkapp.splitlist(tkapp.call('info', 'commands'))),
+    'images': len(tkapp.splitlist(tkapp.call('image', 'names'))),
+    'variables': len(tkapp.splitlist(tkapp.call('info', 'globals')))}
+
+
+def spec_kind(spec):
+  '''Get the kind of object built by a spec for memory accounting'''
+  if isinstance(spec, WidgetSpec):
+    return spec.kind
+  elif isinstance(spec, MenuSection) or (isinstance(spec, MenuSpec) and len(spec.children) > 0):
+    return 'Menu'
+  elif isinstance(spec, MenuSpec):
+    return 'menu item'
+  return '<not generated>'
+
+
+def layout_memory(layout, master=None, base='Frame', lib_prefix=None, libraries={}, class_name=None,
+  require_docutils=False, frames=32):
+  '''Measure the memory allocated by building a layout
+
+  A class derived from base is decorated with tk_layout() and instantiated under master.
+  Its layout method is then called while tracemalloc is tracing. The memory still
+  allocated when it returns is attributed to the generated line of code, and the spec
+  that produced it, found in the traceback of each allocation. Allocations more than
+  frames calls deep, or made by lines that don't belong to a spec, are counted as
+  '<not generated>'. The Tcl interpreter is sampled with tcl_counts() before and after
+  the build. The view is destroyed afterwards.
+
+  Args:
+    layout (str):                Layout specification
+    master (widget, optional):   Parent for the view. A hidden Tk root is created when None,
+      or a FakeTk root when there is no display.
+    base (str, optional):        Widget class the view derives from. Defaults to "Frame"
+    lib_prefix (str, optional):  Library prefix for widgets
+    libraries (dict, optional):  Dictionary of user packages keyed by name
+    class_name (str, optional):  Class name for error messages
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+    frames (int, optional):      Number of frames kept in each traceback. If tracemalloc is already
+      tracing it must keep at least this many.
+  Returns:
+    dict: The 'backend' used, 'fake' or 'tk', the 'total' and 'by_kind' allocations, a 'by_line'
+    list of allocations for each spec line, and the 'tcl' counts 'before' and 'after' the
+    build along with their 'growth'. Allocations are dicts of net 'blocks' and 'bytes'. Each
+    kind also has the number of 'specs' of that kind.
+  '''
+  if not have_tracemalloc:
+    raise LayoutError('Memory accounting requires the tracemalloc module')
+
+  tracing = not tracemalloc.is_tracing()
+  if not tracing and tracemalloc.get_traceback_limit() < frames:
+    raise LayoutError('tracemalloc is already tracing with {} frame(s). Memory accounting needs {}.'.format(
+      tracemalloc.get_traceback_limit(), frames))
+
+  if lib_prefix is None:
+    lib_prefix = find_tkinter_name()
+  libraries = dict(libraries)
+
+  root = None
+  if master is None:
+    try:
+      root = master = tk.Tk()
+      root.withdraw()
+    except tk.TclError: # No display
+      root = master = FakeTk().Tk()
+  if isinstance(master, FakeWidget):
+    libraries[lib_prefix] = master.backend
+
+  lib = libraries.get(lib_prefix, tk)
+  base_cls = getattr(lib, base, None) or getattr(tk, base)
+  cls = tk_layout(layout, lib_prefix, libraries, require_docutils=require_docutils)(
+    type(class_name if class_name else 'GuidocView', (base_cls,), {}))
+  code, source_map = cls._guidoc_source_map
+
+  view = None
+  try:
+    view = cls(master)
+    if tracing:
+      tracemalloc.start(frames)
+    tcl_before = tcl_counts(view)
+    before = tracemalloc.take_snapshot()
+    view._build_widgets()
+    after = tracemalloc.take_snapshot()
+    tcl_after = tcl_counts(view)
+  finally:
+    if tracing:
+      tracemalloc.stop()
+    if view is not None:
+      view.destroy()
+    if root is not None:
+      root.destroy()
+
+  # Ignore the snapshots themselves
+  ignore = [tracemalloc.Filter(False, tracemalloc.__file__)]
+  before = before.filter_traces(ignore)
+  after = after.filter_traces(ignore)
+
+  specs = collections.OrderedDict((s, [0, 0]) for s in source_map if s is not None)
+  other = [0, 0]
+  for stat in after.compare_to(before, 'traceback'):
+    linenos = [f.lineno for f in stat.traceback if f.filename == '<guidoc>']
+    spec = source_map[linenos[0] - 1] if len(linenos) > 0 and 0 < linenos[0] <= len(source_map) else None
+    counts = specs[spec] if spec is not None else other
+    counts[0] += stat.count_diff
+    counts[1] += stat.size_diff
+
+  kinds = collections.OrderedDict()
+  lines = []
+  for spec, (blocks, size) in specs.iteritems():
+    kind = spec_kind(spec)
+    k = kinds.setdefault(kind, {'specs': 0, 'blocks': 0, 'bytes': 0})
+    k['specs'] += 1
+    k['blocks'] += blocks
+    k['bytes'] += size
+    lines.append({'line': getattr(spec, 'lineno', None), 'spec': TclTracer.describe(spec), 'kind': kind, 'blocks': blocks,
+      'bytes': size})
+  if other != [0, 0]:
+    kinds['<not generated>'] = {'specs': 0, 'blocks': other[0], 'bytes': other[1]}
+
+  return {
+    'backend': 'fake' if isinstance(master, FakeWidget) else 'tk',
+    'total': {'blocks': sum(k['blocks'] for k in kinds.itervalues()),
+      'bytes': sum(k['bytes'] for k in kinds.itervalues())},
+    'by_kind': kinds,
+    'by_line': sorted(lines, key=lambda l: (l['line'] is None, l['line'])), # Menu sections have no line
+    'tcl': {'before': tcl_before, 'after': tcl_after,
+      'growth': dict((k, tcl_after[k] - v) for k, v in tcl_before.iteritems())}
+  }
+
+
+
+#########################
+####### FAKE TK #########
+
+class FakeWidget(object):
+  '''Recording stand-in for a Tk widget
+
+  Subclasses are created by a FakeTk backend for each widget class. Options, geometry
+  management, and menu entries are kept so that a built layout can be inspected.
+  Methods that aren't implemented are accepted and counted as 'call' operations.
+
+  Attributes:
+    master (FakeWidget): Parent widget or None for a root window
+    children (OrderedDict): Child widgets keyed by name
+  '''
+  backend = None # The FakeTk that created this class
+
+  def __init__(self, master=None, cnf={}, **kw):
+    options = dict(cnf)
+    options.update(kw)
+    self.master = master
+    self.children = collections.OrderedDict()
+    self.widgetName = type(self).__name__
+    self._options = options
+    self._manager = None
+    self._layout = {}
+    self._entries = []
+    self._items = {}
+
+    name = options.pop('name', None)
+    if name is None:
+      self.backend.serial += 1
+      name = '!{}{}'.format(self.widgetName.lower(), self.backend.serial)
+    self._name = name
+    if master is None:
+      self._w = '.'
+    else:
+      self._w = '{}.{}'.format(master._w if master._w != '.' else '', name)
+      master.children[name] = self
+
+    self.backend.record('create', self)
+
+  def __getattr__(self, name):
+    if name.startswith('_'):
+      raise AttributeError(name)
+    backend = self.backend
+    def method(*args, **kw):
+      backend.record('call', self)
+    return method
+
+  def __str__(self):
+    return self._w
+
+  def __repr__(self):
+    return '<{} {}>'.format(self.widgetName, self._w)
+
+  def _manage(self, manager, cnf, kw):
+    if self._manager != manager and self._manager is not None:
+      self._layout = {}
+    self._manager = manager
+    self._layout.update(cnf)
+    self._layout.update(kw)
+    self.backend.record(manager, self)
+
+  def pack(self, cnf={}, **kw):
+    self._manage('pack', cnf, kw)
+
+  def grid(self, cnf={}, **kw):
+    self._manage('grid', cnf, kw)
+
+  def place(self, cnf={}, **kw):
+    self._manage('place', cnf, kw)
+
+  pack_configure = pack
+  grid_configure = grid
+  place_configure = place
+
+  def _forget(self):
+    self._manager = None
+    self._layout = {}
+    self.backend.record('forget', self)
+
+  pack_forget = _forget
+  grid_forget = _forget
+  place_forget = _forget
+
+  def configure(self, cnf=None, **kw):
+    if isinstance(cnf, str): # Query a single option like Tk
+      return (cnf, cnf, cnf.capitalize(), '', self._options.get(cnf, ''))
+    if cnf is None and len(kw) == 0:
+      return dict((k, (k, k, k.capitalize(), '', v)) for k, v in self._options.iteritems())
+    if cnf:
+      self._options.update(cnf)
+    self._options.update(kw)
+    self.backend.record('config', self)
+
+  config = configure
+
+  def cget(self, key):
+    return self._options.get(key, '')
+
+  __getitem__ = cget
+
+  def __setitem__(self, key, value):
+    self.configure({key: value})
+
+  def keys(self):
+    return list(self._options.keys())
+
+  def winfo_children(self):
+    return list(self.children.values())
+
+  def winfo_exists(self):
+    w = self
+    while w.master is not None:
+      if w.master.children.get(w._name, None) is not w:
+        return 0
+      w = w.master
+    return 1
+
+  def winfo_manager(self):
+    return self._manager if self._manager is not None else ''
+
+  def destroy(self):
+    stack = [self]
+    while stack:
+      w = stack.pop()
+      stack.extend(w.children.values())
+      w.children = collections.OrderedDict()
+      self.backend.record('destroy', w)
+    if self.master is not None:
+      self.master.children.pop(self._name, None)
+
+  def after(self, ms, func=None, *args):
+    self.backend.record('call', self)
+    return 'after#{}'.format(self.backend.serial)
+
+  # Menu entries
+  def add(self, itemType, cnf={}, **kw):
+    entry = dict(cnf)
+    entry.update(kw)
+    entry['type'] = itemType
+    self._entries.append(entry)
+    self.backend.record('menu', self)
+
+  def add_cascade(self, cnf={}, **kw):
+    self.add('cascade', cnf, **kw)
+
+  def add_checkbutton(self, cnf={}, **kw):
+    self.add('checkbutton', cnf, **kw)
+
+  def add_command(self, cnf={}, **kw):
+    self.add('command', cnf, **kw)
+
+  def add_radiobutton(self, cnf={}, **kw):
+    self.add('radiobutton', cnf, **kw)
+
+  def add_separator(self, cnf={}, **kw):
+    self.add('separator', cnf, **kw)
+
+  def index(self, index):
+    return len(self._entries) - 1 if index == 'end' else index
+
+  # Canvas items. Text is measured with a fixed size font.
+  char_width = 7
+  line_height = 15
+
+  def _create_item(self, itemType, args, kw):
+    self.backend.serial += 1
+    item = dict(kw)
+    item['type'] = itemType
+    item['coords'] = args
+    self._items[self.backend.serial] = item
+    self.backend.record('item', self)
+    return self.backend.serial
+
+  def create_text(self, *args, **kw):
+    return self._create_item('text', args, kw)
+
+  def create_rectangle(self, *args, **kw):
+    return self._create_item('rectangle', args, kw)
+
+  def coords(self, item, *args):
+    if len(args) == 0:
+      return list(self._items[item]['coords'])
+    self._items[item]['coords'] = args
+    self.backend.record('item', self)
+
+  def itemconfigure(self, item, cnf=None, **kw):
+    if cnf:
+      self._items[item].update(cnf)
+    self._items[item].update(kw)
+    self.backend.record('item', self)
+
+  itemconfig = itemconfigure
+
+  def itemcget(self, item, option):
+    return self._items[item].get(option, '')
+
+  def bbox(self, *items):
+    item = self._items[items[0]]
+    x, y = item['coords'][:2]
+    if item['type'] == 'text':
+      lines = str(item.get('text', '')).split('\n')
+      return (x, y, x + max(len(l) for l in lines) * self.char_width, y + len(lines) * self.line_height)
+    return tuple(item['coords'])
+
+  def entrycget(self, index, option):
+    return self._entries[index].get(option, '')
+
+
+class FakeVariable(object):
+  '''Stand-in for the Tkinter variable classes'''
+  def __init__(self, master=None, value=None, name=None):
+    self._value = value
+
+  def get(self):
+    return self._value
+
+  def set(self, value):
+    self._value = value
+
+  def __getattr__(self, name):
+    if name.startswith('_'):
+      raise AttributeError(name)
+    return lambda *args, **kw: None
+
+
+class FakeTk(object):
+  '''Headless stand-in for the Tkinter module
+
+  Pass an instance in place of Tkinter through the libraries argument of tk_layout()
+  or compile_method() under the name used as the library prefix. Generated layout
+  methods can then run without a display. Any capitalized name is a widget class,
+  names ending in 'Var' are variable classes, and upper case names are the Tkinter
+  constants. Each FakeTk keeps its own operation counts.
+
+  Attributes:
+    ops (Counter): Number of each kind of operation performed: 'create', 'pack', 'grid',
+      'place', 'forget', 'config', 'menu', 'destroy', and 'call' for anything else
+    serial (int): Number of widgets created
+  '''
+  TclError = tk.TclError
+
+  def __init__(self):
+    self.ops = collections.Counter()
+    self.serial = 0
+
+  def __getattr__(self, name):
+    if name.startswith('_') or len(name) == 0:
+      raise AttributeError(name)
+    if name.isupper(): # Tkinter constants are the lower case of their names
+      value = name.lower()
+    elif name.endswith('Var'):
+      value = type(name, (FakeVariable,), {})
+    elif name[0].isupper():
+      value = type(name, (FakeWidget,), {'backend': self})
+    else:
+      raise AttributeError(name)
+    setattr(self, name, value) # Use the same class for every reference
+    return value
+
+  def record(self, op, widget):
+    self.ops[op] += 1
+
+  @staticmethod
+  def tree(widget):
+    '''Describe a built widget tree
+    Args:
+      widget (FakeWidget): Root of the tree
+    Returns:
+      dict: The 'kind', 'name', 'options', 'manager', 'layout', 'entries', and 'children' of the widget
+    '''
+    def describe(w):
+      return {'kind': w.widgetName, 'name': w._name, 'options': dict(w._options), 'manager': w._manager,
+        'layout': dict(w._layout), 'entries': [dict(e) for e in w._entries], 'children': []}
+
+    root = describe(widget)
+    stack = [(widget, root)]
+    while stack:
+      w, node = stack.pop()
+      for c in w.children.values():
+        cnode = describe(c)
+        node['children'].append(cnode)
+        stack.append((c, cnode))
+    return root
+
+
+def build_fake_layout(layout, fake=None, method_name='_build_widgets', lib_prefix=None, libraries={},
+  require_docutils=False, container='Frame'):
+  '''Build a layout into a FakeTk container
+  Args:
+    layout (str): Layout specification
+    fake (FakeTk, optional): Backend to build with. A new one is created when None.
+    method_name (str, optional): Name of the generated method
+    lib_prefix (str, optional): Library prefix for widgets. The FakeTk is installed under this name.
+    libraries (dict, optional): Dictionary of user packages keyed by name
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+    container (str, optional): Widget class of the container that is built into
+  Returns:
+    FakeWidget: The container with the layout built into it. Its 'backend' attribute is the FakeTk.
+  '''
+  if fake is None:
+    fake = FakeTk()
+  if lib_prefix is None:
+    lib_prefix = find_tkinter_name()
+
+  code = create_layout_method(layout, method_name, 'self', lib_prefix, require_docutils=require_docutils)
+  libs = dict(libraries)
+  libs[lib_prefix] = fake
+  method = compile_method(code, method_name, libs)
+
+  target = getattr(fake, container)(fake.Tk())
+  method(target)
+  return target
+
+
+def check_fake_layout(target, layout, require_docutils=False):
+  '''Verify that a layout built with a FakeTk matches its specification
+  Args:
+    target (FakeWidget): Container the layout was built into
+    layout (str): Layout specification
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+  Returns:
+    list(str): Description of each difference. Empty when the layout matches.
+  '''
+  widget_sec, menus = analyze_layout(layout, require_docutils=require_docutils)
+  problems = []
+
+  widgets = widget_sec.widgets if widget_sec is not None else []
+  for w, parent in walk_widgets(widgets):
+    widget = target.__dict__.get(w.name, None)
+    if w.layout_mgr == 'canvas':
+      if not isinstance(widget, CanvasCell):
+        problems.append('{}: not drawn on a canvas grid'.format(w.name))
+        continue
+      for k, v in sorted(w.layout_params.iteritems()):
+        if k in CanvasCell.__slots__ and isinstance(v, int) and getattr(widget, k) != v:
+          problems.append('{}: canvas grid {} is {} instead of {}'.format(w.name, k, getattr(widget, k), v))
+      continue
+
+    if not isinstance(widget, FakeWidget):
+      problems.append('{}: not created'.format(w.name))
+      continue
+
+    kind = w.kind.split('.')[-1]
+    if widget.widgetName != kind:
+      problems.append('{}: is a {} instead of {}'.format(w.name, widget.widgetName, kind))
+
+    master = target.__dict__.get(parent.name, None) if parent is not None else target
+    if widget.master is not master:
+      problems.append('{}: has master {} instead of {}'.format(w.name, widget.master,
+        parent.name if parent is not None else 'self'))
+
+    manager = w.layout_mgr if w.layout_mgr else 'pack'
+    if widget._manager != manager:
+      problems.append('{}: managed by {} instead of {}'.format(w.name, widget._manager, manager))
+    elif sorted(widget._layout) != sorted(w.layout_params):
+      problems.append('{}: {} options {} instead of {}'.format(w.name, manager, sorted(widget._layout),
+        sorted(w.layout_params)))
+    else:
+      # Cell geometry from grid and place tables is numeric. Other values are unevaluated expressions.
+      for k, v in sorted(w.layout_params.iteritems()):
+        if isinstance(v, (int, float)) and widget._layout[k] != v:
+          problems.append('{}: {} {} is {} instead of {}'.format(w.name, manager, k, widget._layout[k], v))
+
+  for m in menus:
+    name = m.param if m.param else 'menubar'
+    menu = target.__dict__.get(name, None)
+    if not isinstance(menu, FakeWidget):
+      problems.append('{}: menu not created'.format(name))
+      continue
+
+    labels = [e.get('label', None) for e in menu._entries if e['type'] != 'separator']
+    expected = [i.label for i in m.items if i.kind != 'separator']
+    if labels != expected:
+      problems.append('{}: has entries {} instead of {}'.format(name, labels, expected))
+
+  return problems
+
+
+
+#########################
+######### MISC ##########
+
+
+# Match a section heading
+section_re = re.compile(r'^\s*\[([^]]+)\]')
+
+def split_layout_spec(spec):
+  '''Break a layout spec into unparsed sections
+  Args:
+    spec (str): Layout specification
+  Returns:
+    list(Section): List of non-empty sections with their lines populated
+  '''
+  sections = []
+  # Start with a widget section by default so that its section heading is optional
+  cur_section = WidgetSection('widgets')
+
+  # Break spec into sections
+  for lineno, l in enumerate(spec.split('\n'), 1):
+    # Strip comments starting at the last '#'
+    i = l.rfind('#')
+    if i >= 0:
+      l = l[:i]
+
+    l = l.rstrip()
+    
+    m = section_re.match(l)
+    if m:
+      # Get section names
+      names = [n.strip() for n in m.group(1).split()]
+      if len(names) > 0:
+        sect_name = names[0].lower()
+        sect_param = None
+        sect_mode = None
+        if len(names) > 1:
+          sect_param = names[1]
+        if len(names) > 2:
+          sect_mode = names[2].lower()
+
+      # Save previous section
+      sections.append(cur_section)
+      if sect_name == 'widgets':
+        cur_section = WidgetSection(sect_name, sect_param)
+      elif sect_name == 'grid':
+        cur_section = GridSection(sect_name, sect_param, sect_mode)
+      elif sect_name == 'place':
+        cur_section = PlaceSection(sect_name, sect_param, sect_mode or 'place')
+      elif sect_name == 'menu':
+        cur_section = MenuSection(sect_name, sect_param)
+      elif sect_name == 'resize':
+        cur_section = ResizeSection(sect_name, sect_param)
+      elif sect_name == 'data':
+        cur_section = DataSection(sect_name, sect_param)
+      else:
+        cur_section = Section(sect_name, sect_param)
+    else:
+      # Add line to current section if non-empty
+      if l:
+        cur_section.lines.append(l)
+        cur_section.linenos.append(lineno)
+
+  # Save last section
+  if cur_section:
+    sections.append(cur_section)
+    
+  # Remove empty sections
+  for i in xrange(len(sections)-1, -1, -1):
+    if len(sections[i].lines) == 0:
+      del sections[i]
+
+  return sections
+
+
+def parse_layout_spec(spec, class_name=None, require_docutils=False):
+  '''Parse a complete layout spec into sections
+  Args:
+    spec (str): Layout specification
+    class_name (str, optional): Class name for error messages
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+  Returns:
+    list(Section): List of parsed sections
+  '''
+  with profile_phase('split'):
+    sections = split_layout_spec(spec)
+
+  if _profiler is not None:
+    _profiler.add_sections(sections)
+
+  # Parse each section
+  for s in sections:
+    with profile_phase('parse.' + s.name):
+      s.parse(class_name, require_docutils=require_docutils)
+
+  return sections
+
+
+def print_widget_tree(widgets, indent=0):
+  '''Dump a parsed widget tree
+  Args:
+    widgets (list(WidgetSpec)): Tree of WidgetSpec objects
+    indent (int, optional): Characters to indent for each level of the tree
+  '''
+  stack = [(w, indent) for w in reversed(widgets)]
+  while stack:
+    w, level = stack.pop()
+    print('{}{} {}'.format(' '*level*2, w.name, w.kind))
+    stack.extend((c, level+1) for c in reversed(w.children))
+
+def print_menu_tree(nodes, indent=0):
+  '''Dump a parsed menu tree
+  Args:
+    nodes (list(MenuSpec)): Tree of MenuSpec objects
+    indent (int, optional): Characters to indent for each level of the tree
+  '''
+  stack = [(n, indent) for n in reversed(nodes)]
+  while stack:
+    n, level = stack.pop()
+    print('{}{}'.format(' '*level*2, n.label))
+    stack.extend((c, level+1) for c in reversed(n.children))
+
+
+def apply_grid_attributes(grids, widget_sec, class_name=None, only=None):
+  '''Set cell coordinates extracted from grid sections
+  Args:
+    grids (list(GridSection)): List of parsed grid sections
+    widget_sec (WidgetSection): The widget section to apply grid attributes to
+    class_name (str, optional): Class name for error messages
+    only (set(str), optional): Names of the containers to update. None in the set is the top level.
+      All containers are updated when omitted.
+  '''
+  PassManager([GridPass(), DefaultRowPass(), CanvasGridPass(), PlacePass()]).run(widget_sec, grids, class_name, only)
+
+
+def check_layout_managers(widget_sec, class_name=None, only=None):
+  '''Verify the children of each container all use the same layout manager
+  Args:
+    widget_sec (WidgetSection): The widget section to check
+    class_name (str, optional): Class name for error messages
+    only (set(str), optional): Names of the containers to check. None in the set is the top level.
+      All containers are checked when omitted.
+  Raises:
+    LayoutError: A container has mismatched layout managers
+  '''
+  PassManager([ManagerCheckPass()]).run(widget_sec, class_name=class_name, only=only)
+
+
+def apply_resize_policies(resizes, widget_sec, class_name=None):
+  '''Attach the policies from resize sections to the widget section
+
+  Grid attributes must already be applied so that the dimensions of each grid can be found.
+
+  Args:
+    resizes (list(ResizeSection)): List of parsed resize sections
+    widget_sec (WidgetSection): The widget section to attach the policies to
+    class_name (str, optional): Class name for error messages
+  '''
+  index = {}
+  index_widgets(widget_sec.widgets, index)
+
+  widget_sec.resize = {}
+  for r in resizes:
+    container = r.param if r.param else 'self'
+    if r.param in widget_sec.resize:
+      raise LayoutError('Multiple resize sections for "{}" in layout for {}'.format(container, class_name))
+    if r.param is None:
+      children = widget_sec.widgets
+    elif r.param in index:
+      children = index[r.param].children
+    else:
+      raise LayoutError('Unknown container "{}" in resize section of layout for {}'.format(container, class_name))
+
+    policy = dict(r.policy)
+    if any(k in policy for k in ResizeSection.grid_options):
+      gridded = [c for c in children if c.layout_mgr == 'grid']
+      if len(gridded) == 0:
+        raise LayoutError('Resize weights need gridded children in container "{}" in layout for {}'.format(
+          container, class_name))
+      try:
+        policy['_columns'] = max(int(c.layout_params.get('column', 0)) + int(c.layout_params.get('columnspan', 1))
+          for c in gridded)
+        policy['_rows'] = max(int(c.layout_params.get('row', 0)) + int(c.layout_params.get('rowspan', 1))
+          for c in gridded)
+      except ValueError: # Raised for coordinates that are expressions
+        raise LayoutError('Could not determine the size of the grid in container "{}" in layout for {}'.format(
+          container, class_name))
+
+    widget_sec.resize[r.param] = policy
+
+
+def apply_data_sources(data_secs, widget_sec, class_name=None):
+  '''Attach the options from data sections to the widget section
+  Args:
+    data_secs (list(DataSection)): List of parsed data sections
+    widget_sec (WidgetSection): The widget section to attach the options to
+    class_name (str, optional): Class name for error messages
+  '''
+  index = {}
+  index_widgets(widget_sec.widgets, index)
+
+  widget_sec.data = {}
+  for d in data_secs:
+    if d.param not in index:
+      raise LayoutError('Unknown widget "{}" in data section of layout for {}'.format(d.param, class_name))
+    if d.param in widget_sec.data:
+      raise LayoutError('Multiple data sections for "{}" in layout for {}'.format(d.param, class_name))
+    widget_sec.data[d.param] = dict(d.options)
+
+
+def analyze_layout(layout, class_name=None, require_docutils=False):
+  '''Parse a layout spec and apply grid attributes to its widgets
+  Args:
+    layout (str):                Layout specification
+    class_name (str, optional):  Class name for error messages
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+  Returns:
+    tuple: The WidgetSection or None and a list of MenuSection objects
+  '''
+  sections = parse_layout_spec(layout, class_name, require_docutils)
+  return analyze_sections(sections, class_name)
+
+
+def analyze_sections(sections, class_name=None):
+  '''Apply grid attributes from parsed sections to their widgets
+  Args:
+    sections (list(Section)):    Parsed sections of a layout spec
+    class_name (str, optional):  Class name for error messages
+  Returns:
+    tuple: The WidgetSection or None and a list of MenuSection objects
+  '''
+  # Get all widgets  and menu sections
+  widgets = [s for s in sections if s.name == 'widgets']
+  menus = [s for s in sections if s.name == 'menu']
+  
+  # We can only have 0 or 1 widget section
+  # We must have at least 1 menu section if there is no widget section
+  # Grid sections are completely optional
+  
+  if len(widgets) == 0 and len(menus) == 0:
+    raise LayoutError('Missing widget or menu section in layout for {}'.format(class_name))
+  elif len(widgets) > 1:
+    # There can be only one
+    raise LayoutError('Multiple widget sections found in layout for {}'.format(class_name))
+
+  if len(widgets) == 0:
+    return (None, menus)
+
+  widget_sec = widgets[0]
+    
+  # Find all the grid and place sections
+  grids = [s for s in sections if isinstance(s, GridSection)]
+  
+  # Set grid parameters on widgets and verify container widgets all use the
+  # same layout manager
+  with profile_phase('passes'):
+    PassManager().run(widget_sec, grids, class_name)
+    apply_resize_policies([s for s in sections if s.name == 'resize'], widget_sec, class_name)
+    apply_data_sources([s for s in sections if s.name == 'data'], widget_sec, class_name)
+
+  return (widget_sec, menus)
+
+
+def code_size(code):
+  '''Compute the total bytecode size of a code object and any code nested in it
+  Args:
+    code (code object): Compiled code
+  Returns:
+    int: Number of bytes of bytecode
+  '''
+  size = 0
+  stack = [code]
+  while stack:
+    co = stack.pop()
+    size += len(co.co_code)
+    stack.extend(c for c in co.co_consts if isinstance(c, types.CodeType))
+  return size
+
+
+def layout_stats(layout, method_name='_build_widgets', lib_prefix=None, class_name=None, require_docutils=False):
+  '''Measure the complexity of a layout without building it
+
+  The number of Tcl calls is estimated from one call to create each widget and menu,
+  one to manage the geometry of each widget, one for each menu entry, and one to
+  attach the default menubar. A cell of a canvas grid takes one call to create its
+  text item, one to measure it, and one to position it. Cells with a background
+  add two for their rectangle. Each canvas grid takes three calls to create, pack,
+  and size its Canvas.
+
+  Args:
+    layout (str):                Layout specification
+    method_name (str, optional): Name for the generated method
+    lib_prefix (str, optional):  Library prefix for widgets
+    class_name (str, optional):  Class name for error messages
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+  Returns:
+    dict: Statistics for the 'widgets', 'grids', 'menus', and generated 'code' along with the
+    estimated number of 'tcl_calls' to build the layout
+  '''
+  if lib_prefix is None:
+    lib_prefix = find_tkinter_name()
+
+  sections = parse_layout_spec(layout, class_name, require_docutils)
+  widget_sec, menus = analyze_sections(sections, class_name)
+
+  # Widget tree
+  widgets = widget_sec.widgets if widget_sec is not None else []
+  kinds = collections.Counter()
+  max_depth = 0
+  max_fanout = len(widgets)
+  containers = 0
+  canvas_cells = 0
+  filled_cells = 0 # Canvas cells with a background rectangle
+  canvas_grids = 0
+  stack = [(w, 1) for w in widgets]
+  while stack:
+    w, depth = stack.pop()
+    kinds[w.kind] += 1
+    max_depth = max(max_depth, depth)
+    if w.layout_mgr == 'canvas':
+      canvas_cells += 1
+      try:
+        params = parse_params(w.params) if len(w.params.strip()) > 0 else {}
+      except ParameterError:
+        params = {}
+      if 'bg' in params or 'background' in params:
+        filled_cells += 1
+    if len(w.children) > 0:
+      containers += 1
+      max_fanout = max(max_fanout, len(w.children))
+      if w.children[0].layout_mgr == 'canvas':
+        canvas_grids += 1
+      stack.extend((c, depth + 1) for c in w.children)
+
+  widget_stats = {'total': sum(kinds.values()), 'by_kind': dict(kinds), 'max_depth': max_depth,
+    'max_fanout': max_fanout, 'containers': containers}
+
+  # Grid tables
+  grid_stats = []
+  for g in (s for s in sections if isinstance(s, GridSection)):
+    cells = [v for k, v in g.grid_data.iteritems() if k not in ('_container', '_mode')]
+    grid_stats.append({
+      'container': g.grid_data['_container'],
+      'mode': g.mode,
+      'rows': max([c['row'] + c.get('rowspan', 1) for c in cells] or [0]),
+      'columns': max([c['column'] + c.get('columnspan', 1) for c in cells] or [0]),
+      'cells': len(cells),
+      'rowspans': sum(1 for c in cells if c.get('rowspan', 1) > 1),
+      'columnspans': sum(1 for c in cells if c.get('columnspan', 1) > 1)
+    })
+
+  # Menus
+  menu_stats = []
+  for m in menus:
+    counts = collections.Counter()
+    max_depth = 0
+    stack = [(i, 1) for i in m.items]
+    while stack:
+      i, depth = stack.pop()
+      max_depth = max(max_depth, depth)
+      if len(i.children) > 0:
+        counts['cascades'] += 1
+        stack.extend((c, depth + 1) for c in i.children)
+      elif i.kind == 'separator':
+        counts['separators'] += 1
+      else:
+        counts['entries'] += 1
+    menu_stats.append({'name': m.param if m.param else 'menubar', 'entries': counts['entries'],
+      'cascades': counts['cascades'], 'separators': counts['separators'], 'max_depth': max_depth})
+
+  # Generated code
+  code = generate_layout_method(widget_sec, menus, method_name, 'self', lib_prefix, deterministic=True)
+  code_stats = {'lines': len(code.splitlines()), 'chars': len(code),
+    'bytecode': code_size(compile(code, '<guidoc>', 'exec'))}
+
+  tcl_calls = 2 * (widget_stats['total'] - canvas_cells) + 3 * canvas_cells + 2 * filled_cells + 3 * canvas_grids
+  for m in menu_stats:
+    tcl_calls += 1 + 2 * m['cascades'] + m['entries'] + m['separators'] # Menus, cascade entries, and items
+    if m['name'] == 'menubar':
+      tcl_calls += 1
+
+  return {'widgets': widget_stats, 'grids': grid_stats, 'menus': menu_stats, 'code': code_stats,
+    'tcl_calls': tcl_calls}
+
+
+
+def layout_hash(text):
+  '''Compute a content hash for layout text
+  Args:
+    text (str): Text to hash
+  Returns:
+    str: Hex digest of the text
+  '''
+  if not isinstance(text, bytes):
+    text = text.encode('utf-8')
+  return hashlib.sha1(text).hexdigest()
+
+
+class IncrementalParser(object):
+  '''Parser for successive revisions of a layout spec
+
+  Sections are cached by a hash of their content so that only the sections
+  whose text has changed since the previous revision are parsed again. Grid
+  attributes and the layout manager checks are only reapplied to the containers
+  affected by a change.
+
+  Args:
+    class_name (str, optional): Class name for error messages
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+  Attributes:
+    sections (list(Section)):  Parsed sections of the current revision
+    widget_sec (WidgetSection): Widget section of the current revision or None
+    menus (list(MenuSection)): Menu sections of the current revision
   '''
-  for w in widgets:
-    print('{}{} {}'.format(' '*indent*2, w.name, w.kind))
-    if len(w.children) > 0:
-      print_widget_tree(w.children, indent+1)
+  def __init__(self, class_name=None, require_docutils=False):
+    self.class_name = class_name
+    self.require_docutils = require_docutils
+    self.sections = []
+    self.widget_sec = None
+    self.menus = []
+    self._grids = []
+    self._cache = {}    # Parsed sections keyed by content hash
+    self._pristine = {} # Layout manager settings of each widget before grids were applied
+
+  @staticmethod
+  def section_hash(section):
+    '''Compute the content hash of an unparsed section
+    Args:
+      section (Section): Section to hash
+    Returns:
+      str: Hex digest of the section heading and lines
+    '''
+    heading = [section.name, str(section.param)]
+    if getattr(section, 'mode', None):
+      heading.append(section.mode)
+    return layout_hash('\n'.join(['[{}]'.format(' '.join(heading))] + section.lines))
+
+  def update(self, spec):
+    '''Parse a revision of the layout spec
+    Args:
+      spec (str): Layout specification
+    Returns:
+      tuple: The WidgetSection or None, a list of MenuSection objects, and a list of
+      the WidgetSpec and Section objects that are new or changed since the previous revision
+    '''
+    cache = {}
+    sections = []
+    fresh = []
+    for s in split_layout_spec(spec):
+      key = self.section_hash(s)
+      if key in self._cache and key not in cache:
+        s = self._cache[key]
+      else:
+        s.parse(self.class_name, require_docutils=self.require_docutils)
+        fresh.append(s)
+      cache.setdefault(key, s)
+      sections.append(s)
+
+    widgets = [s for s in sections if s.name == 'widgets']
+    menus = [s for s in sections if s.name == 'menu']
+    grids = [s for s in sections if isinstance(s, GridSection)]
+
+    if len(widgets) == 0 and len(menus) == 0:
+      raise LayoutError('Missing widget or menu section in layout for {}'.format(self.class_name))
+    elif len(widgets) > 1:
+      raise LayoutError('Multiple widget sections found in layout for {}'.format(self.class_name))
+
+    changed = []
+    widget_sec = widgets[0] if len(widgets) > 0 else None
+    pristine = self._pristine
+
+    if widget_sec is not None and widget_sec is not self.widget_sec:
+      # New widget tree. Apply all grids and compare with the previous tree.
+      pristine = {w.name: (w.layout_mgr, dict(w.layout_params)) for w, _ in walk_widgets(widget_sec.widgets)}
+      PassManager().run(widget_sec, grids, self.class_name)
+
+      old = {}
+      if self.widget_sec is not None:
+        old = {w.name: (w, parent) for w, parent in walk_widgets(self.widget_sec.widgets)}
+
+      for w, parent in walk_widgets(widget_sec.widgets):
+        if w.name not in old:
+          changed.append(w)
+          continue
+        ow, oparent = old[w.name]
+        if (ow.kind, ow.params, ow.layout_mgr, ow.layout_params) != (w.kind, w.params, w.layout_mgr, w.layout_params) \
+          or (oparent.name if oparent else None) != (parent.name if parent else None) \
+          or [c.name for c in ow.children] != [c.name for c in w.children]:
+          changed.append(w)
+
+    elif widget_sec is not None:
+      # Same widget tree. Only reapply grids that were added, changed, or removed.
+      prev = set(id(g) for g in self._grids)
+      cur = set(id(g) for g in grids)
+      affected = set(g.grid_data['_container'] for g in grids if id(g) not in prev)
+      affected.update(g.grid_data['_container'] for g in self._grids if id(g) not in cur)
+
+      if len(affected) > 0:
+        index = {}
+        index_widgets(widget_sec.widgets, index)
+
+        before = []
+        for name in affected:
+          if name is None:
+            children = widget_sec.widgets
+          elif name in index:
+            children = index[name].children
+          else:
+            continue
+          for c in children:
+            before.append((c, c.layout_mgr, dict(c.layout_params)))
+            c.layout_mgr, params = pristine[c.name]
+            c.layout_params = dict(params)
+
+        PassManager().run(widget_sec, grids, self.class_name, affected)
+
+        changed.extend(c for c, mgr, params in before if (c.layout_mgr, c.layout_params) != (mgr, params))
+
+    if widget_sec is not None:
+      apply_resize_policies([s for s in sections if s.name == 'resize'], widget_sec, self.class_name)
+      apply_data_sources([s for s in sections if s.name == 'data'], widget_sec, self.class_name)
+
+    changed.extend(s for s in fresh if s.name != 'widgets')
+
+    self.sections = sections
+    self.widget_sec = widget_sec
+    self.menus = menus
+    self._grids = grids
+    self._cache = cache
+    self._pristine = pristine
+    return (widget_sec, menus, changed)
+
+  def code(self, method_name, parent='self', lib_prefix=None, pooled=False, deterministic=False):
+    '''Generate a layout method for the current revision
+    Args:
+      method_name (str):           Name for the method to generate
+      parent (str, optional):      Parent object for the widgets. Defaults to "self"
+      lib_prefix (str, optional):  Library prefix for widgets
+      pooled (bool, optional):     Acquire widgets from the WidgetPool in self._guidoc_pool
+      deterministic (bool, optional): Omit the generation time from the code
+    Returns:
+      str: The generated function declaration
+    '''
+    if lib_prefix is None:
+      lib_prefix = find_tkinter_name()
+    return generate_layout_method(self.widget_sec, self.menus, method_name, parent, lib_prefix, pooled, deterministic)
+
+
+def generate_layout_method(widget_sec, menus, method_name, parent='self', lib_prefix=None, pooled=False,
+  deterministic=False, source_map=None, symbols=None):
+  '''Generate the code for a method from analyzed layout sections
+  Args:
+    widget_sec (WidgetSection): Widget section with grid attributes applied or None
+    menus (list(MenuSection)):  Menu sections
+    method_name (str):          Name for the method to generate
+    parent (str, optional):     Parent object for the widgets. Defaults to "self"
+    lib_prefix (str, optional): Library prefix for widgets
+    pooled (bool, optional):    Acquire widgets from the WidgetPool in self._guidoc_pool instead of constructing them
+    deterministic (bool, optional): Omit the generation time so identical input produces identical code
+    source_map (list, optional): Filled with the WidgetSpec, MenuSpec, or MenuSection that produced each line
+      of the method. Lines that don't belong to any of them are None.
+    symbols (SymbolTable, optional): Table for resolving widget classes. Built from lib_prefix when omitted.
+  Returns:
+    str: The generated function declaration that implements the layout
+  '''
+  method_body = []
+
+  if symbols is None:
+    symbols = SymbolTable(lib_prefix)
+
+  if source_map is not None:
+    source_map.extend([None, None]) # Declaration and docstring
+
+  if widget_sec is not None:
+    # Generate method code
+    method_body = list(widget_sec.code(parent, lib_prefix, pooled, source_map, symbols))
+
+  # Add menu(s)
+  if len(menus) > 0:
+    for m in menus:
+      method_body.append('')
+      if source_map is not None:
+        source_map.append(None)
+      method_body.extend(list(m.code(parent, lib_prefix, source_map, symbols)))
+
+  # Build the complete method source code
+  if deterministic:
+    origin = 'v{}'.format(__version__)
+  else:
+    origin = 'on {}'.format(datetime.now())
+
+  method = '''def {}(self):
+  """Tk layout generated by guidoc {}"""
+{}'''.format(method_name, origin, '\n'.join(indent(method_body, 2)))
+
+  #print(method)
+  return method
+
+
+def create_layout_method(layout, method_name, parent='self', lib_prefix=None, class_name=None, require_docutils=False,
+  pooled=False, deterministic=False, source_map=None, symbols=None):
+  '''Create a code string for a method that can be inserted into a widget container class
+  Args:
+    layout (str):                Layout specification
+    method_name (str):           Name for the method to generate
+    parent (str, optional):      Parent object for the widgets. Defaults to "self"
+    lib_prefix (str, optional):  Library prefix for widgets
+    class_name (str, optional):  Class name for error messages
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+    pooled (bool, optional):     Acquire widgets from the WidgetPool in self._guidoc_pool instead of constructing them
+    deterministic (bool, optional): Omit the generation time so identical input produces identical code
+    source_map (list, optional): Filled with the spec object that produced each line of the method
+    symbols (SymbolTable, optional): Table for resolving widget classes. Built from lib_prefix when omitted.
+  Returns:
+    str: The generated function declaration that implements the layout specification
+  '''
+
+  # Attempt to auto-discover the library prefix
+  if symbols is not None:
+    lib_prefix = symbols.lib_prefix
+  elif lib_prefix is None:
+    lib_prefix = find_tkinter_name()
+
+  with profile_layout(class_name if class_name else method_name):
+    widget_sec, menus = analyze_layout(layout, class_name, require_docutils)
+    with profile_phase('codegen'):
+      return generate_layout_method(widget_sec, menus, method_name, parent, lib_prefix, pooled, deterministic,
+        source_map, symbols)
+
+
+# Match an attribute assignment in generated code
+attr_assign_re = re.compile(r'^\s*self\.(\w+)\s*=[^=]', re.MULTILINE)
+
+def create_layout_class(layout, view_name, base='Frame', method_name='_build_widgets', lib_prefix=None, class_name=None,
+  require_docutils=False, pooled=False, deterministic=False, handles=False):
+  '''Create a code string for a complete view class that implements a layout
+
+  The class declares __slots__ for every attribute assigned by the layout method so
+  that its widgets and menus don't need entries in an instance dict. It also derives
+  from object so that the slots take effect on the old-style Tkinter classes of
+  Python 2. The Tkinter base class still keeps its own attributes in a dict.
+
+  Args:
+    layout (str):                Layout specification
+    view_name (str):             Name of the class to generate
+    base (str, optional):        Widget class the view derives from. Defaults to "Frame"
+    method_name (str, optional): Name for the layout method
+    lib_prefix (str, optional):  Library prefix for widgets
+    class_name (str, optional):  Name for error messages
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+    pooled (bool, optional):     Acquire widgets from the WidgetPool in self._guidoc_pool instead of constructing them
+    deterministic (bool, optional): Omit the generation time so identical input produces identical code
+    handles (bool, optional):    Also keep a tuple of the widgets in the _guidoc_handles slot. The
+      attribute name of each one is in the _guidoc_names class attribute.
+  Returns:
+    str: The generated class definition
+  '''
+  symbols = SymbolTable(lib_prefix)
+  method = create_layout_method(layout, method_name, 'self', class_name=class_name, require_docutils=require_docutils,
+    pooled=pooled, deterministic=deterministic, symbols=symbols)
+
+  # Menus can assign the same attribute more than once
+  names = []
+  for m in attr_assign_re.finditer(method):
+    if m.group(1) not in names:
+      names.append(m.group(1))
+
+  def name_tuple(names):
+    items = ', '.join("'{}'".format(n) for n in names) + (',' if len(names) == 1 else '')
+    return '({})'.format('\n    '.join(textwrap.wrap(items, 100)))
+
+  base = symbols.resolve(base)
+  lines = ['class {}({}, object):'.format(view_name, base),
+    '  """Tk view generated by guidoc"""',
+    '  __slots__ = {}'.format(name_tuple(names + ['_guidoc_handles'] if handles else names))]
+  if handles:
+    lines.append('  _guidoc_names = {}'.format(name_tuple(names)))
+
+  lines.extend(['', '  def __init__(self, master=None, **kw):',
+    '    {}.__init__(self, master, **kw)'.format(base),
+    '    self.{}()'.format(method_name)])
+  if handles:
+    lines.append('    self._guidoc_handles = tuple(getattr(self, n) for n in self._guidoc_names)')
+
+  lines.append('')
+  lines.extend(indent(method.split('\n'), 2))
+  return '\n'.join(lines)
+
+
+def tk_layout(layout='', lib_prefix=None, libraries={}, method_name='_build_widgets', layout_file=None, require_docutils=False,
+  pool=None, hot_reload=False, geometry_cache=None):
+  '''Class decorator to parse a layout spec and add a builder method for the layout
+  Args:
+    layout (str, optional): Layout specification
+    lib_prefix (str, optional): Python library prefix for all Tk widgets
+    libraries (dict, optional): Dictionary of user packages keyed by name
+    method_name (str, optional): The name of the method to add to the class
+    file_name (str, optional): File containing layout specification. Only used when layout is empty.
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+    pool (WidgetPool, optional): Pool to acquire widgets from. Widgets are constructed directly when None.
+    hot_reload (bool, optional): Watch layout_file and patch the widgets of each instance when it changes.
+      This is intended for development only.
+    geometry_cache (GeometryCache, optional): Cache for pre-sizing the toplevel with the size it settled
+      at in a previous run.
+  '''
+  
+  if not layout and layout_file:
+    try:
+      with open(layout_file, 'r') as fh:
+        layout = fh.read()
+    except IOError:
+      pass
+  
+  # We require either a layout or a valid file_name
+  assert layout, 'Missing layout specification'
+  
+  def layout_tk_class(cls):
+    # Resolve widget classes against the module defining the class
+    module = sys.modules.get(cls.__module__, None)
+    symbols = module_symbols(vars(module) if module is not None else {}, lib_prefix, libraries)
+
+    source_map = []
+    with profile_layout(cls.__name__):
+      code = create_layout_method(layout, method_name, 'self', lib_prefix, cls.__name__, require_docutils,
+        pool is not None, source_map=source_map, symbols=symbols)
+      with profile_phase('exec'):
+        co = compile_method(code, method_name, symbols.libraries)
+    if co:
+      setattr(cls, method_name, co)   # Add method to the class
+      setattr(cls, '_guidoc', layout) # Save the original layout
+      setattr(cls, '_guidoc_source_map', (co.__code__, source_map)) # Attribute lines of the method to specs for TclTracer
+      if pool is not None:
+        setattr(cls, '_guidoc_pool', pool)
+
+      build = co
+      if geometry_cache is not None:
+        layout_name = '{}.{}'.format(cls.__module__, cls.__name__)
+        def build_and_presize(self):
+          co(self)
+          geometry_cache.apply(self, layout_name, layout)
+        build = build_and_presize
+        setattr(cls, method_name, build)
+
+      if hot_reload and layout_file:
+        def build_and_watch(self):
+          build(self)
+          # A rebuild replaces the watcher of the previous build
+          if getattr(self, '_guidoc_reloader', None) is not None:
+            self._guidoc_reloader.stop()
+          self._guidoc_reloader = LayoutReloader(self, layout_file, layout, lib_prefix, libraries, require_docutils)
+          self._guidoc_reloader.start()
+        setattr(cls, method_name, build_and_watch)
+
+    return cls
+    
+  return layout_tk_class
+
+
+def dump_layouts(glbls):
+  '''Dump all guidoc layouts found within a namespace
+  This writes a file with the contents of the '_guidoc' attribute
+  from every object in the glbls dict. This allows you to generate
+  static _build_widgets() methods with the guidoc command line mode.
+
+  Args:
+    glbls (dict): Dictionary of namespace objects produced by the globals() function.
+
+  Returns:
+    list: List of the files written
+  '''
+  for k in glbls.iterkeys():
+    files = []
+    if hasattr(glbls[k], '_guidoc'):
+      fname = k + '.guidoc'
+      with open(fname, 'w') as fh:
+        fh.write(glbls[k]._guidoc)
+        files.append(fname)
+  return files
+
+
+#########################
+##### IMPORT HOOK #######
+
+def module_imports(code, lib_prefix='tk', libraries={}):
+  '''Get the imports needed by generated code in a module of its own
+  Args:
+    code (str): Generated code
+    lib_prefix (str, optional): Library prefix used by the code. Tkinter is always imported as tk.
+    libraries (dict, optional): Dictionary of user packages keyed by name
+  Returns:
+    list(str): Lines of the import statements
+  '''
+  imports = ['try:', '  import tkinter as tk', 'except ImportError:', '  import Tkinter as tk']
+  lib_prefix = lib_prefix.rstrip('.') if lib_prefix else 'tk'
+  if lib_prefix in ('tkinter', 'Tkinter'):
+    imports.extend(['try:', '  import tkinter as {}'.format(lib_prefix), 'except ImportError:',
+      '  import Tkinter as {}'.format(lib_prefix)])
+  elif lib_prefix == 'ttk':
+    imports.extend(['try:', '  from tkinter import ttk', 'except ImportError:', '  import ttk'])
+  elif lib_prefix != 'tk' and lib_prefix not in libraries:
+    imports.append('import {}'.format(lib_prefix))
+
+  for name, lib in sorted(libraries.iteritems()):
+    imports.append('import {} as {}'.format(lib.__name__, name))
+
+  runtime = [n for n in ('CanvasGrid', 'ResizeCoalescer', 'DataLoader') if '{}('.format(n) in code]
+  if len(runtime) > 0:
+    imports.append('from guidoc import {}'.format(', '.join(runtime)))
+  return imports
+
+
+def layout_module_source(layout, method_name='_build_widgets', libraries={}, require_docutils=False, origin=None):
+  '''Generate the source for a module that implements a layout
+  Args:
+    layout (str): Layout specification
+    method_name (str, optional): Name of the generated build function
+    libraries (dict, optional): Dictionary of user packages keyed by name. They are imported by the module.
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+    origin (str, optional): Name of the spec file for error messages
+  Returns:
+    str: Python source for the module
+  '''
+  symbols = SymbolTable('tk', libraries=libraries)
+  code = create_layout_method(layout, method_name, 'self', 'tk', origin, require_docutils, deterministic=True,
+    symbols=symbols)
+  imports = module_imports(code, 'tk', libraries)
+
+  return '''# Generated by guidoc from {}
+{}
+
+_guidoc = {!r}
+
+{}
+'''.format(origin if origin else 'a layout specification', '\n'.join(imports), layout, code)
+
+
+try:
+  import importlib.machinery
+  have_import_machinery = True
+except ImportError:
+  have_import_machinery = False
+
+if have_import_machinery:
+  class GuidocLoader(importlib.machinery.SourceFileLoader):
+    '''Loader that compiles a .guidoc layout file into a module
+
+    The module has the generated build function and the layout text in its
+    _guidoc attribute. The standard bytecode cache is used so warm imports skip
+    parsing entirely. Cached bytecode is invalidated when the layout file, the
+    guidoc module, or the code generation options change.
+    '''
+    method_name = '_build_widgets'
+    libraries = {}
+    require_docutils = False
+
+    def path_stats(self, path):
+      stats = importlib.machinery.SourceFileLoader.path_stats(self, path)
+      # Changes to the code generator also invalidate the cache
+      stats['mtime'] = max(stats['mtime'], os.path.getmtime(__file__))
+      # The source size in the bytecode header also covers the options
+      stats['size'] = (stats['size'] + self.options_hash()) & 0xFFFFFFFF
+      return stats
+
+    @classmethod
+    def options_hash(cls):
+      '''Hash the code generation options to an int'''
+      options = {'method_name': cls.method_name, 'require_docutils': cls.require_docutils,
+        'libraries': dict((k, v.__name__) for k, v in cls.libraries.iteritems())}
+      return int(layout_hash(json.dumps(options, sort_keys=True))[:8], 16)
+
+    def source_to_code(self, data, path, _optimize=-1):
+      if isinstance(data, bytes):
+        data = data.decode('utf-8')
+      source = layout_module_source(data, self.method_name, self.libraries, self.require_docutils, path)
+      return compile(source, path, 'exec', dont_inherit=True, optimize=_optimize)
+
+
+_import_hook = None
+
+def install_import_hook(method_name='_build_widgets', libraries={}, require_docutils=False):
+  '''Allow layout files with a .guidoc extension to be imported as modules
+
+  Each module has the generated build function and the layout text in its
+  _guidoc attribute. This requires Python 3.
+
+  Args:
+    method_name (str, optional): Name of the generated build function
+    libraries (dict, optional): Dictionary of user packages keyed by name. They are imported by each module.
+    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+  '''
+  global _import_hook
+
+  if not have_import_machinery:
+    raise LayoutError('Importing layout files requires Python 3')
+
+  GuidocLoader.method_name = method_name
+  GuidocLoader.libraries = libraries
+  GuidocLoader.require_docutils = require_docutils
+
+  if _import_hook is None:
+    m = importlib.machinery
+    _import_hook = m.FileFinder.path_hook((m.ExtensionFileLoader, m.EXTENSION_SUFFIXES),
+      (m.SourceFileLoader, m.SOURCE_SUFFIXES), (m.SourcelessFileLoader, m.BYTECODE_SUFFIXES),
+      (GuidocLoader, ['.guidoc']))
+    sys.path_hooks.insert(0, _import_hook)
+    sys.path_importer_cache.clear()
+    importlib.invalidate_caches()
+
+def remove_import_hook():
+  '''Stop importing layout files as modules'''
+  global _import_hook
+
+  if _import_hook is not None:
+    sys.path_hooks.remove(_import_hook)
+    sys.path_importer_cache.clear()
+    importlib.invalidate_caches()
+    _import_hook = None
+
+
+#########################
+####### POOLING #########
+
+class WidgetPool(object):
+  '''Pool of idle widgets reused by layouts generated with pooling enabled
+
+  Pooled layouts call acquire() in place of each widget constructor. Widgets
+  released back to the pool are unmapped from their geometry manager and have
+  their options restored to the defaults. The next build reconfigures an idle
+  widget instead of creating a new one. Tk can't reparent a widget so idle
+  widgets are kept separately for each widget class and master.
+
+  Args:
+    max_idle (int, optional): Maximum number of idle widgets kept for each class and master
+    stats_hook (callable, optional): Called as stats_hook(event, kind, widget) where event is
+      one of 'create', 'reuse', 'release', or 'evict'
+  '''
+  # Options that can only be set when a widget is created
+  creation_options = ('class', 'colormap', 'container', 'screen', 'use', 'visual')
+
+  def __init__(self, max_idle=None, stats_hook=None):
+    self.max_idle = max_idle
+    self.stats_hook = stats_hook
+    self.reset_hooks = {}
+    self._idle = {}    # Idle widgets keyed by (class, master path)
+    self._owned = {}   # Busy state of every widget issued by the pool keyed by path
+    self._counts = {}  # Event counts keyed by class name
+
+  def add_reset_hook(self, kind, hook):
+    '''Register a function that clears widget state not stored in its options
+    Args:
+      kind (class): Widget class the hook applies to. Subclasses are included.
+      hook (callable): Called with each released widget
+    '''
+    self.reset_hooks.setdefault(kind, []).append(hook)
+
+  def _event(self, event, kind, widget):
+    counts = self._counts.setdefault(kind.__name__, {'create':0, 'reuse':0, 'release':0, 'evict':0})
+    counts[event] += 1
+    if self.stats_hook is not None:
+      self.stats_hook(event, kind, widget)
+
+  def acquire(self, kind, master, **options):
+    '''Get an idle widget from the pool or create a new one
+    Args:
+      kind (class): Widget class to acquire
+      master (widget): Parent of the widget
+      options (dict): Widget options
+    Returns:
+      A widget of the requested class configured with options
+    '''
+    idle = self._idle.get((kind, str(master)))
+    while idle:
+      w = idle.pop()
+      if not w.winfo_exists(): # Destroyed along with an evicted master
+        del self._owned[str(w)]
+        continue
+
+      if len(options) > 0:
+        w.configure(**options)
+      self._owned[str(w)] = True
+      self._event('reuse', kind, w)
+      return w
+
+    w = kind(master, **options)
+    self._owned[str(w)] = True
+    self._event('create', kind, w)
+    return w
+
+  def _reset(self, widget):
+    '''Restore widget options to their defaults and run any reset hooks'''
+    defaults = {}
+    for k, v in widget.configure().iteritems():
+      # Skip aliases and options that can't be changed after creation
+      if len(v) == 5 and k not in self.creation_options and str(v[3]) != str(v[4]):
+        defaults[k] = v[3]
+
+    if len(defaults) > 0:
+      try:
+        widget.configure(**defaults)
+      except tk.TclError: # Retry individually to skip the offending option
+        for k, v in defaults.iteritems():
+          try:
+            widget.configure({k: v})
+          except tk.TclError:
+            pass
+
+    for cls in inspect.getmro(widget.__class__): # Tkinter classes are old style in Python 2
+      for hook in self.reset_hooks.get(cls, ()):
+        hook(widget)
+
+  def release(self, widget):
+    '''Unmap a widget and return it to the pool
+    Args:
+      widget (widget): Widget to release. Widgets not issued by this pool are ignored.
+    Returns:
+      bool: True if the widget was released
+    '''
+    path = str(widget)
+    if not self._owned.get(path, False):
+      return False
+
+    kind = widget.__class__ # type() is 'instance' for old style classes
+    mgr = widget.winfo_manager()
+    if mgr in ('pack', 'grid', 'place'):
+      getattr(widget, mgr + '_forget')()
+
+    self._reset(widget)
+
+    idle = self._idle.setdefault((kind, str(widget.master)), [])
+    if self.max_idle is not None and len(idle) >= self.max_idle:
+      del self._owned[path]
+      self._event('evict', kind, widget)
+      widget.destroy()
+    else:
+      self._owned[path] = False
+      idle.append(widget)
+      self._event('release', kind, widget)
+
+    return True
+
+  def release_children(self, container):
+    '''Return all pooled descendants of a container to the pool
+
+    The container can then run its pooled layout method again.
+    Args:
+      container (widget): Widget whose descendants are released
+    Returns:
+      int: Number of widgets released
+    '''
+    released = 0
+    for w in list(container.children.values()):
+      # Children go first so they remain pooled under their master if it gets evicted
+      released += self.release_children(w)
+      if self.release(w):
+        released += 1
+    return released
+
+  def stats(self):
+    '''Get pool usage statistics
+    Returns:
+      dict: Totals for the 'create', 'reuse', 'release', and 'evict' events, the
+      number of 'idle' widgets, the 'reuse_rate' of all acquisitions, and the same
+      event counts for each widget class in 'kinds'.
+    '''
+    totals = {'create':0, 'reuse':0, 'release':0, 'evict':0}
+    for counts in self._counts.itervalues():
+      for k, v in counts.iteritems():
+        totals[k] += v
+
+    acquired = totals['create'] + totals['reuse']
+    totals['reuse_rate'] = float(totals['reuse']) / acquired if acquired > 0 else 0.0
+    totals['idle'] = sum(len(idle) for idle in self._idle.itervalues())
+    totals['kinds'] = {k: dict(v) for k, v in self._counts.iteritems()}
+    return totals
+
+
+class DialogCache(object):
+  '''Keep closed dialogs withdrawn so they can be shown again without rebuilding them
+
+  Dialogs are Toplevel subclasses, usually with a generated layout. open() shows a
+  closed dialog of the requested class again if one is cached. Otherwise a new one
+  is constructed. Closing a dialog with close() or its window manager close button
+  withdraws it instead of destroying it. The least recently closed dialogs are
+  destroyed once more than max_size are cached.
+
+  Args:
+    max_size (int, optional): Maximum number of closed dialogs kept
+    stats_hook (callable, optional): Called as stats_hook(event, kind, dialog) where event is
+      one of 'create', 'reuse', 'close', or 'evict'
+  '''
+  def __init__(self, max_size=8, stats_hook=None):
+    self.max_size = max_size
+    self.stats_hook = stats_hook
+    self.reset_hooks = {}
+    self._closed = collections.OrderedDict() # Withdrawn dialogs keyed by (class, master path) in LRU order
+    self._counts = {} # Event counts keyed by class name
+
+  def add_reset_hook(self, kind, hook):
+    '''Register a function that restores the initial state of a reused dialog
+    Args:
+      kind (class): Dialog class the hook applies to. Subclasses are included.
+      hook (callable): Called with each dialog before it is shown again
+    '''
+    self.reset_hooks.setdefault(kind, []).append(hook)
+
+  def _event(self, event, kind, dialog):
+    counts = self._counts.setdefault(kind.__name__, {'create':0, 'reuse':0, 'close':0, 'evict':0})
+    counts[event] += 1
+    if self.stats_hook is not None:
+      self.stats_hook(event, kind, dialog)
+
+  def open(self, kind, master=None, *args, **kw):
+    '''Show a cached dialog or create a new one
+    Args:
+      kind (class): Dialog class to open
+      master (widget, optional): Parent of the dialog
+      args (list): Positional arguments for the constructor. Only used for a new dialog.
+      kw (dict): Keyword arguments for the constructor. Only used for a new dialog.
+    Returns:
+      The dialog
+    '''
+    dialog = self._closed.pop((kind, str(master)), None)
+    if dialog is not None and dialog.winfo_exists():
+      for cls in inspect.getmro(dialog.__class__): # Tkinter classes are old-style in Python 2
+        for hook in self.reset_hooks.get(cls, ()):
+          hook(dialog)
+      dialog.deiconify()
+      self._event('reuse', kind, dialog)
+      return dialog
+
+    dialog = kind(master, *args, **kw)
+    dialog.protocol('WM_DELETE_WINDOW', lambda: self.close(dialog))
+    self._event('create', kind, dialog)
+    return dialog
+
+  def close(self, dialog):
+    '''Withdraw a dialog and keep it for reuse
+    Args:
+      dialog (Toplevel): Dialog to close
+    '''
+    kind = dialog.__class__
+    key = (kind, str(dialog.master))
+
+    dialog.grab_release()
+    dialog.withdraw()
+
+    # Only the most recently closed dialog of each class is kept
+    previous = self._closed.pop(key, None)
+    if previous is not None and previous is not dialog:
+      self._evict(previous)
+
+    self._closed[key] = dialog
+    self._event('close', kind, dialog)
+
+    while len(self._closed) > self.max_size:
+      self._evict(self._closed.popitem(last=False)[1])
+
+  def _evict(self, dialog):
+    self._event('evict', dialog.__class__, dialog)
+    dialog.destroy()
+
+  def clear(self):
+    '''Destroy all closed dialogs'''
+    while len(self._closed) > 0:
+      self._evict(self._closed.popitem(last=False)[1])
+
+  def stats(self):
+    '''Get cache usage statistics
+    Returns:
+      dict: Totals for the 'create', 'reuse', 'close', and 'evict' events, the
+      number of 'closed' dialogs, the 'reuse_rate' of all opens, and the same event
+      counts for each dialog class in 'kinds'.
+    '''
+    totals = {'create':0, 'reuse':0, 'close':0, 'evict':0}
+    for counts in self._counts.itervalues():
+      for k, v in counts.iteritems():
+        totals[k] += v
+
+    opened = totals['create'] + totals['reuse']
+    totals['reuse_rate'] = float(totals['reuse']) / opened if opened > 0 else 0.0
+    totals['closed'] = len(self._closed)
+    totals['kinds'] = {k: dict(v) for k, v in self._counts.iteritems()}
+    return totals
+
+
+#########################
+##### CANVAS GRIDS ######
+
+def canvas_grid_name(container):
+  '''Get the attribute that holds the CanvasGrid of a container in generated code
+  Args:
+    container (str): Attribute of the container widget
+  Returns:
+    str: Attribute of its CanvasGrid
+  '''
+  return '{}_cells'.format(container)
+
+
+def pad_pair(pad):
+  '''Convert a Tk padding value into a pair of integers'''
+  if isinstance(pad, (tuple, list)):
+    return (int(pad[0]), int(pad[-1]))
+  pad = int(pad) if pad else 0
+  return (pad, pad)
+
+
+class CanvasCell(object):
+  '''A grid cell drawn on a CanvasGrid
+
+  This takes the place of the Label or Message for the cell. It supports the option
+  methods of a widget so that code written to update the widget keeps working.
+
+  Attributes:
+    grid (CanvasGrid): Grid the cell is drawn on
+    name (str): Name of the widget this cell replaces
+    item (int): Canvas text item
+    rect (int): Canvas rectangle item for the background or None
+    options (dict): Widget options of the cell
+  '''
+  __slots__ = ('grid', 'name', 'item', 'rect', 'options', 'row', 'column', 'rowspan', 'columnspan',
+    'sticky', 'padx', 'pady')
+
+  def __init__(self, grid, name, row=0, column=0, rowspan=1, columnspan=1, sticky='', padx=0, pady=0):
+    self.grid = grid
+    self.name = name
+    self.item = None
+    self.rect = None
+    self.options = {}
+    self.row = int(row)
+    self.column = int(column)
+    self.rowspan = int(rowspan)
+    self.columnspan = int(columnspan)
+    self.sticky = sticky
+    self.padx = pad_pair(padx)
+    self.pady = pad_pair(pady)
+
+  def configure(self, cnf=None, **kw):
+    if cnf:
+      kw.update(cnf)
+    self.grid.configure(self.name, **kw)
+
+  config = configure
+
+  def cget(self, key):
+    return self.grid.cget(self.name, key)
+
+  __getitem__ = cget
+
+  def __setitem__(self, key, value):
+    self.grid.configure(self.name, **{key: value})
+
+  def __repr__(self):
+    return '<CanvasCell {} row={} column={}>'.format(self.name, self.row, self.column)
+
+
+class CanvasGrid(object):
+  '''Draw the cells of a grid layout as items on a single Canvas
+
+  This is used by the code generated for a grid section with the 'canvas' mode. Each
+  Label or Message in the container becomes a text item on one Canvas. A rectangle is
+  drawn behind cells that have a background color. Large read-only grids then cost a
+  few canvas items per cell instead of a window for every widget. Call layout() after
+  changes that alter the size of a cell.
+
+  The supported widget options are text, font, fg, foreground, justify, anchor, bg,
+  background, padx, pady, and wraplength. The width is the wrap length in pixels for
+  a Message and the minimum width in characters for a Label.
+
+  Args:
+    master (widget): Container for the canvas. The canvas is packed to fill it.
+    canvas_cls (class): Canvas widget class
+    kw (dict): Options for the canvas
+  Attributes:
+    canvas (Canvas): The canvas the cells are drawn on
+    cells (OrderedDict): CanvasCell objects keyed by name
+  '''
+  # Text item options for the widget options
+  text_options = {'text': 'text', 'font': 'font', 'fg': 'fill', 'foreground': 'fill', 'justify': 'justify',
+    'anchor': 'anchor', 'wraplength': 'width'}
+  # Widget options that are applied by layout()
+  cell_options = ('bg', 'background', 'padx', 'pady', 'width')
+
+  def __init__(self, master, canvas_cls, **kw):
+    options = {'highlightthickness': 0, 'borderwidth': 0}
+    options.update(kw)
+    self.canvas = canvas_cls(master, **options)
+    self.canvas.pack(fill='both', expand=1)
+    self.cells = collections.OrderedDict()
+    self._zero_widths = {} # Width of '0' keyed by font
+
+  def add(self, name, layout, kind='Label', **options):
+    '''Draw a new cell
+    Args:
+      name (str): Name of the widget the cell replaces
+      layout (dict): Grid geometry options for the cell
+      kind (str, optional): Widget class the cell replaces. 'Label' or 'Message'.
+      options (dict): Widget options for the cell
+    Returns:
+      CanvasCell: The new cell
+    '''
+    cell = CanvasCell(self, name, **layout)
+    if kind == 'Message' and 'width' in options: # Message width is a wrap length in pixels
+      options['wraplength'] = options.pop('width')
+    self.cells[name] = cell
+    self.configure(name, **options)
+    return cell
+
+  def configure(self, name, **options):
+    '''Change the options of a cell
+    Args:
+      name (str): Name of the cell
+      options (dict): Widget options to set
+    '''
+    cell = self.cells[name]
+    item_options = {}
+    for k, v in options.iteritems():
+      if k in CanvasGrid.text_options:
+        item_options[CanvasGrid.text_options[k]] = v
+      elif k not in CanvasGrid.cell_options:
+        raise tk.TclError('unknown option "-{}" for canvas grid cell {}'.format(k, name))
+    cell.options.update(options)
+
+    canvas = self.canvas
+    bg = options.get('bg', options.get('background', None))
+    if bg is not None:
+      if cell.rect is None:
+        cell.rect = canvas.create_rectangle(0, 0, 0, 0, fill=bg, outline='')
+        if cell.item is not None:
+          canvas.tag_lower(cell.rect, cell.item)
+      else:
+        canvas.itemconfigure(cell.rect, fill=bg)
+
+    if cell.item is None:
+      if 'anchor' not in item_options:
+        item_options['anchor'] = CanvasGrid.sticky_anchor(cell.sticky)
+      cell.item = canvas.create_text(0, 0, **item_options)
+    elif len(item_options) > 0:
+      canvas.itemconfigure(cell.item, **item_options)
+
+  def set_text(self, name, text):
+    '''Change the text of a cell
+    Args:
+      name (str): Name of the cell
+      text (str): New text
+    '''
+    cell = self.cells[name]
+    cell.options['text'] = text
+    self.canvas.itemconfigure(cell.item, text=text)
+
+  def cget(self, name, key):
+    '''Get an option of a cell
+    Args:
+      name (str): Name of the cell
+      key (str): Widget option
+    Returns:
+      The option value or an empty string when it hasn't been set
+    '''
+    return self.cells[name].options.get(key, '')
+
+  @staticmethod
+  def sticky_anchor(sticky):
+    '''Convert a grid sticky value into the anchor for text in a cell'''
+    sticky = sticky.lower() if sticky else ''
+    v = '' if ('n' in sticky) == ('s' in sticky) else ('n' if 'n' in sticky else 's')
+    h = '' if ('w' in sticky) == ('e' in sticky) else ('w' if 'w' in sticky else 'e')
+    return v + h if v or h else 'center'
+
+  def _zero_width(self, font):
+    if font not in self._zero_widths:
+      args = ('font', 'measure', font, '0') if font else ('font', 'measure', 'TkDefaultFont', '0')
+      self._zero_widths[font] = int(self.canvas.tk.call(*args))
+    return self._zero_widths[font]
+
+  def layout(self):
+    '''Size the rows and columns to fit their cells and position every item'''
+    canvas = self.canvas
+    cells = list(self.cells.values())
+    if len(cells) == 0:
+      return
+
+    # Measure the cells
+    sizes = []
+    for c in cells:
+      box = canvas.bbox(c.item)
+      w, h = (box[2] - box[0], box[3] - box[1]) if box else (0, 0)
+      if c.options.get('width', None) and 'wraplength' not in c.options: # Label width in characters
+        w = max(w, int(c.options['width']) * self._zero_width(c.options.get('font', None)))
+      ipadx = int(c.options.get('padx', 0))
+      ipady = int(c.options.get('pady', 0))
+      sizes.append((w + 2 * ipadx + sum(c.padx), h + 2 * ipady + sum(c.pady)))
+
+    # Fit the rows and columns to the cells. Spanning cells add any extra space
+    # they need to their last row or column.
+    widths = [0] * max(c.column + c.columnspan for c in cells)
+    heights = [0] * max(c.row + c.rowspan for c in cells)
+    for spanning in (False, True):
+      for c, (w, h) in zip(cells, sizes):
+        if (c.columnspan > 1) == spanning:
+          extra = w - sum(widths[c.column:c.column + c.columnspan])
+          if extra > 0:
+            widths[c.column + c.columnspan - 1] += extra
+        if (c.rowspan > 1) == spanning:
+          extra = h - sum(heights[c.row:c.row + c.rowspan])
+          if extra > 0:
+            heights[c.row + c.rowspan - 1] += extra
+
+    xs = [0]
+    for w in widths:
+      xs.append(xs[-1] + w)
+    ys = [0]
+    for h in heights:
+      ys.append(ys[-1] + h)
+
+    # Position the items
+    for c in cells:
+      x0 = xs[c.column] + c.padx[0]
+      x1 = xs[c.column + c.columnspan] - c.padx[1]
+      y0 = ys[c.row] + c.pady[0]
+      y1 = ys[c.row + c.rowspan] - c.pady[1]
+      if c.rect is not None:
+        canvas.coords(c.rect, x0, y0, x1, y1)
+
+      ipadx = int(c.options.get('padx', 0))
+      ipady = int(c.options.get('pady', 0))
+      anchor = c.options.get('anchor', None) or CanvasGrid.sticky_anchor(c.sticky)
+      sides = '' if anchor == 'center' else anchor
+      x = x0 + ipadx if 'w' in sides else (x1 - ipadx if 'e' in sides else (x0 + x1) // 2)
+      y = y0 + ipady if 'n' in sides else (y1 - ipady if 's' in sides else (y0 + y1) // 2)
+      canvas.coords(c.item, x, y)
+
+    canvas.configure(width=xs[-1], height=ys[-1])
 
-def print_menu_tree(nodes, indent=0):
-  '''Dump a parsed menu tree
-  Args:
-    nodes (list(MenuSpec)): Tree of MenuSpec objects
-    indent (int, optional): Characters to indent for each level of the tree
-  '''
-  for n in nodes:
-    print('{}{}'.format(' '*indent*2, n.label))
-    if len(n.children) > 0:
-      print_menu_tree(n.children, indent+1)
 
 
-def apply_grid_attributes(grids, widget_sec, class_name=None):
-  '''Set cell coordinates extracted from grid sections
+#########################
+#### GEOMETRY CACHE #####
+
+class GeometryCache(object):
+  '''Remember the settled size of layouts between runs of an application
+
+  A new window is normally shown at a default size and then grows in several steps
+  as the requested sizes of its widgets propagate up to it. The cache records the
+  final requested size of the toplevel holding each layout in a JSON file. On the
+  next run the toplevel is given that size before the first idle pass so it appears
+  at its final size. Entries are keyed by the hash of the layout spec and are
+  ignored once the spec changes. The cached size is only used until the layout
+  settles. The toplevel is then returned to its natural geometry so that it keeps
+  following the requested sizes of its widgets.
+
   Args:
-    grids (list(GridSection)): List of parsed grid sections
-    widget_sec (WidgetSection): The widget section to apply grid attributes to
-    class_name (str, optional): Class name for error messages
+    fname (str): File holding the cached sizes
+  Attributes:
+    entries (dict): Cached spec hashes and sizes keyed by layout name
   '''
+  def __init__(self, fname):
+    self.fname = fname
+    self.entries = self._read()
 
-  # Build an index of the widgets
-  index = {}
-  index_widgets(widget_sec.widgets, index)
+  def _read(self):
+    try:
+      with open(self.fname, 'r') as fh:
+        data = json.load(fh)
+    except (IOError, ValueError):
+      return {}
+
+    if not isinstance(data, dict) or data.get('guidoc_geometry', None) != 1:
+      return {}
+    return data.get('layouts', {})
+
+  def save(self):
+    '''Write the cached sizes to the cache file'''
+    text = json.dumps({'guidoc_geometry': 1, 'layouts': self.entries}, indent=1, sort_keys=True) + '\n'
+    try:
+      write_if_changed(self.fname, text)
+    except IOError as e: # The cache is only an optimization
+      print('guidoc: Unable to write geometry cache {}: {}'.format(self.fname, e), file=sys.stderr)
 
-  # Associate grids with their container widget
-  gindex = {}
-  for g in grids:
-    if g.grid_data['_container'] in index:
-      gindex[g.grid_data['_container']] = (index[g.grid_data['_container']].children, g.grid_data)
-    elif g.grid_data['_container'] is None: # Top level grid
-      gindex['<top>'] = (widget_sec.widgets, g.grid_data)
-      
-  # Set children of gridded containers to use grid layout
-  for w, g in gindex.itervalues():
-    for c in w:
-      if c.layout_mgr is None:
-        c.layout_mgr = 'grid'
+  def lookup(self, name, layout):
+    '''Get the cached size of a layout
+    Args:
+      name (str): Name of the layout
+      layout (str): Layout specification
+    Returns:
+      tuple: Width and height in pixels or None if there is no valid entry
+    '''
+    entry = self.entries.get(name, None)
+    if entry is None or entry.get('spec', None) != layout_hash(layout):
+      return None
+    return tuple(entry['size'])
 
-  # Apply grid parameters from tables
-  for w, g in gindex.itervalues():
-    for c in w:
-      if c.name in g:
-        grid_params = g[c.name]
-        if c.layout_mgr == 'grid':
-          c.layout_params.update(grid_params)
-  
-  # Set default grid coordinates for remaining widgets
-  for w, g in gindex.itervalues():
-    max_row = -1
-    try:
-      max_row = max(int(c.layout_params['row']) for c in w if 'row' in c.layout_params)
-    except ValueError: # Raised if list passed to max() is empty
-      raise LayoutError('Could not determine number of rows in grid for {}'.format(class_name))
+  def store(self, name, layout, size):
+    '''Record the size of a layout and save the cache if it changed
+    Args:
+      name (str): Name of the layout
+      layout (str): Layout specification
+      size (tuple): Width and height in pixels
+    '''
+    if self.lookup(name, layout) != tuple(size):
+      self.entries[name] = {'spec': layout_hash(layout), 'size': list(size)}
+      self.save()
 
-    next_row = max_row + 1
-    for c in w:
-      if c.layout_mgr == 'grid':
-        if 'row' not in c.layout_params:
-          c.layout_params['row'] = next_row
-          next_row += 1
-        if 'column' not in c.layout_params:
-          c.layout_params['column'] = 0
+  def apply(self, target, name, layout):
+    '''Pre-size the toplevel of a newly built layout and record its size once it settles
+    Args:
+      target (widget): Instance of a class built from the layout
+      name (str): Name of the layout
+      layout (str): Layout specification
+    '''
+    top = target.winfo_toplevel()
+    if not top.winfo_ismapped(): # Only pre-size a window that hasn't been shown
+      size = self.lookup(name, layout)
+      if size is not None:
+        top.wm_geometry('{}x{}'.format(*size))
+    target.after_idle(self._settle, top, name, layout)
 
+  def _settle(self, top, name, layout):
+    # Finish the geometry propagation scheduled by the build
+    top.update_idletasks()
+    settled = (top.winfo_reqwidth(), top.winfo_reqheight())
+    top.wm_geometry('') # Release the fixed size so the window tracks its widgets again
+    self.store(name, layout, settled)
+
+
+
+#########################
+###### HOT RELOAD #######
+
+def diff_widget_trees(old_widgets, new_widgets):
+  '''Find the changes needed to convert one widget tree into another
+
+  Widgets are matched by name. A widget whose kind or parent has changed can't
+  be patched in place. It is destroyed and created again along with all of its
+  descendants.
 
-def create_layout_method(layout, method_name, parent='self', lib_prefix=None, class_name=None, require_docutils=False):
-  '''Create a code string for a method that can be inserted into a widget container class
   Args:
-    layout (str):                Layout specification
-    method_name (str):           Name for the method to generate
-    parent (str, optional):      Parent object for the widgets. Defaults to "self"
-    lib_prefix (str, optional):  Library prefix for widgets
-    class_name (str, optional):  Class name for error messages
-    require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+    old_widgets (list(WidgetSpec)): Tree of WidgetSpec objects for the live layout
+    new_widgets (list(WidgetSpec)): Tree of WidgetSpec objects for the revised layout
   Returns:
-    str: The generated function declaration that implements the layout specification
+    list(tuple): Sequence of (operation, old spec, new spec, parent name) tuples. The operations are
+    'destroy', 'create', 'config', 'layout', and 'repack'. A 'repack' operation identifies a
+    container whose pack order must be rebuilt. Its new spec is None for the top level. The
+    parent name is None for top level widgets.
   '''
+  def preorder(widgets):
+    for w, parent in walk_widgets(widgets):
+      yield (w, parent.name if parent else None)
+
+  def pack_order(widgets):
+    return [w.name for w in widgets if w.layout_mgr in (None, 'pack')]
+
+  old = {w.name: (w, parent) for w, parent in preorder(old_widgets)}
+  new = {w.name: (w, parent) for w, parent in preorder(new_widgets)}
+
+  changes = []
+
+  # Remove widgets that are gone or can't be patched
+  doomed = set()
+  for w, parent in preorder(old_widgets):
+    if parent in doomed:
+      doomed.add(w.name) # Destroyed along with its parent
+    elif w.name not in new or new[w.name][0].kind != w.kind or new[w.name][1] != parent:
+      doomed.add(w.name)
+      changes.append(('destroy', w, None, parent))
+
+  # Containers that need their children repacked. None is the top level.
+  repack = set()
+  if pack_order(old_widgets) != pack_order(new_widgets):
+    repack.add(None)
+
+  for w, parent in preorder(new_widgets):
+    if w.name not in old or w.name in doomed:
+      changes.append(('create', None, w, parent))
+      continue
+
+    ow = old[w.name][0]
+    if ow.params.strip() != w.params.strip():
+      changes.append(('config', ow, w, parent))
+
+    if ow.layout_mgr != w.layout_mgr or ow.layout_params != w.layout_params:
+      if w.layout_mgr in (None, 'pack'): # Packing a single widget again would move it to the end
+        repack.add(parent)
+      else:
+        changes.append(('layout', ow, w, parent))
 
-  # Attempt to auto-discover the library prefix
-  if lib_prefix is None:
-    lib_prefix = find_tkinter_name()
-
-  sections = parse_layout_spec(layout, class_name, require_docutils)
-  
-  # Get all widgets  and menu sections
-  widgets = [s for s in sections if s.name == 'widgets']
-  menus = [s for s in sections if s.name == 'menu']
-  
-  # We can only have 0 or 1 widget section
-  # We must have at least 1 menu section if there is no widget section
-  # Grid sections are completely optional
-  
-  if len(widgets) == 0 and len(menus) == 0:
-    raise LayoutError('Missing widget or menu section in layout for {}'.format(class_name))
-  elif len(widgets) > 1:
-    # There can be only one
-    raise LayoutError('Multiple widget sections found in layout for {}'.format(class_name))
-
-  method_body = []
+    if pack_order(ow.children) != pack_order(w.children):
+      repack.add(w.name)
 
-  if len(widgets) == 1:  
-    widget_sec = widgets[0]
-      
-    # Find all the grid sections
-    grids = [s for s in sections if s.name == 'grid']
-    
-    # Set grid parameters on widgets
-    apply_grid_attributes(grids, widget_sec, class_name)
+  for w, parent in preorder(new_widgets):
+    if w.name in repack:
+      changes.append(('repack', None, w, parent))
+  if None in repack:
+    changes.append(('repack', None, None, None))
 
-    # Build an index of widget containers
-    containers = {}
-    index_containers(widget_sec.widgets, containers)
-    
-    # Verify container widgets all use the same layout manager
-    for container, group in containers.iteritems():
-      if len(group) > 0:
-        managers = ['pack' if c.layout_mgr is None else c.layout_mgr for c in group]
-        unique_managers = set(managers)
-        if len(unique_managers) != 1:
-          container_name = container.name if container else 'self'
-          raise LayoutError('Mismatched layout managers in layout for {}\n\tcontainer "{}" has: {}'.format(class_name,
-            container_name, ', '.join(unique_managers)))
-        
-    # Generate method code
-    method_body = list(widget_sec.code(parent, lib_prefix))
-  
-  # Add menu(s)
-  if len(menus) > 0:
-    for m in menus:
-      method_body.append('')
-      method_body.extend(list(m.code(parent, lib_prefix)))
+  return changes
 
-  # Build the complete method source code
-  method = '''def {}(self):
-  """Tk layout generated by guidoc on {}"""
-{}'''.format(method_name, datetime.now(),'\n'.join(indent(method_body, 2)))
 
-  #print(method)
-  return method
+class LayoutReloader(object):
+  '''Watch a layout file and patch the widgets of a live layout when it changes
 
+  The revised layout is compared with the live one and only the minimal changes
+  are applied. Widgets that are unchanged keep all of their state. Menus are
+  rebuilt when their section changes. This is intended for use during development.
 
-def tk_layout(layout='', lib_prefix=None, libraries={}, method_name='_build_widgets', layout_file=None, require_docutils=False):
-  '''Class decorator to parse a layout spec and add a builder method for the layout
   Args:
-    layout (str, optional): Layout specification
+    target (widget): Instance of a class built from the layout
+    layout_file (str): File containing the layout specification
+    layout (str, optional): The layout the live widgets were built from. Read from layout_file when empty.
     lib_prefix (str, optional): Python library prefix for all Tk widgets
     libraries (dict, optional): Dictionary of user packages keyed by name
-    method_name (str, optional): The name of the method to add to the class
-    file_name (str, optional): File containing layout specification. Only used when layout is empty.
     require_docutils (bool, optional): Require docutils library when True. Ignore grid sections when False.
+    interval (int, optional): Milliseconds between checks of the layout file
+    on_error (callable, optional): Called with the exception when a revised layout can't be applied.
+      Errors are printed to stderr by default.
   '''
-  
-  if not layout and layout_file:
-    try:
+  def __init__(self, target, layout_file, layout='', lib_prefix=None, libraries={}, require_docutils=False,
+    interval=500, on_error=None):
+    self.target = target
+    self.layout_file = layout_file
+    module = sys.modules.get(target.__class__.__module__, None)
+    self.symbols = module_symbols(vars(module) if module is not None else {}, lib_prefix, libraries)
+    self.lib_prefix = self.symbols.lib_prefix
+    self.libraries = self.symbols.libraries
+    self.require_docutils = require_docutils
+    self.interval = interval
+    self.on_error = on_error
+    self._after_id = None
+
+    self.mtime = self._file_mtime()
+    if not layout:
       with open(layout_file, 'r') as fh:
         layout = fh.read()
-    except IOError:
-      pass
-  
-  # We require either a layout or a valid file_name
-  assert layout, 'Missing layout specification'
-  
-  def layout_tk_class(cls):
-    code = create_layout_method(layout, method_name, 'self', lib_prefix, cls.__name__, require_docutils)
-    co = compile_method(code, method_name, libraries)
-    if co:
-      setattr(cls, method_name, co)   # Add method to the class
-      setattr(cls, '_guidoc', layout) # Save the original layout
 
-    return cls
-    
-  return layout_tk_class
+    self.layout = layout
+    self.widget_sec, self.menus = analyze_layout(layout, target.__class__.__name__, require_docutils)
+    target.bind('<Destroy>', self._on_destroy, '+')
 
+  def _file_mtime(self):
+    try:
+      return os.path.getmtime(self.layout_file)
+    except OSError:
+      return None
+
+  def start(self):
+    '''Start polling the layout file'''
+    if self._after_id is None:
+      self._after_id = self.target.after(self.interval, self._poll)
+
+  def stop(self):
+    '''Stop polling the layout file'''
+    if self._after_id is not None:
+      self.target.after_cancel(self._after_id)
+      self._after_id = None
+
+  def _on_destroy(self, event):
+    if event.widget is self.target:
+      self.stop()
+
+  def _poll(self):
+    mtime = self._file_mtime()
+    if mtime is not None and mtime != self.mtime:
+      self.mtime = mtime
+      try:
+        with open(self.layout_file, 'r') as fh:
+          self.reload(fh.read())
+      except Exception as e: # Keep the application running while the layout is being edited
+        if self.on_error is not None:
+          self.on_error(e)
+        else:
+          print('guidoc: Unable to reload {}: {}'.format(self.layout_file, e), file=sys.stderr)
+
+    self._after_id = self.target.after(self.interval, self._poll)
+
+  def patch_code(self, widget_sec, menus, method_name='_guidoc_patch'):
+    '''Generate a method that converts the live widgets into a revised layout
+    Args:
+      widget_sec (WidgetSection): Widget section of the revised layout or None
+      menus (list(MenuSection)): Menu sections of the revised layout
+      method_name (str, optional): Name for the generated method
+    Returns:
+      tuple: The generated method code and a list of (operation, name) tuples it performs
+    '''
+    old_widgets = self.widget_sec.widgets if self.widget_sec is not None else []
+    new_widgets = widget_sec.widgets if widget_sec is not None else []
+
+    def layout_code(w):
+      params = ['{}={}'.format(k, v) for k, v in w.layout_params.iteritems()]
+      return 'self.{}.{}({})'.format(w.name, w.layout_mgr if w.layout_mgr else 'pack', ', '.join(params))
+
+    body = []
+    ops = []
+    for op, ow, w, parent in diff_widget_trees(old_widgets, new_widgets):
+      for spec in (ow, w):
+        if spec is not None and (spec.layout_mgr == 'canvas' or (op == 'repack' and len(spec.children) > 0 and
+          spec.children[0].layout_mgr == 'canvas')):
+          raise LayoutError('Canvas grid cells can\'t be patched. Restart to apply changes to "{}"'.format(spec.name))
+
+      if op == 'destroy':
+        body.append('self.{}.destroy()'.format(ow.name))
+        dead = {}
+        index_widgets([ow], dead)
+        body.extend("if hasattr(self, '{0}'): delattr(self, '{0}')".format(n) for n in sorted(dead))
+        ops.append((op, ow.name))
+
+      elif op == 'create':
+        body.extend(w.code('self.' + parent if parent else 'self', self.lib_prefix, symbols=self.symbols))
+        ops.append((op, w.name))
+
+      elif op == 'config':
+        if len(w.params.strip()) > 0:
+          body.append('self.{}.config({})'.format(w.name, w.params))
+        # Restore the default for any option that was removed
+        try:
+          old_params = parse_params(ow.params) if len(ow.params.strip()) > 0 else {}
+          new_params = parse_params(w.params) if len(w.params.strip()) > 0 else {}
+          for k in sorted(set(old_params) - set(new_params)):
+            body.append("self.{0}.config({1}=self.{0}.configure('{1}')[3])".format(w.name, k))
+        except ParameterError: # Too complex to parse. Only the new values are applied.
+          pass
+        ops.append((op, w.name))
+
+      elif op == 'layout':
+        body.append('self.{}.{}_forget()'.format(w.name, ow.layout_mgr if ow.layout_mgr else 'pack'))
+        body.append(layout_code(w))
+        ops.append((op, w.name))
+
+      elif op == 'repack':
+        children = w.children if w is not None else new_widgets
+        packed = [c for c in children if c.layout_mgr in (None, 'pack')]
+        body.extend('self.{}.pack_forget()'.format(c.name) for c in packed)
+        body.extend(layout_code(c) for c in packed)
+        ops.append((op, w.name if w is not None else 'self'))
+
+    # Rebuild changed menus
+    def menu_name(m):
+      return m.param if m.param else 'menubar'
+
+    old_menus = {menu_name(m): list(m.code('self', self.lib_prefix, symbols=self.symbols)) for m in self.menus}
+    new_menus = {menu_name(m): list(m.code('self', self.lib_prefix, symbols=self.symbols)) for m in menus}
+    for name in sorted(old_menus):
+      if new_menus.get(name, None) != old_menus[name]:
+        body.append('self.{}.destroy()'.format(name))
+        ops.append(('destroy menu', name))
+    for m in menus:
+      name = menu_name(m)
+      if old_menus.get(name, None) != new_menus[name]:
+        body.extend(new_menus[name])
+        ops.append(('create menu', name))
 
-def dump_layouts(glbls):
-  '''Dump all guidoc layouts found within a namespace
-  This writes a file with the contents of the '_guidoc' attribute
-  from every object in the glbls dict. This allows you to generate
-  static _build_widgets() methods with the guidoc command line mode.
+    if len(body) == 0:
+      body.append('pass')
 
-  Args:
-    glbls (dict): Dictionary of namespace objects produced by the globals() function.
+    code = 'def {}(self):\n{}'.format(method_name, '\n'.join(indent(body, 2)))
+    return (code, ops)
 
-  Returns:
-    list: List of the files written
-  '''
-  for k in glbls.iterkeys():
-    files = []
-    if hasattr(glbls[k], '_guidoc'):
-      fname = k + '.guidoc'
-      with open(fname, 'w') as fh:
-        fh.write(glbls[k]._guidoc)
-        files.append(fname)
-  return files
+  def reload(self, layout):
+    '''Patch the live widgets to match a revised layout
+    Args:
+      layout (str): The revised layout specification
+    Returns:
+      list(tuple): The (operation, name) tuples that were applied
+    '''
+    widget_sec, menus = analyze_layout(layout, self.target.__class__.__name__, self.require_docutils)
+
+    code, ops = self.patch_code(widget_sec, menus)
+    if len(ops) > 0:
+      patch = compile_method(code, '_guidoc_patch', self.libraries)
+      patch(self.target)
+
+    self.layout = layout
+    self.widget_sec = widget_sec
+    self.menus = menus
+    return ops
 
 
 @tk_layout('''
@@ -1067,11 +4340,337 @@ def guidoc_demo():
   root.mainloop()
 
 
+def expand_inputs(patterns):
+  '''Expand any glob patterns in a list of input files
+  Args:
+    patterns (list(str)): File names and glob patterns. '-' is passed through for stdin.
+  Returns:
+    list(str): The input files with duplicates removed
+  '''
+  files = []
+  for p in patterns:
+    matches = sorted(glob.glob(p)) if p != '-' else []
+    for f in matches if len(matches) > 0 else [p]: # Keep unmatched names so they are reported as missing
+      if f not in files:
+        files.append(f)
+  return files
+
+
+def generate_file(job):
+  '''Generate a layout method from a spec file
+
+  This is the unit of work for the batch mode of the command line tool.
+
+  Args:
+    job (tuple): Input file name, the spec text or None to read the file, and a dict of
+      keyword arguments for create_layout_method(). A class is generated with
+      create_layout_class() instead when the dict has a 'view_name'.
+  Returns:
+    tuple: The input file name, generated code or None, error message or None, and elapsed seconds
+  '''
+  fname, layout, options = job
+  start = timeit.default_timer()
+  try:
+    if layout is None:
+      with open(fname, 'r') as fh:
+        layout = fh.read()
+
+    if 'view_name' in options:
+      code = create_layout_class(layout, class_name=fname, **options)
+    else:
+      code = create_layout_method(layout, class_name=fname, **options)
+    error = None
+  except (LayoutError, IOError) as e:
+    code = None
+    error = str(e)
+  except Exception as e: # Don't lose the rest of the batch to a bug
+    code = None
+    error = 'Unexpected {}: {}'.format(e.__class__.__name__, e)
+
+  return (fname, code, error, timeit.default_timer() - start)
+
+
+def generate_files(jobs, processes=1):
+  '''Generate layout methods for a batch of spec files
+  Args:
+    jobs (list(tuple)): Jobs for generate_file()
+    processes (int, optional): Number of worker processes to spread the jobs across
+  Returns:
+    list(tuple): The generate_file() result for each job in order
+  '''
+  if processes > 1 and len(jobs) > 1:
+    import multiprocessing
+    pool = multiprocessing.Pool(min(processes, len(jobs)))
+    try:
+      return pool.map(generate_file, jobs, chunksize=1)
+    finally:
+      pool.close()
+      pool.join()
+  else:
+    return [generate_file(j) for j in jobs]
+
+
+def module_method_name(method_name, fname):
+  '''Make a unique method name for a spec file in a combined module'''
+  stem = os.path.splitext(os.path.basename(fname))[0]
+  return '{}_{}'.format(method_name, re.sub(r'\W|^(?=\d)', '_', stem))
+
+
+def build_fingerprint(layout, options):
+  '''Identify everything that determines the generated code for a spec
+  Args:
+    layout (str): Layout specification
+    options (dict): Keyword arguments for create_layout_method()
+  Returns:
+    dict: Hashes of the spec and options along with the guidoc version
+  '''
+  return {'spec': layout_hash(layout), 'options': layout_hash(json.dumps(options, sort_keys=True)),
+    'guidoc': __version__}
+
+
+def file_hash(fname):
+  '''Compute the content hash of a file
+  Args:
+    fname (str): File to hash
+  Returns:
+    str: Hex digest of the file or None if it can't be read
+  '''
+  try:
+    with open(fname, 'rb') as fh:
+      return layout_hash(fh.read())
+  except IOError:
+    return None
+
+
+def read_manifest(fname):
+  '''Read the manifest of a previous incremental build
+  Args:
+    fname (str): Manifest file
+  Returns:
+    dict: Build fingerprints and output hashes keyed by input file. Empty if the manifest is missing or invalid.
+  '''
+  try:
+    with open(fname, 'r') as fh:
+      manifest = json.load(fh)
+  except (IOError, ValueError):
+    return {}
+
+  if not isinstance(manifest, dict) or manifest.get('guidoc_manifest', None) != 1:
+    return {}
+  return manifest.get('inputs', {})
+
+
+def write_manifest(fname, entries):
+  '''Write the manifest for an incremental build
+  Args:
+    fname (str): Manifest file
+    entries (dict): Build fingerprints and output hashes keyed by input file
+  '''
+  with open(fname, 'w') as fh:
+    json.dump({'guidoc_manifest': 1, 'inputs': entries}, fh, indent=1, sort_keys=True)
+    fh.write('\n')
+
+
+def write_if_changed(fname, text):
+  '''Write a file only when its contents differ so that its mtime is preserved
+  Args:
+    fname (str): File to write
+    text (str): New contents
+  Returns:
+    bool: True if the file was written
+  '''
+  try:
+    with open(fname, 'r') as fh:
+      if fh.read() == text:
+        return False
+  except IOError:
+    pass
+
+  with open(fname, 'w') as fh:
+    fh.write(text)
+  return True
+
+
+class CodegenServer(object):
+  '''Long running code generator for editors and build tools
+
+  Requests and responses are JSON objects with one per line. A request has
+  the layout spec in "spec" and can set any of the "method_name", "lib_prefix",
+  "require_docutils", "pooled", and "deterministic" options. The optional "id"
+  is copied into the response. Requests with a "document" key keep an
+  IncrementalParser for that document so later revisions only parse the
+  sections that changed. The response has "ok" set to true along with the
+  generated "code", or false with an "error" object holding the exception
+  "type" and "message". A request with "command" set to "shutdown" stops the server.
+
+  Args:
+    cache_size (int, optional): Number of generated results to cache
+    max_documents (int, optional): Number of document parsers to keep
+  '''
+  option_defaults = {'method_name': '_build_widgets', 'lib_prefix': None, 'require_docutils': False,
+    'pooled': False, 'deterministic': False}
+
+  def __init__(self, cache_size=256, max_documents=32):
+    self.cache_size = cache_size
+    self.max_documents = max_documents
+    self._cache = collections.OrderedDict()     # Generated code keyed by hash of spec and options
+    self._documents = collections.OrderedDict() # IncrementalParser objects keyed by document name
+
+  @staticmethod
+  def _touch(lru, key, value, limit):
+    lru.pop(key, None)
+    lru[key] = value
+    while len(lru) > limit:
+      lru.popitem(last=False)
+
+  def generate(self, spec, document=None, **options):
+    '''Generate a layout method using the server caches
+    Args:
+      spec (str): Layout specification
+      document (str, optional): Name of the document the spec belongs to
+      options (dict): Options for create_layout_method()
+    Returns:
+      str: The generated function declaration
+    '''
+    opts = dict(self.option_defaults)
+    opts.update(options)
+    key = layout_hash(json.dumps([spec, document, opts], sort_keys=True))
+    if key in self._cache:
+      code = self._cache[key]
+      self._touch(self._cache, key, code, self.cache_size)
+      return code
+
+    class_name = document if document else '<request>'
+    if document is not None:
+      parser = self._documents.get(document, None)
+      if parser is None or parser.require_docutils != opts['require_docutils']:
+        parser = IncrementalParser(class_name, opts['require_docutils'])
+      self._touch(self._documents, document, parser, self.max_documents)
+      parser.update(spec)
+      code = parser.code(opts['method_name'], 'self', opts['lib_prefix'], opts['pooled'], opts['deterministic'])
+    else:
+      code = create_layout_method(spec, opts['method_name'], 'self', opts['lib_prefix'], class_name,
+        opts['require_docutils'], opts['pooled'], opts['deterministic'])
+
+    self._touch(self._cache, key, code, self.cache_size)
+    return code
+
+  def handle(self, request):
+    '''Process a single request
+    Args:
+      request (dict): Decoded request object
+    Returns:
+      dict: The response object
+    '''
+    response = {'id': request.get('id', None)}
+    try:
+      if request.get('command', 'generate') == 'generate':
+        options = {k: request[k] for k in self.option_defaults if k in request}
+        response['code'] = self.generate(request['spec'], request.get('document', None), **options)
+      elif request['command'] != 'shutdown':
+        raise ValueError('Unknown command "{}"'.format(request['command']))
+      response['ok'] = True
+    except Exception as e: # Report all errors to the client and keep serving
+      response['ok'] = False
+      response['error'] = {'type': type(e).__name__, 'message': str(e)}
+    return response
+
+  def serve_stream(self, rfile, wfile):
+    '''Answer JSON line requests from a binary stream until it closes
+    Args:
+      rfile (file): Binary stream to read requests from
+      wfile (file): Binary stream to write responses to
+    Returns:
+      bool: False if a shutdown was requested
+    '''
+    for line in iter(rfile.readline, b''):
+      line = line.strip()
+      if not line:
+        continue
+
+      try:
+        request = json.loads(line.decode('utf-8'))
+        if not isinstance(request, dict):
+          raise ValueError('Request must be a JSON object')
+      except ValueError as e:
+        request = {}
+        response = {'id': None, 'ok': False, 'error': {'type': 'RequestError', 'message': str(e)}}
+      else:
+        response = self.handle(request)
+
+      wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+      wfile.flush()
+
+      if request.get('command', None) == 'shutdown':
+        return False
+    return True
+
+  def serve_stdio(self):
+    '''Answer requests on stdin until it closes'''
+    self.serve_stream(getattr(sys.stdin, 'buffer', sys.stdin), getattr(sys.stdout, 'buffer', sys.stdout))
+
+  def serve_unix(self, path):
+    '''Answer requests from clients connecting to a Unix socket
+
+    Clients are served one at a time until one of them requests a shutdown.
+
+    Args:
+      path (str): File name for the socket
+    '''
+    import socket
+
+    if os.path.exists(path):
+      os.unlink(path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+      sock.bind(path)
+      sock.listen(5)
+      running = True
+      while running:
+        conn, _ = sock.accept()
+        rfile = conn.makefile('rb')
+        wfile = conn.makefile('wb')
+        try:
+          running = self.serve_stream(rfile, wfile)
+        except socket.error: # Client went away
+          pass
+        finally:
+          rfile.close()
+          wfile.close()
+          conn.close()
+    finally:
+      sock.close()
+      os.unlink(path)
+
+
+def serve_main(argv):
+  '''Command line entry point for the code generation server
+  Args:
+    argv (list(str)): Arguments following "serve"
+  '''
+  import argparse
+
+  parser = argparse.ArgumentParser(prog='guidoc serve', description='Serve layout code generation requests as JSON lines')
+  parser.add_argument('-s', '--socket', dest='socket', action='store', help='Unix socket to listen on. Uses stdin/stdout by default.')
+  parser.add_argument('--cache', dest='cache_size', type=int, default=256, action='store', help='Number of results to cache')
+  args = parser.parse_args(argv)
+
+  server = CodegenServer(args.cache_size)
+  if args.socket:
+    server.serve_unix(args.socket)
+  else:
+    server.serve_stdio()
+
+
 def main():
   if len(sys.argv) <= 1:
     # Show demo
     guidoc_demo()
 
+  elif sys.argv[1] == 'serve': # Act as a persistent code generator
+    serve_main(sys.argv[2:])
+
   else: # Act as command line code generator
     # Parse command line args
     import argparse
@@ -1090,14 +4689,34 @@ Dynamic layout in code using a decorator that adds a "_build_widgets" method:
       self._build_widgets()
 
 Static layout:
-  guidoc.py [-h] -i INPUT [-L LIB_PREFIX] [-n METHOD_NAME] [-d]
+  guidoc.py [-h] -i INPUT [INPUT ...] [-o OUTPUT_DIR | -c COMBINED] [-j JOBS]
+            [-m MANIFEST] [--check] [-D] [-L LIB_PREFIX] [-n METHOD_NAME] [-d] [-p]
+            [--class CLASS_NAME [--base BASE] [--handles]]
+            [--profile] [--profile-memory] [--stats] [--memory [--base BASE]]
+
+Code generation server:
+  guidoc.py serve [-s SOCKET] [--cache CACHE_SIZE]
 """
     
     parser = argparse.ArgumentParser(description='Generate a Tkinter layout method', usage=usage())
-    parser.add_argument('-i', '--input', dest='input', action='store', help='Input file. Use - for stdin')
+    parser.add_argument('-i', '--input', dest='input', nargs='+', action='store', help='Input files or glob patterns. Use - for stdin')
+    parser.add_argument('-o', '--output', dest='output_dir', action='store', help='Directory to write a module for each input into')
+    parser.add_argument('-c', '--combine', dest='combined', action='store', help='Write the methods for all inputs into one module')
+    parser.add_argument('-j', '--jobs', dest='jobs', type=int, default=1, action='store', help='Number of worker processes')
+    parser.add_argument('-m', '--manifest', dest='manifest', action='store', help='Manifest file for incremental builds')
+    parser.add_argument('--check', dest='check', default=False, action='store_true', help='Verify outputs are up to date without writing them')
+    parser.add_argument('-D', '--deterministic', dest='deterministic', default=False, action='store_true', help='Omit the generation time from the code')
     parser.add_argument('-L', '--lib_prefix', dest='lib_prefix', action='store', help='Library prefix')
     parser.add_argument('-n', '--name', dest='method_name', default='_build_widgets', action='store', help='Name for generated method')
     parser.add_argument('-d', '--docutils', dest='require_docutils', default=False, action='store_true', help='Require the docutils library')
+    parser.add_argument('-p', '--pooled', dest='pooled', default=False, action='store_true', help='Acquire widgets from self._guidoc_pool')
+    parser.add_argument('--class', dest='view_name', action='store', help='Generate a view class with __slots__ instead of a method')
+    parser.add_argument('--base', dest='base', default='Frame', action='store', help='Base widget class for --class')
+    parser.add_argument('--handles', dest='handles', default=False, action='store_true', help='Add a widget handle table to --class')
+    parser.add_argument('--profile', dest='profile', default=False, action='store_true', help='Report the time spent in each phase on stderr')
+    parser.add_argument('--profile-memory', dest='profile_memory', default=False, action='store_true', help='Also report allocations in each phase')
+    parser.add_argument('--stats', dest='stats', default=False, action='store_true', help='Print layout complexity statistics as JSON instead of code')
+    parser.add_argument('--memory', dest='memory', default=False, action='store_true', help='Print the memory used by each built layout as JSON instead of code')
     parser.add_argument('-v', '--version', dest='show_version', default=False, action='store_true', help='Guidoc version')
     args = parser.parse_args()
     
@@ -1108,19 +4727,199 @@ Static layout:
     if args.input is None:
       print('Error: argument -i/--input is required')
       sys.exit(1)
-    
-    # Get layout specification
-    if args.input == '-':
-      layout = sys.stdin.read()
+
+    if args.output_dir and args.combined:
+      print('Error: arguments -o/--output and -c/--combine are mutually exclusive')
+      sys.exit(1)
+
+    if args.stats and (args.output_dir or args.combined):
+      print('Error: argument --stats can\'t be used with -o/--output or -c/--combine')
+      sys.exit(1)
+
+    if args.memory and (args.stats or args.view_name or args.output_dir or args.combined):
+      print('Error: argument --memory can\'t be used with --stats, --class, -o/--output, or -c/--combine')
+      sys.exit(1)
+
+    if (args.base != 'Frame' and not (args.view_name or args.memory)) or (args.handles and not args.view_name):
+      print('Error: argument --base requires --class or --memory and --handles requires --class')
+      sys.exit(1)
+
+    inputs = expand_inputs(args.input)
+    batch = len(inputs) > 1 or args.output_dir or args.combined
+    incremental = args.manifest or args.check
+
+    if incremental and not (args.output_dir or args.combined):
+      print('Error: arguments -m/--manifest and --check require -o/--output or -c/--combine')
+      sys.exit(1)
+
+    # Methods in a combined module need distinct names. Classes are named instead.
+    combined = args.combined and len(inputs) > 1
+    def method_name(fname):
+      return module_method_name(args.method_name, fname) if combined and not args.view_name else args.method_name
+
+    def output_file(fname):
+      if args.output_dir:
+        return os.path.join(args.output_dir, os.path.splitext(os.path.basename(fname))[0] + '.py')
+      return args.combined
+
+    jobs = []
+    for fname in inputs:
+      # Get layout specification
+      layout = None
+      if fname == '-':
+        layout = sys.stdin.read()
+      elif incremental: # Needed for the fingerprint
+        try:
+          with open(fname, 'r') as fh:
+            layout = fh.read()
+        except IOError:
+          pass # Reported by generate_file()
+
+      options = {'method_name': method_name(fname), 'lib_prefix': args.lib_prefix,
+        'require_docutils': args.require_docutils, 'pooled': args.pooled,
+        'deterministic': args.deterministic or incremental}
+      if args.view_name:
+        options.update(view_name=module_method_name(args.view_name, fname) if combined else args.view_name,
+          base=args.base, handles=args.handles)
+      jobs.append(('<stdin>' if fname == '-' else fname, layout, options))
+
+    if args.stats:
+      stats = collections.OrderedDict()
+      for fname, layout, options in jobs:
+        try:
+          if layout is None:
+            with open(fname, 'r') as fh:
+              layout = fh.read()
+          stats[fname] = layout_stats(layout, options['method_name'], options['lib_prefix'], fname,
+            options['require_docutils'])
+        except (LayoutError, IOError) as e:
+          print('Error: {}: {}'.format(fname, e), file=sys.stderr)
+
+      print(json.dumps(stats, indent=1, sort_keys=True, separators=(',', ': ')))
+      sys.exit(0 if len(stats) == len(jobs) else 1)
+
+    if args.memory:
+      memory = collections.OrderedDict()
+      for fname, layout, options in jobs:
+        try:
+          if layout is None:
+            with open(fname, 'r') as fh:
+              layout = fh.read()
+          memory[fname] = layout_memory(layout, base=args.base, lib_prefix=options['lib_prefix'], class_name=fname,
+            require_docutils=options['require_docutils'])
+        except (LayoutError, IOError) as e:
+          print('Error: {}: {}'.format(fname, e), file=sys.stderr)
+
+      print(json.dumps(memory, indent=1, separators=(',', ': ')))
+      sys.exit(0 if len(memory) == len(jobs) else 1)
+
+    # Inputs with the same file name would overwrite each other's output
+    if args.output_dir or combined:
+      targets = {}
+      for fname, _, options in jobs:
+        target = output_file(fname) if args.output_dir else options.get('view_name', options['method_name'])
+        if target in targets:
+          print('Error: inputs {} and {} both generate {}'.format(targets[target], fname, target))
+          sys.exit(1)
+        targets[target] = fname
+
+    # Find inputs whose output is unchanged since the last build
+    manifest = read_manifest(args.manifest) if args.manifest else {}
+    fingerprints = {}
+    current = set()
+    if incremental:
+      for fname, layout, options in jobs:
+        if layout is None:
+          continue
+        fingerprints[fname] = build_fingerprint(layout, options)
+        entry = manifest.get(fname, {})
+        if all(entry.get(k, None) == v for k, v in fingerprints[fname].iteritems()) \
+          and entry.get('output', None) == output_file(fname) \
+          and entry.get('output_hash', None) == file_hash(output_file(fname)):
+          current.add(fname)
+
+      if args.combined and len(current) < len(jobs): # A combined module is rebuilt as a whole
+        current.clear()
+
+    profiler = None
+    if args.profile or args.profile_memory:
+      try:
+        profiler = LayoutProfiler(args.profile_memory)
+      except LayoutError as e:
+        print('Error: {}'.format(e))
+        sys.exit(1)
+
+    # Create methods
+    start = timeit.default_timer()
+    if profiler is not None:
+      # Phases can only be recorded in this process
+      with profiler:
+        results = generate_files([j for j in jobs if j[0] not in current])
     else:
-      with open(args.input, 'r') as fh:
-        layout = fh.read()
-        
-    class_name = '<stdin>' if args.input == '-' else args.input
-      
-    # Create method
-    code = create_layout_method(layout, args.method_name, 'self', args.lib_prefix, class_name, args.require_docutils)
-    print(code)
+      results = generate_files([j for j in jobs if j[0] not in current], args.jobs)
+    elapsed = timeit.default_timer() - start
+
+    failed = [r for r in results if r[1] is None]
+    for fname, _, error, _ in failed:
+      print('Error: {}: {}'.format(fname, error), file=sys.stderr)
+
+    def module_source(origin, code):
+      return '# Generated by guidoc from {}\n{}\n\n\n{}\n'.format(origin,
+        '\n'.join(module_imports(code, args.lib_prefix)), code)
+
+    # Collect the text of each output file
+    outputs = {}
+    if args.output_dir:
+      for fname, code, _, _ in results:
+        if code is not None:
+          outputs[output_file(fname)] = module_source(fname, code)
+    elif len(results) > 0:
+      code = '\n\n\n'.join(r[1] for r in results if r[1] is not None)
+      if args.combined:
+        outputs[args.combined] = module_source(', '.join(r[0] for r in results if r[1] is not None), code)
+      elif len(code) > 0:
+        print(code)
+
+    stale = []
+    if args.check:
+      for ofile, text in sorted(outputs.iteritems()):
+        try:
+          with open(ofile, 'r') as fh:
+            if fh.read() == text:
+              continue
+        except IOError:
+          pass
+        stale.append(ofile)
+        print('Out of date: {}'.format(ofile), file=sys.stderr)
+
+    else:
+      if args.output_dir and not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+      for ofile, text in outputs.iteritems():
+        write_if_changed(ofile, text)
+
+      if args.manifest:
+        for fname, code, _, _ in results:
+          if code is not None and fname in fingerprints:
+            manifest[fname] = dict(fingerprints[fname], output=output_file(fname),
+              output_hash=file_hash(output_file(fname)))
+        write_manifest(args.manifest, manifest)
+
+    if batch:
+      # Report timing on stderr to keep it separate from generated code
+      for fname, code, _, t in results:
+        print('{:9.1f} ms  {}{}'.format(t * 1000, fname, '' if code is not None else '  (failed)'), file=sys.stderr)
+      for fname in sorted(current):
+        print('{:>9}     {}'.format('current', fname), file=sys.stderr)
+      print('{:9.1f} ms  total for {} file(s) with {} job(s)'.format(elapsed * 1000, len(results),
+        args.jobs if profiler is None else 1), file=sys.stderr)
+
+    if profiler is not None:
+      profiler.report(sys.stderr)
+
+    if len(failed) > 0 or len(stale) > 0:
+      sys.exit(1)
+
 
 if __name__ == '__main__':
   main()
@@ -0,0 +1,7 @@
+'''
+Tests for the guidoc package.
+
+Run them from the root of the source tree:
+
+  python -m unittest discover -s test -t .
+'''
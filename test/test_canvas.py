@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = '''
+frmBoard(Frame)
+  a(Label | text='ab')
+  b(Label | text='abcd', bg='red')
+  c(Message | text='x')
+
+[grid frmBoard canvas]
++---+---+
+| a | b |
++---+---+
+| c     |
++-------+
+'''
+
+
+def canvas_item(grid, cell):
+  '''Options of the text item for a cell'''
+  return grid.canvas._items[cell.item]
+
+
+class TestCanvasGrid(unittest.TestCase):
+
+  def setUp(self):
+    self.fake = gd.FakeTk()
+    self.grid = gd.CanvasGrid(self.fake.Frame(self.fake.Tk()), self.fake.Canvas)
+
+  def test_layout(self):
+    a = self.grid.add('a', {'row': 0, 'column': 0}, text='ab')
+    b = self.grid.add('b', {'row': 0, 'column': 1, 'sticky': 'w'}, text='abcd', bg='red')
+    c = self.grid.add('c', {'row': 1, 'column': 0, 'columnspan': 2}, text='x')
+    self.grid.layout()
+
+    canvas = self.grid.canvas
+    w, h = gd.FakeWidget.char_width, gd.FakeWidget.line_height
+    self.assertEqual((canvas.cget('width'), canvas.cget('height')), (6 * w, 2 * h))
+    self.assertEqual(tuple(canvas.coords(a.item)), (w, h // 2))
+    self.assertEqual(tuple(canvas.coords(b.item)), (2 * w, h // 2))
+    self.assertEqual(tuple(canvas.coords(b.rect)), (2 * w, 0, 6 * w, h))
+    self.assertEqual(tuple(canvas.coords(c.item)), (3 * w, h + h // 2))
+    self.assertIsNone(a.rect)
+
+  def test_options(self):
+    cell = self.grid.add('a', {}, kind='Message', text='one', width=50)
+    self.assertEqual(canvas_item(self.grid, cell)['width'], 50)
+    cell.config(text='two')
+    self.assertEqual(cell.cget('text'), 'two')
+    self.assertEqual(canvas_item(self.grid, cell)['text'], 'two')
+    self.assertRaises(gd.tk.TclError, cell.config, relief='sunken')
+
+
+@unittest.skipUnless(gd.have_docutils, 'Grid sections require docutils')
+class TestCanvasLayout(unittest.TestCase):
+
+  def test_build(self):
+    target = gd.build_fake_layout(SPEC, require_docutils=True)
+    self.assertEqual(gd.check_fake_layout(target, SPEC, require_docutils=True), [])
+    self.assertIsInstance(target.frmBoard_cells, gd.CanvasGrid)
+    self.assertEqual(list(target.frmBoard_cells.cells), ['a', 'b', 'c'])
+    self.assertEqual(target.c.columnspan, 2)
+    self.assertEqual(target.b.cget('bg'), 'red')
+    self.assertEqual(list(target.frmBoard.children), [target.frmBoard_cells.canvas._name])
+
+  def test_self_container(self):
+    spec = "a(Label)\n\n[grid self canvas]\n+---+\n| a |\n+---+\n"
+    self.assertRaises(gd.GridError, gd.create_layout_method, spec, '_build_widgets', require_docutils=True)
+
+  def test_stats(self):
+    # 2 calls for the Frame, 3 for each cell, 2 for the background of b, and 3 for the Canvas
+    self.assertEqual(gd.layout_stats(SPEC, require_docutils=True)['tcl_calls'], 2 + 3 * 3 + 2 + 3)
+
+
+if __name__ == '__main__':
+  unittest.main()
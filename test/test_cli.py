@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import sys
+import json
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+from guidoc import guidoc as gd
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SPECS = {
+  'main.guidoc': "frm(Frame)\n  lbl(Label | text='main')\nbtn(Button)\n",
+  'about.guidoc': "txt(Label | text='about')\n"
+}
+
+
+def run_guidoc(*args):
+  '''Run the command line tool
+  Returns:
+    tuple: Exit status, stdout, and stderr
+  '''
+  p = subprocess.Popen([sys.executable, '-m', 'guidoc.guidoc'] + list(args), cwd=ROOT, stdout=subprocess.PIPE,
+    stderr=subprocess.PIPE)
+  out, err = p.communicate()
+  return (p.returncode, out.decode('utf-8'), err.decode('utf-8'))
+
+
+class TestCommandLine(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp()
+    self.inputs = []
+    for name, spec in sorted(SPECS.items()):
+      fname = os.path.join(self.tmp, name)
+      with open(fname, 'w') as fh:
+        fh.write(spec)
+      self.inputs.append(fname)
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp)
+
+  def load(self, fname):
+    '''Execute a generated module with FakeTk in place of Tkinter'''
+    namespace = {'__name__': 'generated'}
+    with open(fname, 'r') as fh:
+      exec(compile(fh.read(), fname, 'exec'), namespace)
+    self.assertIn(namespace['tk'].__name__, ('Tkinter', 'tkinter'))
+    fake = gd.FakeTk()
+    namespace['tk'] = fake
+    return namespace, fake.Frame(fake.Tk())
+
+  def test_output_dir(self):
+    out_dir = os.path.join(self.tmp, 'out')
+    status, _, _ = run_guidoc('-i', *(self.inputs + ['-o', out_dir, '-D', '-n', 'build']))
+    self.assertEqual(status, 0)
+    self.assertEqual(sorted(os.listdir(out_dir)), ['about.py', 'main.py'])
+
+    namespace, target = self.load(os.path.join(out_dir, 'main.py'))
+    namespace['build'](target)
+    self.assertEqual(target.lbl.cget('text'), 'main')
+
+  def test_library_prefix(self):
+    out_dir = os.path.join(self.tmp, 'out')
+    fname = os.path.join(self.tmp, 'menus.guidoc')
+    with open(fname, 'w') as fh:
+      fh.write("frm(Frame)\n  tv(Treeview)\n\n[menu]\nFile\n  Quit command=self.quit\n")
+    status, _, _ = run_guidoc('-i', fname, '-o', out_dir, '-L', 'ttk', '--class', 'Menus', '--base', 'Toplevel')
+    self.assertEqual(status, 0)
+
+    namespace = {'__name__': 'generated'}
+    with open(os.path.join(out_dir, 'menus.py'), 'r') as fh:
+      code = fh.read()
+    exec(compile(code, 'menus.py', 'exec'), namespace)
+    names = set(re.findall(r'\bttk\.(\w+)', code))
+    self.assertIn('Treeview', names)
+    for name in names:
+      self.assertTrue(hasattr(namespace['ttk'], name), name)
+    self.assertTrue(issubclass(namespace['Menus'], namespace['tk'].Toplevel))
+
+  def test_combined(self):
+    combined = os.path.join(self.tmp, 'layouts.py')
+    status, _, _ = run_guidoc('-i', *(self.inputs + ['-c', combined, '-D']))
+    self.assertEqual(status, 0)
+
+    namespace, target = self.load(combined)
+    namespace['_build_widgets_main'](target)
+    namespace['_build_widgets_about'](target)
+    self.assertEqual(target.txt.cget('text'), 'about')
+
+  def test_duplicate_names(self):
+    os.mkdir(os.path.join(self.tmp, 'other'))
+    duplicate = os.path.join(self.tmp, 'other', 'main.guidoc')
+    with open(duplicate, 'w') as fh:
+      fh.write("other(Label)\n")
+
+    out_dir = os.path.join(self.tmp, 'out')
+    status, out, _ = run_guidoc('-i', *(self.inputs + [duplicate, '-o', out_dir]))
+    self.assertEqual(status, 1)
+    self.assertIn(duplicate, out)
+    self.assertFalse(os.path.exists(out_dir))
+
+    combined = os.path.join(self.tmp, 'layouts.py')
+    self.assertEqual(run_guidoc('-i', *(self.inputs + [duplicate, '-c', combined]))[0], 1)
+    self.assertEqual(run_guidoc('-i', *(self.inputs + [duplicate, '-c', combined, '--class', 'View']))[0], 1)
+    self.assertFalse(os.path.exists(combined))
+
+  def test_manifest(self):
+    out_dir = os.path.join(self.tmp, 'out')
+    manifest = os.path.join(self.tmp, 'manifest.json')
+    args = ['-i'] + self.inputs + ['-o', out_dir, '-m', manifest]
+    self.assertEqual(run_guidoc(*args)[0], 0)
+    with open(manifest, 'r') as fh:
+      entries = json.load(fh)['inputs']
+    self.assertEqual(sorted(entries), sorted(self.inputs))
+
+    # Unchanged inputs aren't generated again
+    status, _, err = run_guidoc(*args)
+    self.assertEqual(status, 0)
+    self.assertEqual(len(re.findall(r'^\s+current\s', err, re.M)), 2)
+
+    with open(self.inputs[1], 'a') as fh:
+      fh.write("extra(Label)\n")
+    status, _, err = run_guidoc(*args)
+    self.assertEqual(status, 0)
+    self.assertEqual(re.findall(r'^\s+current\s+(.*)$', err, re.M), [self.inputs[0]])
+    with open(os.path.join(out_dir, 'main.py'), 'r') as fh:
+      self.assertIn('self.extra = ', fh.read())
+
+  def test_check(self):
+    out_dir = os.path.join(self.tmp, 'out')
+    args = ['-i'] + self.inputs + ['-o', out_dir]
+    self.assertEqual(run_guidoc(*(args + ['--check']))[0], 1)
+    self.assertFalse(os.path.exists(out_dir))
+
+    self.assertEqual(run_guidoc(*(args + ['-D']))[0], 0)
+    self.assertEqual(run_guidoc(*(args + ['--check']))[0], 0)
+
+    with open(self.inputs[0], 'a') as fh:
+      fh.write("extra(Label)\n")
+    self.assertEqual(run_guidoc(*(args + ['--check']))[0], 1)
+
+  def test_stats(self):
+    status, out, _ = run_guidoc('-i', *(self.inputs + ['--stats']))
+    self.assertEqual(status, 0)
+    stats = json.loads(out)
+    self.assertEqual(sorted(stats), sorted(self.inputs))
+    self.assertEqual(stats[self.inputs[1]]['widgets']['total'], 3)
+
+    status, out, _ = run_guidoc('-i', self.inputs[0], os.path.join(self.tmp, 'missing.guidoc'), '--stats')
+    self.assertEqual(status, 1)
+    self.assertEqual(list(json.loads(out)), [self.inputs[0]])
+
+  def test_stdout(self):
+    status, out, _ = run_guidoc('-i', self.inputs[0], '-D', '-n', 'build')
+    self.assertEqual(status, 0)
+    self.assertTrue(out.startswith('def build(self):'))
+
+  def test_unexpected_error(self):
+    def broken(*args, **kw):
+      raise ValueError('broken')
+
+    original = gd.create_layout_method
+    gd.create_layout_method = broken
+    try:
+      results = gd.generate_files([(f, None, {'method_name': '_build_widgets'}) for f in self.inputs])
+    finally:
+      gd.create_layout_method = original
+    self.assertEqual([r[1] for r in results], [None, None])
+    self.assertEqual(results[0][2], 'Unexpected ValueError: broken')
+
+  def test_missing_input(self):
+    fname, code, error, _ = gd.generate_file((os.path.join(self.tmp, 'missing.guidoc'), None, {}))
+    self.assertIsNone(code)
+    self.assertIsNotNone(error)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+import collections
+import unittest
+
+from guidoc import guidoc as gd
+
+
+class Event(object):
+  def __init__(self, widget, **kw):
+    self.widget = widget
+    self.__dict__.update(kw)
+
+
+class EventLoop(object):
+  '''Timer and event binding calls for FakeTk widgets
+
+  Callbacks scheduled with after() and after_idle() are kept until run() is called.
+  Bindings are only invoked by generate().
+  '''
+  def __init__(self):
+    self.pending = collections.OrderedDict()
+    self.bindings = collections.defaultdict(list)
+    self.serial = 0
+
+  def attach(self, widget):
+    widget.after = lambda ms, func, *args: self.schedule(func, args)
+    widget.after_idle = lambda func, *args: self.schedule(func, args)
+    widget.after_cancel = lambda after_id: self.pending.pop(after_id)
+    widget.bind = lambda sequence, func, add=None: self.bindings[(widget, sequence)].append(func)
+    return widget
+
+  def schedule(self, func, args):
+    self.serial += 1
+    after_id = 'after#{}'.format(self.serial)
+    self.pending[after_id] = (func, args)
+    return after_id
+
+  def run(self):
+    while self.pending:
+      func, args = self.pending.popitem(last=False)[1]
+      func(*args)
+
+  def generate(self, widget, sequence, **kw):
+    event = Event(widget, **kw)
+    for func in self.bindings[(widget, sequence)]:
+      func(event)
+
+  def destroy(self, widget):
+    self.generate(widget, '<Destroy>')
+    widget.destroy()
+
+
+class TestResizeCoalescer(unittest.TestCase):
+
+  def setUp(self):
+    self.fake = gd.FakeTk()
+    self.loop = EventLoop()
+    self.frm = self.loop.attach(self.fake.Frame(self.fake.Tk()))
+
+  def test_coalesce(self):
+    sizes = []
+    resize = gd.ResizeCoalescer(self.frm, lambda e: sizes.append(e.width))
+    for width in range(100, 110):
+      self.loop.generate(self.frm, '<Configure>', width=width)
+    self.assertEqual(len(self.loop.pending), 1)
+    self.loop.run()
+    self.assertEqual(sizes, [109])
+    self.assertEqual((resize.events, resize.runs), (10, 1))
+
+    self.loop.generate(self.frm, '<Configure>', width=120)
+    self.loop.run()
+    self.assertEqual(sizes, [109, 120])
+
+  def test_descendant_events(self):
+    resize = gd.ResizeCoalescer(self.frm, lambda e: self.fail('Handler run'))
+    self.loop.bindings[(self.frm, '<Configure>')][0](Event(self.fake.Label(self.frm)))
+    self.assertEqual((resize.events, len(self.loop.pending)), (0, 0))
+
+  def test_destroy(self):
+    gd.ResizeCoalescer(self.frm, lambda e: self.fail('Handler run'))
+    self.loop.generate(self.frm, '<Configure>', width=100)
+    self.loop.destroy(self.frm)
+    self.assertEqual(len(self.loop.pending), 0)
+
+
+class TestDialogCache(unittest.TestCase):
+
+  def setUp(self):
+    self.fake = gd.FakeTk()
+    self.root = self.fake.Tk()
+    fake = self.fake
+
+    class Dialog(fake.Toplevel):
+      built = 0
+
+      def __init__(self, master=None, **kw):
+        fake.Toplevel.__init__(self, master, **kw)
+        Dialog.built += 1
+        self.shown = True
+        self.protocols = {}
+        self.ent = fake.Entry(self)
+
+      def protocol(self, name, func):
+        self.protocols[name] = func
+
+      def withdraw(self):
+        self.shown = False
+
+      def deiconify(self):
+        self.shown = True
+
+    self.Dialog = Dialog
+
+  def test_reuse(self):
+    cache = gd.DialogCache()
+    reset = []
+    cache.add_reset_hook(self.Dialog, reset.append)
+    dlg = cache.open(self.Dialog, self.root)
+    cache.close(dlg)
+    self.assertFalse(dlg.shown)
+    self.assertTrue(dlg.winfo_exists())
+
+    self.assertIs(cache.open(self.Dialog, self.root), dlg)
+    self.assertTrue(dlg.shown)
+    self.assertEqual(self.Dialog.built, 1)
+    self.assertEqual(reset, [dlg])
+
+    stats = cache.stats()
+    self.assertEqual((stats['create'], stats['reuse'], stats['close']), (1, 1, 1))
+
+  def test_window_close(self):
+    cache = gd.DialogCache()
+    dlg = cache.open(self.Dialog, self.root)
+    dlg.protocols['WM_DELETE_WINDOW']()
+    self.assertFalse(dlg.shown)
+    self.assertIs(cache.open(self.Dialog, self.root), dlg)
+
+  def test_evict(self):
+    cache = gd.DialogCache(max_size=1)
+    frm = self.fake.Frame(self.root)
+    a = cache.open(self.Dialog, self.root)
+    b = cache.open(self.Dialog, frm)
+    cache.close(a)
+    cache.close(b)
+    self.assertFalse(a.winfo_exists())
+    self.assertTrue(b.winfo_exists())
+    self.assertEqual(cache.stats()['evict'], 1)
+
+    # A destroyed dialog is replaced
+    b.destroy()
+    self.assertIsNot(cache.open(self.Dialog, frm), b)
+    self.assertEqual(self.Dialog.built, 3)
+
+
+class TestDataLoader(unittest.TestCase):
+
+  def setUp(self):
+    self.fake = gd.FakeTk()
+    self.loop = EventLoop()
+    self.inserts = []
+    self.lst = self.loop.attach(self.fake.Listbox(self.fake.Tk()))
+    self.lst.insert = lambda index, *items: self.inserts.append(items)
+
+  def test_batches(self):
+    done = []
+    loader = gd.DataLoader(self.lst, lambda: range(7), batch=3, done=done.append)
+    self.assertEqual(self.inserts, [])
+    self.loop.run()
+    self.assertEqual(self.inserts, [(0, 1, 2), (3, 4, 5), (6,)])
+    self.assertEqual(done, [loader])
+    self.assertEqual(loader.loaded, 7)
+
+  def test_destroy(self):
+    loader = gd.DataLoader(self.lst, range(10), batch=3)
+    func, args = self.loop.pending.popitem(last=False)[1]
+    func(*args)
+    self.assertEqual(len(self.loop.pending), 1)
+
+    self.loop.destroy(self.lst)
+    self.assertEqual(len(self.loop.pending), 0)
+    self.assertTrue(loader.finished)
+    self.assertEqual(loader.loaded, 3)
+
+  def test_unsupported_widget(self):
+    self.assertRaises(TypeError, gd.DataLoader, self.fake.Canvas(), [])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = "frm(Frame)\n  lbl(Label | text='sized')\n"
+
+
+class FakeToplevel(object):
+  '''Window manager calls of a toplevel on top of a FakeTk root'''
+  def __init__(self, root, mapped=False, size=(200, 100)):
+    self.geometry = []
+    self.idle = []
+    root.winfo_toplevel = lambda: root
+    root.winfo_ismapped = lambda: mapped
+    root.winfo_reqwidth = lambda: size[0]
+    root.winfo_reqheight = lambda: size[1]
+    root.wm_geometry = self.geometry.append
+    root.after_idle = lambda func, *args: self.idle.append((func, args))
+
+  def run_idle(self):
+    while self.idle:
+      func, args = self.idle.pop(0)
+      func(*args)
+
+
+class TestGeometryCache(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp()
+    self.fname = os.path.join(self.tmp, 'geometry.json')
+    self.fake = gd.FakeTk()
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp)
+
+  def build(self, **kw):
+    root = self.fake.Tk()
+    top = FakeToplevel(root, **kw)
+    cache = gd.GeometryCache(self.fname)
+    cache.apply(root, 'main', SPEC)
+    return (cache, top)
+
+  def test_first_run(self):
+    cache, top = self.build()
+    self.assertEqual(top.geometry, [])
+    top.run_idle()
+    self.assertEqual(top.geometry, [''])
+    self.assertEqual(gd.GeometryCache(self.fname).lookup('main', SPEC), (200, 100))
+
+  def test_reset_after_settling(self):
+    self.build()[1].run_idle()
+
+    cache, top = self.build()
+    self.assertEqual(top.geometry, ['200x100'])
+    top.run_idle()
+    self.assertEqual(top.geometry, ['200x100', ''])
+
+  def test_stale_size(self):
+    self.build()[1].run_idle()
+
+    cache, top = self.build(size=(300, 120))
+    top.run_idle()
+    self.assertEqual(top.geometry, ['200x100', ''])
+    self.assertEqual(cache.lookup('main', SPEC), (300, 120))
+    self.assertIsNone(cache.lookup('main', SPEC + 'btn(Button)\n'))
+
+  def test_mapped(self):
+    self.build()[1].run_idle()
+
+    cache, top = self.build(mapped=True)
+    self.assertEqual(top.geometry, [])
+    top.run_idle()
+    self.assertEqual(top.geometry, [''])
+
+
+if __name__ == '__main__':
+  unittest.main()
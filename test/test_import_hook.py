@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = "frm(Frame)\n  lbl(Label | text='hook')\n"
+
+
+@unittest.skipUnless(gd.have_import_machinery, 'Importing layout files requires Python 3')
+class TestImportHook(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp()
+    with open(os.path.join(self.tmp, 'hooked_layout.guidoc'), 'w') as fh:
+      fh.write(SPEC)
+    sys.path.insert(0, self.tmp)
+    self.dont_write_bytecode = sys.dont_write_bytecode
+    sys.dont_write_bytecode = False
+
+  def tearDown(self):
+    gd.install_import_hook() # Restore the default options
+    gd.remove_import_hook()
+    sys.path.remove(self.tmp)
+    sys.modules.pop('hooked_layout', None)
+    sys.dont_write_bytecode = self.dont_write_bytecode
+    shutil.rmtree(self.tmp)
+
+  def load(self):
+    sys.modules.pop('hooked_layout', None)
+    import hooked_layout
+    return hooked_layout
+
+  def test_import(self):
+    gd.install_import_hook()
+    module = self.load()
+    self.assertEqual(module._guidoc, SPEC)
+
+    fake = gd.FakeTk()
+    module.tk = fake
+    target = fake.Frame(fake.Tk())
+    module._build_widgets(target)
+    self.assertEqual(target.lbl.cget('text'), 'hook')
+    self.assertEqual(len(os.listdir(os.path.join(self.tmp, '__pycache__'))), 1)
+
+  def test_options_invalidate_cache(self):
+    gd.install_import_hook(method_name='build_a')
+    self.assertTrue(hasattr(self.load(), 'build_a'))
+
+    gd.install_import_hook(method_name='build_b')
+    module = self.load()
+    self.assertTrue(hasattr(module, 'build_b'))
+    self.assertFalse(hasattr(module, 'build_a'))
+
+    gd.install_import_hook(method_name='build_a')
+    self.assertTrue(hasattr(self.load(), 'build_a'))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from guidoc import guidoc as gd
+
+
+WIDGETS = '''
+lbl(Label | text='name')
+ent(Entry)
+btn(Button | text='OK')
+frm(Frame)
+  a(Label)
+  b(Label)
+'''
+
+GRID = '''
+[grid]
++-----+-----+
+| lbl | ent |
++-----+-----+
+| btn       |
++-----------+
+'''
+
+SWAPPED_GRID = '''
+[grid]
++-----+-----+
+| ent | lbl |
++-----+-----+
+| btn       |
++-----------+
+'''
+
+FRAME_GRID = '''
+[grid frm]
++---+---+
+| a | b |
++---+---+
+'''
+
+MENU = '''
+[menu]
+File
+  Quit command=self.quit
+'''
+
+# Each revision is parsed after the previous one
+REVISIONS = [
+  WIDGETS + GRID + MENU,
+  WIDGETS.replace("text='OK'", "text='Cancel'") + GRID + MENU,
+  WIDGETS.replace("text='OK'", "text='Cancel'") + SWAPPED_GRID + MENU,
+  WIDGETS.replace("text='OK'", "text='Cancel'") + SWAPPED_GRID + FRAME_GRID + MENU,
+  WIDGETS.replace("text='OK'", "text='Cancel'") + FRAME_GRID + MENU.replace('Quit', 'Exit'),
+  WIDGETS + MENU
+]
+
+
+class TestIncrementalParser(unittest.TestCase):
+
+  def full_parse(self, spec):
+    return gd.create_layout_method(spec, '_build_widgets', deterministic=True)
+
+  def test_revisions(self):
+    parser = gd.IncrementalParser()
+    for spec in REVISIONS:
+      parser.update(spec)
+      self.assertEqual(parser.code('_build_widgets', deterministic=True), self.full_parse(spec))
+
+  def test_changed(self):
+    parser = gd.IncrementalParser()
+    parser.update(REVISIONS[0])
+    self.assertEqual(parser.update(REVISIONS[0])[2], [])
+
+    changed = parser.update(REVISIONS[1])[2]
+    self.assertEqual([c.name for c in changed if isinstance(c, gd.WidgetSpec)], ['btn'])
+
+    menu = parser.menus[0]
+    _, menus, changed = parser.update(REVISIONS[1].replace('Quit', 'Exit'))
+    self.assertIsNot(menus[0], menu)
+    self.assertEqual(changed, [menus[0]])
+
+  @unittest.skipUnless(gd.have_docutils, 'Grid sections require docutils')
+  def test_grid_change(self):
+    parser = gd.IncrementalParser()
+    widget_sec = parser.update(REVISIONS[1])[0]
+    revised, _, changed = parser.update(REVISIONS[2])
+    self.assertIs(revised, widget_sec) # Only the grid is parsed again
+    self.assertEqual(sorted(c.name for c in changed if isinstance(c, gd.WidgetSpec)), ['ent', 'lbl'])
+
+  def test_errors(self):
+    parser = gd.IncrementalParser()
+    self.assertRaises(gd.LayoutError, parser.update, '[grid]\n')
+    self.assertRaises(gd.LayoutError, parser.update, WIDGETS + '\n[widgets]\n' + WIDGETS)
+
+
+if __name__ == '__main__':
+  unittest.main()
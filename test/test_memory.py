@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from guidoc import guidoc as gd
+
+if gd.have_tracemalloc:
+  import tracemalloc
+
+
+SPEC = '''
+frm(Frame)
+  lbl(Label | text='x')
+btn(Button)
+
+[menu]
+File
+  Quit command=self.quit
+'''
+
+
+@unittest.skipUnless(gd.have_tracemalloc, 'Memory accounting requires tracemalloc')
+class TestLayoutMemory(unittest.TestCase):
+
+  def test_fake_build(self):
+    fake = gd.FakeTk()
+    r = gd.layout_memory(SPEC, fake.Tk())
+    self.assertEqual(r['backend'], 'fake')
+    self.assertEqual(r['tcl']['growth'], {'widgets': 5})
+    self.assertEqual([l['spec'] for l in r['by_line']],
+      ['frm(Frame)', 'lbl(Label)', 'btn(Button)', 'menu File', 'menu Quit', '[menu]'])
+    self.assertGreater(r['by_kind']['Label']['bytes'], 0)
+    self.assertFalse(tracemalloc.is_tracing())
+
+  def test_shallow_tracing(self):
+    tracemalloc.start(1)
+    try:
+      self.assertRaises(gd.LayoutError, gd.layout_memory, SPEC, gd.FakeTk().Tk())
+    finally:
+      tracemalloc.stop()
+
+  def test_existing_tracing(self):
+    tracemalloc.start(64)
+    try:
+      r = gd.layout_memory(SPEC, gd.FakeTk().Tk())
+      self.assertTrue(tracemalloc.is_tracing())
+    finally:
+      tracemalloc.stop()
+    self.assertGreater(r['by_kind']['Button']['bytes'], 0)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = "frm(Frame)\n  lbl(Label)\n  sub(Frame)\n    btn(Button)\nent(Entry)\n"
+
+
+class RecordPass(gd.LayoutPass):
+  '''Record every hook in the order it is called'''
+  def __init__(self, name, log):
+    self.name = name
+    self.log = log
+
+  def begin(self, ctx):
+    self.log.append((self.name, 'begin'))
+
+  def visit_container(self, ctx, container, children):
+    self.log.append((self.name, 'container', container.name if container else None))
+
+  def visit_widget(self, ctx, widget, parent):
+    self.log.append((self.name, 'widget', widget.name))
+
+  def finish(self, ctx):
+    self.log.append((self.name, 'finish'))
+
+
+class TextPass(gd.LayoutPass):
+  '''Give every Label without parameters a text option'''
+  def visit_widget(self, ctx, widget, parent):
+    if widget.kind == 'Label' and len(widget.params.strip()) == 0:
+      widget.params = "text='{}'".format(widget.name)
+
+
+class TestPassManager(unittest.TestCase):
+
+  def test_order(self):
+    widget_sec, _ = gd.analyze_layout(SPEC)
+    log = []
+    gd.PassManager([RecordPass('a', log), RecordPass('b', log)]).run(widget_sec)
+
+    expected = [('a', 'begin'), ('b', 'begin'), ('a', 'container', None), ('b', 'container', None)]
+    for container, widget in (('frm', 'frm'), (None, 'lbl'), ('sub', 'sub'), (None, 'btn'), (None, 'ent')):
+      if container is not None:
+        expected.extend([('a', 'container', container), ('b', 'container', container)])
+      expected.extend([('a', 'widget', widget), ('b', 'widget', widget)])
+    expected.extend([('a', 'finish'), ('b', 'finish')])
+    self.assertEqual(log, expected)
+
+  def test_only(self):
+    widget_sec, _ = gd.analyze_layout(SPEC)
+    log = []
+    ctx = gd.PassManager([RecordPass('a', log)]).run(widget_sec, only={'sub'})
+    self.assertEqual([e[2] for e in log if e[1] == 'container'], ['sub'])
+    self.assertEqual(len([e for e in log if e[1] == 'widget']), 5)
+    self.assertEqual(sorted(ctx.index), ['btn', 'ent', 'frm', 'lbl', 'sub'])
+
+  def test_register_pass(self):
+    text_pass = TextPass()
+    gd.register_pass(text_pass)
+    try:
+      self.assertIs(gd.default_passes()[-1], text_pass)
+      code = gd.create_layout_method(SPEC, '_build_widgets', deterministic=True)
+    finally:
+      gd.unregister_pass(text_pass)
+
+    self.assertIn("self.lbl = tk.Label(self.frm, text='lbl')", code)
+    self.assertNotIn(text_pass, gd.default_passes())
+    self.assertNotIn("text='lbl'", gd.create_layout_method(SPEC, '_build_widgets', deterministic=True))
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = '''
+panel(Frame | width=400, height=200)
+  title(Label | text='Status')
+  log(Text)
+  ok(Button | text='OK') <place | x=2, width=-4>
+
+[place panel]
++-------+---------------+
+| title | ok            |
++-------+---------------+
+| log                   |
++                       +
+|                       |
++-----------------------+
+'''
+
+
+@unittest.skipUnless(gd.have_docutils, 'Place sections require docutils')
+class TestPlaceLayout(unittest.TestCase):
+
+  def test_build(self):
+    target = gd.build_fake_layout(SPEC)
+    self.assertEqual(gd.check_fake_layout(target, SPEC), [])
+    self.assertEqual(target.panel._manager, 'pack')
+
+    self.assertEqual(target.title._layout, {'relx': 0.0, 'rely': 0.0, 'relwidth': 0.3182, 'relheight': 0.3333})
+    self.assertEqual(target.log._layout, {'relx': 0.0, 'rely': 0.3333, 'relwidth': 1.0, 'relheight': 0.6667})
+    # Explicit place parameters are kept along with the table geometry
+    self.assertEqual(target.ok._layout, {'relx': 0.3182, 'rely': 0.0, 'relwidth': 0.6818, 'relheight': 0.3333,
+      'x': 2, 'width': -4})
+
+  def test_check_detects_changes(self):
+    target = gd.build_fake_layout(SPEC)
+    target.log.place(relheight=0.5)
+    self.assertEqual(gd.check_fake_layout(target, SPEC), ['log: place relheight is 0.5 instead of 0.6667'])
+
+  def test_missing_widget(self):
+    spec = SPEC.replace("  log(Text)\n", "  log(Text)\n  extra(Label)\n")
+    self.assertRaises(gd.GridError, gd.create_layout_method, spec, '_build_widgets')
+
+  def test_mixed_managers(self):
+    spec = SPEC.replace("log(Text)", "log(Text) <grid>")
+    self.assertRaises(gd.LayoutError, gd.create_layout_method, spec, '_build_widgets')
+
+
+if __name__ == '__main__':
+  unittest.main()
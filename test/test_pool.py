@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from guidoc import guidoc as gd
+
+
+class OldStyleWidget:
+  '''Widget class without object as a base like Tkinter on Python 2'''
+  serial = 0
+
+  def __init__(self, master, **options):
+    OldStyleWidget.serial += 1
+    self.master = master
+    self.options = options
+    self.manager = 'pack'
+    self.path = '{}.old{}'.format(master, OldStyleWidget.serial)
+
+  def __str__(self):
+    return self.path
+
+  def winfo_exists(self):
+    return 1
+
+  def winfo_manager(self):
+    return self.manager
+
+  def pack_forget(self):
+    self.manager = ''
+
+  def configure(self, cnf=None, **kw):
+    if cnf is None and len(kw) == 0:
+      return {}
+    self.options.update(kw)
+
+
+class TestWidgetPool(unittest.TestCase):
+
+  def setUp(self):
+    self.fake = gd.FakeTk()
+    self.root = self.fake.Tk()
+
+  def test_reuse(self):
+    pool = gd.WidgetPool()
+    a = pool.acquire(self.fake.Label, self.root, text='a')
+    self.assertTrue(pool.release(a))
+    b = pool.acquire(self.fake.Label, self.root, text='b')
+    self.assertIs(a, b)
+    self.assertEqual(b.cget('text'), 'b')
+
+    stats = pool.stats()
+    self.assertEqual((stats['create'], stats['reuse'], stats['release']), (1, 1, 1))
+    self.assertEqual(stats['reuse_rate'], 0.5)
+    self.assertEqual(list(stats['kinds']), ['Label'])
+
+  def test_reuse_old_style(self):
+    pool = gd.WidgetPool()
+    reset = []
+    pool.add_reset_hook(OldStyleWidget, reset.append)
+
+    a = pool.acquire(OldStyleWidget, self.root)
+    pool.release(a)
+    self.assertEqual(reset, [a])
+    self.assertEqual(a.manager, '')
+    self.assertIs(pool.acquire(OldStyleWidget, self.root), a)
+
+    stats = pool.stats()
+    self.assertEqual(stats['reuse'], 1)
+    self.assertEqual(list(stats['kinds']), ['OldStyleWidget'])
+
+  def test_separate_masters(self):
+    pool = gd.WidgetPool()
+    frm = self.fake.Frame(self.root)
+    a = pool.acquire(self.fake.Label, self.root)
+    pool.release(a)
+    self.assertIsNot(pool.acquire(self.fake.Label, frm), a)
+
+  def test_destroyed(self):
+    pool = gd.WidgetPool()
+    frm = self.fake.Frame(self.root)
+    a = pool.acquire(self.fake.Label, frm)
+    pool.release(a)
+    frm.destroy()
+    self.assertIsNot(pool.acquire(self.fake.Label, frm), a)
+
+  def test_max_idle(self):
+    pool = gd.WidgetPool(max_idle=1)
+    a = pool.acquire(self.fake.Label, self.root)
+    b = pool.acquire(self.fake.Label, self.root)
+    pool.release(a)
+    pool.release(b)
+    self.assertEqual(pool.stats()['evict'], 1)
+    self.assertEqual(pool.stats()['idle'], 1)
+
+  def test_pooled_layout(self):
+    spec = "frm(Frame)\n  lbl(Label | text='x')\nbtn(Button)\n"
+    code = gd.create_layout_method(spec, '_build_widgets', pooled=True, deterministic=True)
+    method = gd.compile_method(code, '_build_widgets', {gd.find_tkinter_name(): self.fake})
+
+    target = self.fake.Frame(self.root)
+    target._guidoc_pool = gd.WidgetPool()
+    method(target)
+    first = (target.frm, target.lbl, target.btn)
+    self.assertEqual(target._guidoc_pool.release_children(target), 3)
+    method(target)
+    self.assertEqual((target.frm, target.lbl, target.btn), first)
+    self.assertEqual(target._guidoc_pool.stats()['reuse'], 3)
+
+
+if __name__ == '__main__':
+  unittest.main()
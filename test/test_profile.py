@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import io
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = "frm(Frame)\n  lbl(Label)\n\n[menu]\nFile\n  Quit\n"
+
+
+class TestLayoutProfiler(unittest.TestCase):
+
+  def test_phases(self):
+    records = []
+    with gd.LayoutProfiler(callback=records.append) as prof:
+      gd.create_layout_method(SPEC, '_build_widgets', class_name='Main')
+      gd.create_layout_method(SPEC, '_build_widgets', class_name='About')
+    self.assertIsNone(gd._profiler)
+
+    self.assertEqual([r['name'] for r in prof.layouts], ['Main', 'About'])
+    self.assertEqual(records, prof.layouts)
+    phases = ['split', 'parse.widgets', 'parse.menu', 'passes', 'codegen']
+    self.assertEqual(list(prof.layouts[0]['phases']), phases)
+    self.assertEqual(list(prof.calls.values()), [2] * len(phases))
+    self.assertEqual([(s['name'], s['lines']) for s in prof.layouts[0]['sections']], [('widgets', 2), ('menu', 2)])
+    self.assertAlmostEqual(sum(prof.totals.values()),
+      sum(t for r in prof.layouts for t in r['phases'].values()))
+
+  def test_decorated_class(self):
+    fake = gd.FakeTk()
+    with gd.LayoutProfiler() as prof:
+      gd.tk_layout(SPEC, libraries={'tk': fake})(type('View', (fake.Frame,), {}))
+    self.assertEqual([r['name'] for r in prof.layouts], ['View'])
+    self.assertEqual(list(prof.layouts[0]['phases'])[-1], 'exec')
+
+  def test_nested(self):
+    outer = gd.LayoutProfiler()
+    inner = gd.LayoutProfiler()
+    with outer:
+      with inner:
+        gd.create_layout_method(SPEC, '_build_widgets')
+      self.assertIs(gd._profiler, outer)
+    self.assertEqual((len(outer.layouts), len(inner.layouts)), (0, 1))
+
+  def test_report(self):
+    with gd.LayoutProfiler() as prof:
+      gd.create_layout_method(SPEC, '_build_widgets', class_name='Main')
+    fh = io.StringIO() if str is not bytes else io.BytesIO()
+    prof.report(fh)
+    lines = fh.getvalue().splitlines()
+    self.assertTrue(lines[0].startswith('Main '))
+    self.assertIn('Total for 1 layout(s)', '\n'.join(lines))
+    codegen = [l for l in lines if l.split()[0] == 'codegen']
+    self.assertEqual(len(codegen), 2)
+    self.assertTrue(codegen[1].endswith(' x1'))
+
+  @unittest.skipUnless(gd.have_tracemalloc, 'Memory tracing requires tracemalloc')
+  def test_trace_memory(self):
+    with gd.LayoutProfiler(trace_memory=True) as prof:
+      self.assertTrue(gd.tracemalloc.is_tracing())
+      gd.create_layout_method(SPEC, '_build_widgets')
+    self.assertFalse(gd.tracemalloc.is_tracing())
+    self.assertEqual(list(prof.allocations), list(prof.totals))
+    self.assertGreater(prof.allocations['codegen']['bytes'], 0)
+
+  @unittest.skipUnless(gd.have_tracemalloc, 'Memory tracing requires tracemalloc')
+  def test_tracing_stopped(self):
+    with gd.LayoutProfiler(trace_memory=True) as prof:
+      with prof.phase('stop'):
+        gd.tracemalloc.stop()
+      gd.create_layout_method(SPEC, '_build_widgets')
+    self.assertEqual(prof.calls['stop'], 1)
+    self.assertEqual(prof.calls['codegen'], 1)
+    self.assertEqual(len(prof.allocations), 0)
+
+  @unittest.skipIf(gd.have_tracemalloc, 'Test for Python without tracemalloc')
+  def test_no_tracemalloc(self):
+    self.assertRaises(gd.LayoutError, gd.LayoutProfiler, True)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = "frm(Frame)\n  lbl(Label | text='one')\n"
+
+
+class TestHotReload(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp = tempfile.mkdtemp()
+    self.layout_file = os.path.join(self.tmp, 'view.guidoc')
+    with open(self.layout_file, 'w') as fh:
+      fh.write(SPEC)
+    self.fake = gd.FakeTk()
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp)
+
+  def view(self):
+    cls = gd.tk_layout(layout_file=self.layout_file, libraries={'tk': self.fake}, hot_reload=True)(
+      type('View', (self.fake.Frame,), {}))
+    return cls(self.fake.Tk())
+
+  def test_rebuild_replaces_reloader(self):
+    view = self.view()
+    view._build_widgets()
+    first = view._guidoc_reloader
+    self.assertIsNotNone(first._after_id)
+
+    view._build_widgets()
+    self.assertIsNot(view._guidoc_reloader, first)
+    self.assertIsNone(first._after_id)
+    self.assertIsNotNone(view._guidoc_reloader._after_id)
+
+  def test_reload(self):
+    view = self.view()
+    view._build_widgets()
+    lbl = view.lbl
+    view._guidoc_reloader.reload("frm(Frame)\n  lbl(Label | text='two')\n")
+    self.assertIs(view.lbl, lbl)
+    self.assertEqual(lbl.cget('text'), 'two')
+
+  def test_remove_widget(self):
+    view = self.view()
+    view._build_widgets()
+    view._guidoc_reloader.reload("frm(Frame)\n")
+    self.assertNotIn('lbl', vars(view))
+    self.assertEqual(list(view.frm.children), [])
+
+  def test_destroy_stops_polling(self):
+    view = self.view()
+    bindings = {}
+    view.bind = lambda sequence, func, add=None: bindings.setdefault(sequence, []).append(func)
+    view._build_widgets()
+    reloader = view._guidoc_reloader
+    self.assertIsNotNone(reloader._after_id)
+
+    event = type('Event', (object,), {'widget': view})()
+    for func in bindings['<Destroy>']:
+      func(event)
+    self.assertIsNone(reloader._after_id)
+
+
+if __name__ == '__main__':
+  unittest.main()
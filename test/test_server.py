@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import io
+import json
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = "frm(Frame)\n  lbl(Label | text='served')\n"
+
+
+class TestCodegenServer(unittest.TestCase):
+
+  def test_generate(self):
+    server = gd.CodegenServer()
+    response = server.handle({'id': 1, 'spec': SPEC, 'method_name': 'build', 'deterministic': True})
+    self.assertEqual(response, {'id': 1, 'ok': True,
+      'code': gd.create_layout_method(SPEC, 'build', deterministic=True)})
+
+  def test_cache(self):
+    server = gd.CodegenServer(cache_size=1)
+    code = server.generate(SPEC)
+    self.assertIs(server.generate(SPEC), code)
+    self.assertIsNot(server.generate(SPEC, method_name='build'), code)
+    self.assertEqual(len(server._cache), 1)
+
+  def test_documents(self):
+    server = gd.CodegenServer(max_documents=1)
+    revised = SPEC + "btn(Button)\n"
+    server.generate(SPEC, 'main', deterministic=True)
+    parser = server._documents['main']
+    self.assertEqual(server.generate(revised, 'main', deterministic=True),
+      gd.create_layout_method(revised, '_build_widgets', class_name='main', deterministic=True))
+    self.assertIs(server._documents['main'], parser)
+
+    server.generate(SPEC, 'about')
+    self.assertEqual(list(server._documents), ['about'])
+
+  def test_errors(self):
+    server = gd.CodegenServer()
+    response = server.handle({'id': 'x', 'spec': 'a(Label) <grid>\nb(Label) <place>\n'})
+    self.assertFalse(response['ok'])
+    self.assertEqual(response['id'], 'x')
+    self.assertEqual(response['error']['type'], 'LayoutError')
+    self.assertIn('Mismatched layout managers', response['error']['message'])
+
+    self.assertEqual(server.handle({'command': 'reload'})['error']['type'], 'ValueError')
+    self.assertEqual(server.handle({})['error']['type'], 'KeyError')
+
+  def test_stream(self):
+    requests = [json.dumps({'id': 1, 'spec': SPEC}), 'not json', '', json.dumps([1]),
+      json.dumps({'command': 'shutdown'}), json.dumps({'id': 2, 'spec': SPEC})]
+    rfile = io.BytesIO('\n'.join(requests).encode('utf-8'))
+    wfile = io.BytesIO()
+    self.assertFalse(gd.CodegenServer().serve_stream(rfile, wfile))
+
+    responses = [json.loads(l) for l in wfile.getvalue().decode('utf-8').splitlines()]
+    self.assertEqual([(r['id'], r['ok']) for r in responses], [(1, True), (None, False), (None, False), (None, True)])
+    self.assertEqual(responses[1]['error']['type'], 'RequestError')
+
+
+if __name__ == '__main__':
+  unittest.main()
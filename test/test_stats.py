@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = '''
+frm(Frame)
+  lbl(Label | text='name')
+  ent(Entry)
+  sub(Frame)
+    a(Button)
+    b(Button)
+    c(Button)
+btn(Button | text='OK')
+
+[grid frm]
++-----+-----+
+| lbl | ent |
++-----+-----+
+| sub       |
++-----------+
+
+[menu]
+File
+  Open
+  ----
+  Recent
+    one
+    two
+  Quit
+'''
+
+
+class TestLayoutStats(unittest.TestCase):
+
+  def test_widgets(self):
+    stats = gd.layout_stats(SPEC)
+    self.assertEqual(stats['widgets'], {'total': 8, 'by_kind': {'Frame': 2, 'Label': 1, 'Entry': 1, 'Button': 4},
+      'max_depth': 3, 'max_fanout': 3, 'containers': 2})
+
+  def test_menus(self):
+    stats = gd.layout_stats(SPEC)
+    self.assertEqual(stats['menus'], [{'name': 'menubar', 'entries': 4, 'cascades': 2, 'separators': 1,
+      'max_depth': 3}])
+
+  def test_tcl_calls(self):
+    # 2 calls for each widget. The menubar and its 2 cascade menus with their cascade entries,
+    # 4 commands, 1 separator, and attaching the menubar.
+    self.assertEqual(gd.layout_stats(SPEC)['tcl_calls'], 2 * 8 + 1 + 2 * 2 + 4 + 1 + 1)
+    self.assertEqual(gd.layout_stats('a(Label)\n')['tcl_calls'], 2)
+
+  def test_code(self):
+    stats = gd.layout_stats(SPEC, method_name='build')
+    code = gd.create_layout_method(SPEC, 'build', deterministic=True)
+    self.assertEqual((stats['code']['lines'], stats['code']['chars']), (len(code.splitlines()), len(code)))
+    self.assertGreater(stats['code']['bytecode'], 0)
+
+  @unittest.skipUnless(gd.have_docutils, 'Grid sections require docutils')
+  def test_grids(self):
+    stats = gd.layout_stats(SPEC)
+    self.assertEqual(stats['grids'], [{'container': 'frm', 'mode': None, 'rows': 2, 'columns': 2, 'cells': 3,
+      'rowspans': 0, 'columnspans': 1}])
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+import re
+import types
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = '''
+frm(Frame)
+  btn(Button | text='OK')
+  tv(Treeview)
+ent(Entry)
+
+[menu]
+File
+  Quit command=self.quit
+'''
+
+# Output of the original code generator before the symbol table was added
+BASELINE = '''  # Widgets
+  self.frm = tk.Frame(self)
+  self.frm.pack()
+  self.btn = tk.Button(self.frm, text='OK')
+  self.btn.pack()
+  self.tv = Treeview(self.frm)
+  self.tv.pack()
+  self.ent = tk.Entry(self)
+  self.ent.pack()
+
+  # Menu: menubar
+  self.menubar = tk.Menu(self, tearoff=0)
+  self.menubarFile = tk.Menu(self.menubar, tearoff=0)
+  self.menubarFile.add_command(label='Quit', command=self.quit)
+  self.menubar.add_cascade(label='File', menu=self.menubarFile)
+  if isinstance(self, tk.Toplevel):
+    self.config(menu=self.menubar)
+  elif isinstance(self.master, tk.Tk) or isinstance(self.master, tk.Toplevel):
+    self.master.config(menu=self.menubar)'''
+
+
+def body(code):
+  '''Strip the declaration, docstring, and trailing spaces from a generated method'''
+  return '\n'.join(l.rstrip() for l in code.split('\n')[2:])
+
+
+class TestSymbolTable(unittest.TestCase):
+
+  def test_default_prefix(self):
+    self.assertEqual(body(gd.create_layout_method(SPEC, '_build_widgets', deterministic=True)), BASELINE)
+    self.assertEqual(body(gd.create_layout_method(SPEC, '_build_widgets', lib_prefix='tk', deterministic=True)),
+      BASELINE)
+
+  def test_ttk_prefix(self):
+    for prefix in ('ttk', 'ttk.'):
+      code = body(gd.create_layout_method(SPEC, '_build_widgets', lib_prefix=prefix, deterministic=True))
+      expected = re.sub(r'= tk\.(Frame|Button|Entry)', r'= ttk.\1', BASELINE).replace('= Treeview', '= ttk.Treeview')
+      self.assertEqual(code, expected)
+
+  def test_tkinter_prefix(self):
+    code = body(gd.create_layout_method(SPEC, '_build_widgets', lib_prefix='tkinter', deterministic=True))
+    self.assertEqual(code, re.sub(r'\btk\.', 'tkinter.', BASELINE))
+
+  def test_unknown_prefix(self):
+    code = body(gd.create_layout_method(SPEC, '_build_widgets', lib_prefix='no_such_widgets', deterministic=True))
+    expected = re.sub(r'\btk\.', 'no_such_widgets.', BASELINE).replace('= Treeview', '= no_such_widgets.Treeview')
+    self.assertEqual(code, expected)
+
+  def test_library_fallback(self):
+    ttk = types.ModuleType('ttk')
+    ttk.Button = object
+    symbols = gd.SymbolTable('ttk', libraries={'ttk': ttk, 'Tkinter': gd.tk})
+    self.assertEqual(symbols.resolve('Button'), 'ttk.Button')
+    self.assertEqual(symbols.resolve('Menu'), 'Tkinter.Menu')
+    self.assertEqual(symbols.resolve('Bogus'), 'Bogus')
+
+  def test_internal_fallback(self):
+    ttk = types.ModuleType('ttk')
+    ttk.Button = object
+    symbols = gd.SymbolTable('ttk', namespace={'__name__': 'app'}, libraries={'ttk': ttk})
+    self.assertEqual(symbols.resolve('Button'), 'ttk.Button')
+    self.assertEqual(symbols.resolve('Menu'), 'tk.Menu')
+
+  def test_qualified_kind(self):
+    self.assertEqual(gd.SymbolTable('ttk').resolve('ttk.Treeview'), 'ttk.Treeview')
+    self.assertEqual(gd.SymbolTable().resolve('ttk.Treeview'), 'ttk.Treeview')
+
+  def test_module_symbols(self):
+    namespace = {'__name__': 'app', 'tk': gd.tk}
+    symbols = gd.module_symbols(namespace, 'ttk')
+    self.assertIs(gd.module_symbols(namespace, 'ttk'), symbols)
+
+    # Changed imports and a reloaded module get a new table
+    namespace['ttk'] = types.ModuleType('ttk')
+    changed = gd.module_symbols(namespace, 'ttk')
+    self.assertIsNot(changed, symbols)
+    self.assertEqual(changed.resolve('Button'), 'tk.Button')
+    self.assertIsNot(gd.module_symbols(dict(namespace), 'ttk'), changed)
+
+  def test_module_symbols_bounded(self):
+    for i in range(gd._max_module_symbols * 2):
+      gd.module_symbols({'__name__': 'app{}'.format(i)})
+    self.assertEqual(len(gd._module_symbols), gd._max_module_symbols)
+
+
+if __name__ == '__main__':
+  unittest.main()
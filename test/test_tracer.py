@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from guidoc import guidoc as gd
+
+
+class RecordingApp(object):
+  '''Tk interpreter stand-in that knows the class of each widget path'''
+  def __init__(self, classes):
+    self.classes = classes
+    self.calls = []
+
+  def call(self, *args):
+    if args[:2] == ('winfo', 'class'):
+      return self.classes[args[2]]
+    self.calls.append(args)
+    return ''
+
+
+class Root(object):
+  def __init__(self, tkapp):
+    self.tk = tkapp
+    self.children = {}
+
+
+class TestTclTracer(unittest.TestCase):
+
+  def test_call_kind(self):
+    kind = gd.TclTracer.call_kind
+    self.assertEqual(kind(('pack', 'configure', '.b')), 'geometry')
+    self.assertEqual(kind(('button', '.b', '-text', 'x')), 'create')
+    self.assertEqual(kind(('.b', 'configure', '-text', 'x')), 'config')
+    self.assertEqual(kind(('.m', 'insert', 'end', 'command'), ['.m']), 'menu')
+    self.assertEqual(kind(('.lb', 'insert', 'end', 'x'), ['.m']), 'other')
+    self.assertEqual(kind(('.m', 'add', 'command')), 'other')
+
+  def test_menu_paths(self):
+    tkapp = RecordingApp({'.old': 'Menu', '.lb': 'Listbox', '.txt': 'Text'})
+    root = Root(tkapp)
+    with gd.TclTracer(root) as tracer:
+      root.tk.call('menu', '.m', '-tearoff', 0)
+      root.tk.call('.m', 'add', 'command', '-label', 'Quit')
+      root.tk.call('.old', 'insert', 'end', 'separator')
+      root.tk.call('.lb', 'insert', 'end', 'a', 'b')
+      root.tk.call('.txt', 'insert', 'end', 'text')
+      root.tk.call('.lb', 'insert', 'end', 'c')
+    self.assertIs(root.tk, tkapp)
+
+    kinds = tracer.specs[None]['kinds']
+    self.assertEqual(kinds['menu'][0], 2)
+    self.assertEqual(kinds['other'][0], 3)
+    self.assertEqual(kinds['create'][0], 1)
+    self.assertEqual(len(tkapp.calls), 6)
+
+
+if __name__ == '__main__':
+  unittest.main()
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from guidoc import guidoc as gd
+
+
+SPEC = '''
+frm(Frame)
+  lbl(Label | text='name')
+  ent(Entry)
+btn(Button | text='OK')
+
+[menu]
+File
+  Quit command=self.quit
+'''
+
+
+class TestViewClass(unittest.TestCase):
+
+  def setUp(self):
+    self.fake = gd.FakeTk()
+    self.root = self.fake.Tk()
+
+  def view_class(self, **kw):
+    lib_prefix = gd.find_tkinter_name()
+    code = gd.create_layout_class(SPEC, 'View', lib_prefix=lib_prefix, deterministic=True, **kw)
+    namespace = {lib_prefix: self.fake}
+    exec(compile(code, '<guidoc>', 'exec'), namespace)
+    return namespace['View']
+
+  def test_slots(self):
+    View = self.view_class()
+    self.assertEqual(View.__slots__, ('frm', 'lbl', 'ent', 'btn', 'menubar', 'menubarFile'))
+
+    view = View(self.root)
+    self.assertEqual(view.lbl.cget('text'), 'name')
+    self.assertIs(view.ent.master, view.frm)
+    self.assertEqual([e['label'] for e in view.menubar._entries], ['File'])
+    # The widgets are held in slots instead of the instance dict
+    for name in View.__slots__:
+      self.assertNotIn(name, vars(view))
+    self.assertIsNot(View(self.root).frm, view.frm)
+
+  def test_handles(self):
+    View = self.view_class(handles=True)
+    self.assertIn('_guidoc_handles', View.__slots__)
+    view = View(self.root)
+    self.assertEqual(view._guidoc_handles, tuple(getattr(view, n) for n in View._guidoc_names))
+    self.assertEqual(View._guidoc_names, ('frm', 'lbl', 'ent', 'btn', 'menubar', 'menubarFile'))
+
+  def test_base(self):
+    View = self.view_class(base='Toplevel')
+    self.assertTrue(issubclass(View, self.fake.Toplevel))
+    self.assertEqual(View(self.root, name='dlg')._w, '.dlg')
+
+
+if __name__ == '__main__':
+  unittest.main()